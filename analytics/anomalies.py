@@ -0,0 +1,249 @@
+"""Vectorized growth and anomaly scoring for trend series."""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from pymongo import ReplaceOne
+from pymongo.database import Database
+from db.models import RawTrend
+from db.mongo_client import get_db
+from processing.rollups import day_start
+from analytics.report_cache import cached_report
+
+
+DEFAULT_ALPHA = 0.3
+STATE_FIELDS = ("mean", "var", "slope", "last", "n")
+
+
+class AnomalyScorer:
+    """
+    EWMA mean/variance, z-score and slope for many series at once.
+    
+    Each update() consumes one observation per series (NaN = no observation)
+    and costs O(1) per series, so the same code scores a full history
+    column by column or folds in a single new snapshot.
+    
+    - mean/var: exponentially weighted mean and variance
+    - z: (observation - previous mean) / previous std
+    - slope: EWMA of day-over-day changes
+    """
+    
+    def __init__(self, size: int, alpha: float = DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.mean = np.zeros(size)
+        self.var = np.zeros(size)
+        self.slope = np.zeros(size)
+        self.last = np.zeros(size)
+        self.n = np.zeros(size, dtype=np.int64)
+        self.z = np.zeros(size)
+    
+    @classmethod
+    def from_states(cls, states: List[Dict[str, float]], alpha: float = DEFAULT_ALPHA) -> "AnomalyScorer":
+        """Build a scorer from stored per-series states."""
+        scorer = cls(len(states), alpha)
+        for name in STATE_FIELDS:
+            getattr(scorer, name)[:] = [state.get(name, 0) for state in states]
+        return scorer
+    
+    def state(self, i: int) -> Dict[str, float]:
+        """Stored form of series i."""
+        return {
+            "mean": float(self.mean[i]),
+            "var": float(self.var[i]),
+            "slope": float(self.slope[i]),
+            "last": float(self.last[i]),
+            "n": int(self.n[i])
+        }
+    
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Copy of the state arrays."""
+        return {name: getattr(self, name).copy() for name in STATE_FIELDS}
+    
+    def update(self, values: np.ndarray) -> np.ndarray:
+        """
+        Fold in one observation per series.
+        
+        Returns:
+            Boolean mask of series that had an observation
+        """
+        a = self.alpha
+        observed = ~np.isnan(values)
+        first = observed & (self.n == 0)
+        seen = observed & (self.n > 0)
+        x = np.where(observed, values, 0.0)
+        
+        diff = x - self.mean
+        std = np.sqrt(self.var)
+        z = np.where(std > 0, diff / np.where(std > 0, std, 1.0), 0.0)
+        increment = a * diff
+        
+        self.z = np.where(seen, z, np.where(first, 0.0, self.z))
+        self.slope = np.where(seen, (1 - a) * self.slope + a * (x - self.last), self.slope)
+        self.mean = np.where(seen, self.mean + increment, np.where(first, x, self.mean))
+        self.var = np.where(seen, (1 - a) * (self.var + diff * increment), np.where(first, 0.0, self.var))
+        self.last = np.where(observed, x, self.last)
+        self.n = self.n + observed
+        return observed
+
+
+def load_interest_matrix(
+    days: int = 90,
+    db: Optional[Database] = None
+) -> Tuple[List[Tuple[str, str]], List[datetime], np.ndarray]:
+    """
+    Load daily mean interest per term × geo from term_daily.
+    
+    Returns:
+        (series keys, days, matrix of shape series × days with NaN gaps)
+    """
+    db = db if db is not None else get_db("analytics")
+    end_day = day_start(datetime.utcnow())
+    day_list = [end_day - timedelta(days=d) for d in range(days - 1, -1, -1)]
+    day_index = {day: i for i, day in enumerate(day_list)}
+    
+    series: Dict[Tuple[str, str], int] = {}
+    rows, cols, values = [], [], []
+    for doc in db.term_daily.find(
+        {"day": {"$gte": day_list[0]}},
+        {"term": 1, "geo": 1, "day": 1, "interest_sum": 1, "samples": 1}
+    ):
+        if not doc.get("samples"):
+            continue
+        key = (doc["term"], doc["geo"])
+        rows.append(series.setdefault(key, len(series)))
+        cols.append(day_index[doc["day"]])
+        values.append(doc["interest_sum"] / doc["samples"])
+    
+    matrix = np.full((len(series), len(day_list)), np.nan)
+    if values:
+        matrix[np.asarray(rows), np.asarray(cols)] = values
+    return list(series), day_list, matrix
+
+
+def _score_document(term: str, geo: str, day: datetime, scorer: AnomalyScorer, i: int,
+                    base: Dict[str, float]) -> Dict[str, Any]:
+    """trend_scores document for series i of a scorer."""
+    return {
+        "term": term,
+        "geo": geo,
+        "day": day,
+        **scorer.state(i),
+        "z_score": float(scorer.z[i]),
+        "abs_z": abs(float(scorer.z[i])),
+        "base": base,
+        "updated_at": datetime.utcnow()
+    }
+
+
+def rebuild_trend_scores(days: int = 90, alpha: float = DEFAULT_ALPHA, db: Optional[Database] = None) -> int:
+    """
+    Score every term × geo series from its daily history.
+    
+    Args:
+        days: History length in days
+        alpha: EWMA smoothing factor
+        
+    Returns:
+        Number of series scored
+    """
+    db = db if db is not None else get_db("ingest")
+    keys, day_list, matrix = load_interest_matrix(days, db=db)
+    if not keys:
+        return 0
+    
+    scorer = AnomalyScorer(len(keys), alpha)
+    base = scorer.snapshot()
+    last_col = np.full(len(keys), -1)
+    for col in range(matrix.shape[1]):
+        before = scorer.snapshot()
+        observed = scorer.update(matrix[:, col])
+        # Keep the state before each series' latest observation, so a later
+        # snapshot on the same day can be re-applied in O(1)
+        for name in STATE_FIELDS:
+            base[name] = np.where(observed, before[name], base[name])
+        last_col = np.where(observed, col, last_col)
+    
+    operations = []
+    for i, (term, geo) in enumerate(keys):
+        base_state = {name: base[name][i].item() for name in STATE_FIELDS}
+        doc = _score_document(term, geo, day_list[last_col[i]], scorer, i, base_state)
+        operations.append(ReplaceOne({"term": term, "geo": geo}, doc, upsert=True))
+    db.trend_scores.bulk_write(operations, ordered=False)
+    return len(keys)
+
+
+def update_trend_scores(
+    trends: Iterable[RawTrend],
+    alpha: float = DEFAULT_ALPHA,
+    db: Optional[Database] = None
+) -> None:
+    """
+    Fold newly ingested snapshots into trend_scores in O(1) per series.
+    
+    The day's observation is the term_daily mean, so repeated snapshots on
+    the same day replace that day's contribution instead of adding to it.
+    """
+    db = db if db is not None else get_db("ingest")
+    for trend in trends:
+        day = day_start(trend.pulled_at)
+        daily = db.term_daily.find_one({"term": trend.term, "geo": trend.geo, "day": day})
+        if not daily or not daily.get("samples"):
+            continue
+        value = daily["interest_sum"] / daily["samples"]
+        
+        existing = db.trend_scores.find_one({"term": trend.term, "geo": trend.geo})
+        if existing and existing["day"] > day:
+            continue  # Older than what is already scored
+        if existing and existing["day"] == day:
+            base = existing["base"]
+        elif existing:
+            base = {name: existing[name] for name in STATE_FIELDS}
+        else:
+            base = {name: 0 for name in STATE_FIELDS}
+        
+        scorer = AnomalyScorer.from_states([base], alpha)
+        scorer.update(np.array([value]))
+        db.trend_scores.replace_one(
+            {"term": trend.term, "geo": trend.geo},
+            _score_document(trend.term, trend.geo, day, scorer, 0, base),
+            upsert=True
+        )
+
+
+def anomalies_filter(cutoff: datetime, min_samples: int = 3) -> Dict[str, Any]:
+    """trend_scores filter behind get_top_anomalies."""
+    return {"day": {"$gte": cutoff}, "n": {"$gte": min_samples}}
+
+
+@cached_report(depends_on=("trend_scores",))
+def get_top_anomalies(limit: int = 10, max_age_days: int = 7, min_samples: int = 3) -> List[Dict[str, Any]]:
+    """
+    Get the term × geo series whose latest value deviates most from trend.
+    
+    Args:
+        limit: Maximum number of series
+        max_age_days: Only series observed within this many days
+        min_samples: Minimum observations before a series is scored
+        
+    Returns:
+        List of anomaly dictionaries, largest |z| first
+    """
+    db = get_db("analytics")
+    cutoff = day_start(datetime.utcnow()) - timedelta(days=max_age_days)
+    cursor = db.trend_scores.find(
+        anomalies_filter(cutoff, min_samples),
+        {"term": 1, "geo": 1, "day": 1, "last": 1, "mean": 1, "z_score": 1, "slope": 1, "n": 1}
+    ).sort("abs_z", -1).limit(limit)
+    
+    return [
+        {
+            "term": doc["term"],
+            "geo": doc["geo"],
+            "day": doc["day"].date().isoformat(),
+            "value": doc["last"],
+            "ewma": doc["mean"],
+            "z_score": doc["z_score"],
+            "slope": doc["slope"],
+            "samples": doc["n"]
+        }
+        for doc in cursor
+    ]
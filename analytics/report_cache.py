@@ -0,0 +1,195 @@
+"""Shared cache for report results with TTL, LRU eviction and data-version invalidation."""
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from storage import get_repository
+
+
+class MemoryCacheBackend:
+    """In-process LRU store."""
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= datetime.utcnow():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(entry)
+    
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = copy.deepcopy(entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class MongoCacheBackend:
+    """
+    Cross-process store in the report_cache collection.
+    
+    Lets several uvicorn workers, the CLI and the MCP server share results.
+    Expired entries are removed by a TTL index on expires_at; the least
+    recently used entries beyond max_entries are trimmed on write.
+    """
+    
+    def __init__(self, max_entries: int = 1024, collection=None):
+        if collection is None:
+            from db.mongo_client import get_db
+            from db.indexes import ensure_indexes
+            collection = get_db().report_cache
+            ensure_indexes(["report_cache"])
+        self.collection = collection
+        self.max_entries = max_entries
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        entry = self.collection.find_one_and_update(
+            {"_id": key, "expires_at": {"$gt": now}},
+            {"$set": {"last_used_at": now}}
+        )
+        return entry
+    
+    def set(self, key: str, entry: Dict[str, Any]) -> None:
+        self.collection.replace_one(
+            {"_id": key},
+            {**entry, "last_used_at": datetime.utcnow()},
+            upsert=True
+        )
+        excess = self.collection.estimated_document_count() - self.max_entries
+        if excess > 0:
+            stale = [
+                doc["_id"]
+                for doc in self.collection.find({}, {"_id": 1}).sort("last_used_at", 1).limit(excess)
+            ]
+            self.collection.delete_many({"_id": {"$in": stale}})
+    
+    def clear(self) -> None:
+        self.collection.delete_many({})
+
+
+class ReportCache:
+    """Caches report results keyed by (function, window, params)."""
+    
+    def __init__(self, backend, ttl_seconds: int = 300, window_granularity_seconds: int = 60):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.window_granularity_seconds = window_granularity_seconds
+    
+    def _normalize(self, value: Any) -> Any:
+        # Windows derived from utcnow() differ on every call; bucket them
+        if isinstance(value, datetime):
+            step = self.window_granularity_seconds
+            bucket = int(value.timestamp()) // step * step if step > 0 else value.timestamp()
+            return f"dt:{bucket}"
+        return value
+    
+    def make_key(self, name: str, params: Dict[str, Any]) -> str:
+        """Stable cache key for a function call."""
+        normalized = {k: self._normalize(v) for k, v in sorted(params.items())}
+        raw = json.dumps([name, normalized], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get_or_compute(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        depends_on: Iterable[str],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """Return a fresh cached value or compute and store it."""
+        key = self.make_key(name, params)
+        versions = get_repository().get_data_versions(depends_on)
+        
+        entry = self.backend.get(key)
+        if entry is not None and entry.get("versions") == versions:
+            return entry["value"]
+        
+        value = compute()
+        self.backend.set(key, {
+            "name": name,
+            "value": value,
+            "versions": versions,
+            "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        })
+        return value
+
+
+_cache: Optional[ReportCache] = None
+_cache_configured = False
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """
+    Get the shared report cache from environment settings.
+    
+    REPORT_CACHE_BACKEND: "memory" (default), "mongo" or "none"
+    REPORT_CACHE_TTL: Entry lifetime in seconds (default 300)
+    REPORT_CACHE_MAX_ENTRIES: LRU bound (default 256)
+    REPORT_CACHE_WINDOW_SECONDS: Window bucket size in seconds (default 60,
+        0 for exact windows; see cached_report)
+    """
+    global _cache, _cache_configured
+    if not _cache_configured:
+        backend_type = os.getenv("REPORT_CACHE_BACKEND", "memory")
+        max_entries = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))
+        ttl = int(os.getenv("REPORT_CACHE_TTL", "300"))
+        granularity = int(os.getenv("REPORT_CACHE_WINDOW_SECONDS", "60"))
+        if backend_type == "mongo":
+            _cache = ReportCache(MongoCacheBackend(max_entries), ttl, granularity)
+        elif backend_type == "memory":
+            _cache = ReportCache(MemoryCacheBackend(max_entries), ttl, granularity)
+        _cache_configured = True
+    return _cache
+
+
+def cached_report(depends_on: Tuple[str, ...]) -> Callable:
+    """
+    Cache a report function's results in the shared report cache.
+    
+    Datetime arguments are bucketed to REPORT_CACHE_WINDOW_SECONDS (60 by
+    default) in the cache key, so windows ending at utcnow() share entries.
+    A cached report can therefore cover a window up to that many seconds
+    older than the one asked for; set it to 0 for exact windows.
+    
+    Args:
+        depends_on: Collections whose data version invalidates the result
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_report_cache()
+            if cache is None:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cache.get_or_compute(
+                func.__qualname__,
+                dict(bound.arguments),
+                depends_on,
+                lambda: func(*args, **kwargs)
+            )
+        
+        return wrapper
+    return decorator
@@ -0,0 +1,197 @@
+"""
+Memory-mapped columnar snapshot of the report inputs.
+
+The term and topic reports read the term_daily and topic_daily rollups, as
+the live reports do, and notable stats read processed_signals.
+"""
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+import numpy as np
+from pymongo.database import Database
+from db.mongo_client import get_db
+
+
+DEFAULT_SNAPSHOT_PATH = "data/snapshot"
+
+# table -> (collection, numeric columns, timestamp columns, string columns)
+TABLES = {
+    "signals": (
+        "processed_signals",
+        ["value_now", "abs_value"],
+        ["created_at"],
+        ["topic", "entity", "metric", "unit", "context_sentence"]
+    ),
+    "term_daily": (
+        "term_daily",
+        ["interest_sum", "samples"],
+        ["day"],
+        ["term"]
+    ),
+    "topic_daily": (
+        "topic_daily",
+        ["count"],
+        ["day"],
+        ["topic"]
+    ),
+}
+
+
+class _StringEncoder:
+    """Dictionary-encodes strings as int32 codes."""
+    
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+    
+    def encode(self, value: Optional[str]) -> int:
+        value = value or ""
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def _to_millis(value: Optional[datetime]) -> int:
+    """Naive UTC datetime to epoch milliseconds."""
+    if value is None:
+        return 0
+    return int((value - datetime(1970, 1, 1)).total_seconds() * 1000)
+
+
+def _projection(table: str) -> Dict[str, int]:
+    """Fields a table's columns are read from."""
+    _, numeric, timestamps, strings = TABLES[table]
+    return {name: 1 for name in numeric + timestamps + strings}
+
+
+def _write_table(docs: Iterable[Dict[str, Any]], table: str, out_dir: Path) -> int:
+    """Write one table's columns; returns its row count."""
+    _, numeric, timestamps, strings = TABLES[table]
+    
+    numeric_data = {name: [] for name in numeric}
+    time_data = {name: [] for name in timestamps}
+    encoders = {name: _StringEncoder() for name in strings}
+    string_data = {name: [] for name in strings}
+    
+    rows = 0
+    for doc in docs:
+        for name in numeric:
+            value = doc.get(name)
+            if value is None and name == "abs_value":
+                value = abs(doc.get("value_now") or 0.0)
+            numeric_data[name].append(float(value or 0.0))
+        for name in timestamps:
+            time_data[name].append(_to_millis(doc.get(name)))
+        for name in strings:
+            string_data[name].append(encoders[name].encode(doc.get(name)))
+        rows += 1
+    
+    table_dir = out_dir / table
+    table_dir.mkdir(parents=True)
+    for name, values in numeric_data.items():
+        np.save(table_dir / f"{name}.npy", np.asarray(values, dtype=np.float64))
+    for name, values in time_data.items():
+        np.save(table_dir / f"{name}.npy", np.asarray(values, dtype=np.int64).view("datetime64[ms]"))
+    for name, values in string_data.items():
+        np.save(table_dir / f"{name}.npy", np.asarray(values, dtype=np.int32))
+        with open(table_dir / f"{name}.dict.json", "w") as f:
+            json.dump(encoders[name].values, f)
+    
+    return rows
+
+
+def write_snapshot(tables: Mapping[str, Iterable[Dict[str, Any]]], path: str = DEFAULT_SNAPSHOT_PATH) -> Dict[str, int]:
+    """
+    Write (or refresh) a snapshot from documents.
+    
+    The new snapshot is built next to the old one and swapped in at the end,
+    so readers never see a half-written directory.
+    
+    Args:
+        tables: Documents for every table in TABLES
+        path: Snapshot directory
+        
+    Returns:
+        Dictionary mapping table names to row counts
+    """
+    target = Path(path)
+    staging = target.with_name(target.name + ".tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    
+    rows = {table: _write_table(tables[table], table, staging) for table in TABLES}
+    with open(staging / "meta.json", "w") as f:
+        json.dump({"exported_at": datetime.utcnow().isoformat(), "rows": rows}, f)
+    
+    if target.exists():
+        old = target.with_name(target.name + ".old")
+        if old.exists():
+            shutil.rmtree(old)
+        target.rename(old)
+        staging.rename(target)
+        shutil.rmtree(old)
+    else:
+        staging.rename(target)
+    
+    return rows
+
+
+def export_snapshot(path: str = DEFAULT_SNAPSHOT_PATH, db: Optional[Database] = None) -> Dict[str, int]:
+    """
+    Write (or refresh) the columnar snapshot from MongoDB.
+    
+    Args:
+        path: Snapshot directory
+        
+    Returns:
+        Dictionary mapping table names to row counts
+    """
+    db = db if db is not None else get_db("analytics")
+    return write_snapshot({
+        table: db[collection].find({}, _projection(table)).batch_size(10000)
+        for table, (collection, _, _, _) in TABLES.items()
+    }, path)
+
+
+class SnapshotTable:
+    """Memory-mapped columns of one table; string columns stay dictionary-encoded."""
+    
+    def __init__(self, table_dir: Path):
+        self.dir = table_dir
+        self._columns: Dict[str, np.ndarray] = {}
+        self._dictionaries: Dict[str, np.ndarray] = {}
+    
+    def column(self, name: str) -> np.ndarray:
+        """Numeric, timestamp or string-code column (memory-mapped, no copy)."""
+        if name not in self._columns:
+            self._columns[name] = np.load(self.dir / f"{name}.npy", mmap_mode="r")
+        return self._columns[name]
+    
+    def dictionary(self, name: str) -> np.ndarray:
+        """Distinct values of a string column, indexed by code."""
+        if name not in self._dictionaries:
+            with open(self.dir / f"{name}.dict.json") as f:
+                self._dictionaries[name] = np.asarray(json.load(f), dtype=object)
+        return self._dictionaries[name]
+
+
+class Snapshot:
+    """A loaded columnar snapshot."""
+    
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.path = Path(path)
+        with open(self.path / "meta.json") as f:
+            self.meta = json.load(f)
+        self.signals = SnapshotTable(self.path / "signals")
+        self.term_daily = SnapshotTable(self.path / "term_daily")
+        self.topic_daily = SnapshotTable(self.path / "topic_daily")
+    
+    @property
+    def exported_at(self) -> datetime:
+        return datetime.fromisoformat(self.meta["exported_at"])
@@ -1,16 +1,84 @@
 """Analytics and reporting functions."""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
 from db.mongo_client import get_db
-from db.models import RawTrend, ProcessedSignal
+from processing.rollups import window_days
+from analytics.report_cache import cached_report
+from analytics.snapshot import Snapshot
+from storage import get_repository
 
 
-def _calculate_avg_interest(trend: RawTrend) -> float:
-    """Calculate average interest value for a trend."""
-    return trend.weekly_interest
+def _in_window(field: str, start: datetime, end: datetime) -> Dict[str, Any]:
+    """Aggregation expression: start <= $field <= end."""
+    return {"$and": [{"$gte": [f"${field}", start]}, {"$lte": [f"${field}", end]}]}
 
 
+def _growth_pct(current: str, previous: str) -> Dict[str, Any]:
+    """Aggregation expression for % growth, 100 when previous is 0 and current > 0."""
+    return {"$cond": [
+        {"$gt": [f"${previous}", 0]},
+        {"$multiply": [{"$divide": [{"$subtract": [f"${current}", f"${previous}"]}, f"${previous}"]}, 100]},
+        {"$cond": [{"$gt": [f"${current}", 0]}, 100.0, 0.0]}
+    ]}
+
+
+def _top_k_facet(key: str, facets: Dict[str, str], limit: int) -> Dict[str, Any]:
+    """$facet stage returning the top `limit` rows for each ranking field."""
+    return {"$facet": {
+        name: [{"$sort": {field: -1, key: 1}}, {"$limit": limit}]
+        for name, field in facets.items()
+    }}
+
+
+def _days_match(current: Tuple[datetime, datetime], previous: Tuple[datetime, datetime]) -> Dict[str, Any]:
+    """$match stage selecting rollup days in either window."""
+    return {"$match": {"$or": [
+        {"day": {"$gte": current[0], "$lte": current[1]}},
+        {"day": {"$gte": previous[0], "$lte": previous[1]}}
+    ]}}
+
+
+def top_terms_pipeline(
+    current_start: datetime,
+    current_end: datetime,
+    previous_start: datetime,
+    previous_end: datetime,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """term_daily aggregation behind get_top_terms."""
+    current = window_days(current_start, current_end)
+    previous = window_days(previous_start, previous_end)
+    in_current = _in_window("day", *current)
+    in_previous = _in_window("day", *previous)
+    
+    return [
+        _days_match(current, previous),
+        {"$group": {
+            "_id": "$term",
+            "current_sum": {"$sum": {"$cond": [in_current, "$interest_sum", 0.0]}},
+            "current_n": {"$sum": {"$cond": [in_current, "$samples", 0]}},
+            "previous_sum": {"$sum": {"$cond": [in_previous, "$interest_sum", 0.0]}},
+            "previous_n": {"$sum": {"$cond": [in_previous, "$samples", 0]}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "term": "$_id",
+            "avg_current": {"$cond": [
+                {"$gt": ["$current_n", 0]}, {"$divide": ["$current_sum", "$current_n"]}, 0.0
+            ]},
+            "avg_previous": {"$cond": [
+                {"$gt": ["$previous_n", 0]}, {"$divide": ["$previous_sum", "$previous_n"]}, 0.0
+            ]}
+        }},
+        {"$addFields": {"growth_pct": _growth_pct("avg_current", "avg_previous")}},
+        _top_k_facet("term", {"top_by_avg": "avg_current", "top_by_growth": "growth_pct"}, limit)
+    ]
+
+
+@cached_report(depends_on=("term_daily",))
 def get_top_terms(
     current_start: datetime,
     current_end: datetime,
@@ -21,64 +89,48 @@ def get_top_terms(
     """
     Get top terms by average interest and by growth.
     
+    Reads the term_daily rollup, so cost depends on days × terms rather than
+    raw volume. Both windows, the growth computation and the top-k sorts run
+    as one aggregation.
+    
     Returns:
         Dictionary with 'top_by_avg' and 'top_by_growth' lists
     """
-    db = get_db()
-    trends_col = db.raw_trends
-    
-    # Fetch trends in both windows
-    current_trends = list(trends_col.find({
-        "pulled_at": {"$gte": current_start, "$lte": current_end}
-    }))
-    previous_trends = list(trends_col.find({
-        "pulled_at": {"$gte": previous_start, "$lte": previous_end}
-    }))
-    
-    # Build term dictionaries
-    current_by_term: Dict[str, List[float]] = defaultdict(list)
-    previous_by_term: Dict[str, List[float]] = defaultdict(list)
-    
-    for doc in current_trends:
-        trend = RawTrend(**doc)
-        avg = _calculate_avg_interest(trend)
-        current_by_term[trend.term].append(avg)
-    
-    for doc in previous_trends:
-        trend = RawTrend(**doc)
-        avg = _calculate_avg_interest(trend)
-        previous_by_term[trend.term].append(avg)
-    
-    # Calculate averages and growth
-    term_stats = []
-    all_terms = set(current_by_term.keys()) | set(previous_by_term.keys())
-    
-    for term in all_terms:
-        current_avg = sum(current_by_term[term]) / len(current_by_term[term]) if current_by_term[term] else 0.0
-        previous_avg = sum(previous_by_term[term]) / len(previous_by_term[term]) if previous_by_term[term] else 0.0
-        
-        if previous_avg > 0:
-            growth_pct = ((current_avg - previous_avg) / previous_avg) * 100
-        else:
-            growth_pct = 100.0 if current_avg > 0 else 0.0
-        
-        term_stats.append({
-            "term": term,
-            "avg_current": current_avg,
-            "avg_previous": previous_avg,
-            "growth_pct": growth_pct
-        })
-    
-    # Sort and limit
-    top_by_avg = sorted(term_stats, key=lambda x: x["avg_current"], reverse=True)[:limit]
-    top_by_growth = sorted(term_stats, key=lambda x: x["growth_pct"], reverse=True)[:limit]
+    db = get_db("analytics")
+    pipeline = top_terms_pipeline(current_start, current_end, previous_start, previous_end, limit)
+    result = next(db.term_daily.aggregate(pipeline), {})
     
     return {
-        "top_by_avg": top_by_avg,
-        "top_by_growth": top_by_growth
+        "top_by_avg": result.get("top_by_avg", []),
+        "top_by_growth": result.get("top_by_growth", [])
     }
 
 
+def top_topics_pipeline(
+    current_start: datetime,
+    current_end: datetime,
+    previous_start: datetime,
+    previous_end: datetime,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """topic_daily aggregation behind get_top_topics."""
+    current = window_days(current_start, current_end)
+    previous = window_days(previous_start, previous_end)
+    
+    return [
+        _days_match(current, previous),
+        {"$group": {
+            "_id": "$topic",
+            "count_current": {"$sum": {"$cond": [_in_window("day", *current), "$count", 0]}},
+            "count_previous": {"$sum": {"$cond": [_in_window("day", *previous), "$count", 0]}}
+        }},
+        {"$project": {"_id": 0, "topic": "$_id", "count_current": "$count_current", "count_previous": "$count_previous"}},
+        {"$addFields": {"growth_pct": _growth_pct("count_current", "count_previous")}},
+        _top_k_facet("topic", {"top_by_count": "count_current", "top_by_growth": "growth_pct"}, limit)
+    ]
+
+
+@cached_report(depends_on=("topic_daily",))
 def get_top_topics(
     current_start: datetime,
     current_end: datetime,
@@ -89,104 +141,313 @@ def get_top_topics(
     """
     Get top topics by signal count and by growth.
     
+    Reads the topic_daily rollup, so cost depends on days × topics rather
+    than raw volume. Both windows, the growth computation and the top-k sorts
+    run as one aggregation.
+    
     Returns:
         Dictionary with 'top_by_count' and 'top_by_growth' lists
     """
-    db = get_db()
-    signals_col = db.processed_signals
-    
-    # Fetch signals in both windows
-    current_signals = list(signals_col.find({
-        "created_at": {"$gte": current_start, "$lte": current_end}
-    }))
-    previous_signals = list(signals_col.find({
-        "created_at": {"$gte": previous_start, "$lte": previous_end}
-    }))
-    
-    # Count by topic
-    current_counts: Dict[str, int] = defaultdict(int)
-    previous_counts: Dict[str, int] = defaultdict(int)
-    
-    for doc in current_signals:
-        signal = ProcessedSignal(**doc)
-        current_counts[signal.topic] += 1
-    
-    for doc in previous_signals:
-        signal = ProcessedSignal(**doc)
-        previous_counts[signal.topic] += 1
-    
-    # Calculate growth
-    topic_stats = []
-    all_topics = set(current_counts.keys()) | set(previous_counts.keys())
-    
-    for topic in all_topics:
-        current_count = current_counts[topic]
-        previous_count = previous_counts[topic]
-        
-        if previous_count > 0:
-            growth_pct = ((current_count - previous_count) / previous_count) * 100
-        else:
-            growth_pct = 100.0 if current_count > 0 else 0.0
-        
-        topic_stats.append({
-            "topic": topic,
-            "count_current": current_count,
-            "count_previous": previous_count,
-            "growth_pct": growth_pct
-        })
-    
-    # Sort and limit
-    top_by_count = sorted(topic_stats, key=lambda x: x["count_current"], reverse=True)[:limit]
-    top_by_growth = sorted(topic_stats, key=lambda x: x["growth_pct"], reverse=True)[:limit]
+    db = get_db("analytics")
+    pipeline = top_topics_pipeline(current_start, current_end, previous_start, previous_end, limit)
+    result = next(db.topic_daily.aggregate(pipeline), {})
     
     return {
-        "top_by_count": top_by_count,
-        "top_by_growth": top_by_growth
+        "top_by_count": result.get("top_by_count", []),
+        "top_by_growth": result.get("top_by_growth", [])
+    }
+
+
+def notable_stats_filter(current_start: datetime, current_end: datetime, threshold: float = 5.0) -> Dict[str, Any]:
+    """processed_signals filter behind get_notable_stats."""
+    return {
+        "created_at": {"$gte": current_start, "$lte": current_end},
+        "abs_value": {"$gte": threshold}
     }
 
 
+@cached_report(depends_on=("processed_signals",))
 def get_notable_stats(
     current_start: datetime,
     current_end: datetime,
-    threshold: float = 5.0
+    threshold: float = 5.0,
+    limit: int = 20
 ) -> List[Dict[str, Any]]:
     """
     Get notable statistics with large absolute % changes.
     
+    The threshold, sort and limit run in MongoDB on the precomputed
+    abs_value field, so only the top `limit` signals are transferred.
+    
     Args:
         current_start: Current window start
         current_end: Current window end
         threshold: Minimum absolute % change to include
+        limit: Maximum number of stats
         
     Returns:
         List of notable stat dictionaries
     """
-    db = get_db()
+    db = get_db("analytics")
     signals_col = db.processed_signals
     
-    # Fetch recent signals
-    signals = list(signals_col.find({
-        "created_at": {"$gte": current_start, "$lte": current_end}
-    }))
+    cursor = signals_col.find(
+        notable_stats_filter(current_start, current_end, threshold),
+        {
+            "topic": 1, "entity": 1, "metric": 1, "value_now": 1,
+            "unit": 1, "context_sentence": 1, "created_at": 1
+        }
+    ).sort("abs_value", -1).limit(limit)
     
-    notable = []
-    for doc in signals:
-        signal = ProcessedSignal(**doc)
-        abs_value = abs(signal.value_now)
+    return [
+        {
+            "topic": doc["topic"],
+            "entity": doc["entity"],
+            "metric": doc["metric"],
+            "value": doc["value_now"],
+            "unit": doc["unit"],
+            "context": doc["context_sentence"],
+            "created_at": doc["created_at"].isoformat()
+        }
+        for doc in cursor
+    ]
+
+
+def _window_mask(times: np.ndarray, start: datetime, end: datetime) -> np.ndarray:
+    """Boolean mask for start <= times <= end."""
+    return (times >= np.datetime64(start, "ms")) & (times <= np.datetime64(end, "ms"))
+
+
+def _days_mask(days: np.ndarray, start: datetime, end: datetime) -> np.ndarray:
+    """Boolean mask for rollup days in a window, with the same day semantics as the live reports."""
+    return _window_mask(days, *window_days(start, end))
+
+
+def _growth_array(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Vectorized % growth, 100 when previous is 0 and current > 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (current - previous) / previous * 100
+    return np.where(previous > 0, growth, np.where(current > 0, 100.0, 0.0))
+
+
+def _top_k(values: np.ndarray, keys: np.ndarray, candidates: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the `limit` largest values among candidates, ties by key."""
+    order = np.lexsort((keys[candidates], -values[candidates]))
+    return candidates[order[:limit]]
+
+
+class SnapshotBackend:
+    """
+    Answers the report functions from a columnar snapshot.
+    
+    Works on the same inputs as the live reports as of the export (the
+    term_daily and topic_daily rollups, and processed_signals for notable
+    stats), using vectorized NumPy operations over memory-mapped columns.
+    """
+    
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+    
+    def get_top_terms(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        previous_start: datetime,
+        previous_end: datetime,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Same result shape as get_top_terms."""
+        rollup = self.snapshot.term_daily
+        codes = rollup.column("term")
+        interest_sum = rollup.column("interest_sum")
+        samples = rollup.column("samples")
+        days = rollup.column("day")
+        names = rollup.dictionary("term")
+        
+        def window_avg(start, end):
+            mask = _days_mask(days, start, end)
+            sums = np.bincount(codes[mask], weights=interest_sum[mask], minlength=len(names))
+            counts = np.bincount(codes[mask], weights=samples[mask], minlength=len(names))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(counts > 0, sums / counts, 0.0), np.bincount(codes[mask], minlength=len(names))
+        
+        avg_current, rows_current = window_avg(current_start, current_end)
+        avg_previous, rows_previous = window_avg(previous_start, previous_end)
+        growth = _growth_array(avg_current, avg_previous)
+        present = np.nonzero((rows_current + rows_previous) > 0)[0]
+        keys = np.argsort(np.argsort(names))
+        
+        def rows(indices):
+            return [
+                {
+                    "term": names[i],
+                    "avg_current": float(avg_current[i]),
+                    "avg_previous": float(avg_previous[i]),
+                    "growth_pct": float(growth[i])
+                }
+                for i in indices
+            ]
+        
+        return {
+            "top_by_avg": rows(_top_k(avg_current, keys, present, limit)),
+            "top_by_growth": rows(_top_k(growth, keys, present, limit))
+        }
+    
+    def get_top_topics(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        previous_start: datetime,
+        previous_end: datetime,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Same result shape as get_top_topics."""
+        rollup = self.snapshot.topic_daily
+        codes = rollup.column("topic")
+        counts = rollup.column("count")
+        days = rollup.column("day")
+        names = rollup.dictionary("topic")
+        
+        def window_count(start, end):
+            mask = _days_mask(days, start, end)
+            return (
+                np.bincount(codes[mask], weights=counts[mask], minlength=len(names)).astype(np.int64),
+                np.bincount(codes[mask], minlength=len(names))
+            )
+        
+        count_current, rows_current = window_count(current_start, current_end)
+        count_previous, rows_previous = window_count(previous_start, previous_end)
+        growth = _growth_array(count_current.astype(np.float64), count_previous.astype(np.float64))
+        present = np.nonzero((rows_current + rows_previous) > 0)[0]
+        keys = np.argsort(np.argsort(names))
+        
+        def rows(indices):
+            return [
+                {
+                    "topic": names[i],
+                    "count_current": int(count_current[i]),
+                    "count_previous": int(count_previous[i]),
+                    "growth_pct": float(growth[i])
+                }
+                for i in indices
+            ]
+        
+        return {
+            "top_by_count": rows(_top_k(count_current, keys, present, limit)),
+            "top_by_growth": rows(_top_k(growth, keys, present, limit))
+        }
+    
+    def get_notable_stats(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        threshold: float = 5.0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Same result shape as get_notable_stats."""
+        signals = self.snapshot.signals
+        abs_value = signals.column("abs_value")
+        created_at = signals.column("created_at")
         
-        if abs_value >= threshold:
-            notable.append({
-                "topic": signal.topic,
-                "entity": signal.entity,
-                "metric": signal.metric,
-                "value": signal.value_now,
-                "unit": signal.unit,
-                "context": signal.context_sentence,
-                "created_at": signal.created_at.isoformat()
-            })
-    
-    # Sort by absolute value
-    notable.sort(key=lambda x: abs(x["value"]), reverse=True)
-    
-    return notable[:20]  # Top 20
+        mask = _window_mask(created_at, current_start, current_end) & (abs_value >= threshold)
+        matches = np.nonzero(mask)[0]
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-abs_value[matches], limit - 1)[:limit]]
+        matches = matches[np.argsort(-abs_value[matches], kind="stable")]
+        
+        def string(name, i):
+            return signals.dictionary(name)[signals.column(name)[i]]
+        
+        return [
+            {
+                "topic": string("topic", i),
+                "entity": string("entity", i),
+                "metric": string("metric", i),
+                "value": float(signals.column("value_now")[i]),
+                "unit": string("unit", i),
+                "context": string("context_sentence", i),
+                "created_at": created_at[i].astype(datetime).isoformat()
+            }
+            for i in matches
+        ]
+
+
+def weekly_windows(now: Optional[datetime] = None) -> Tuple[datetime, datetime, datetime, datetime]:
+    """
+    This week vs last week.
+    
+    Returns:
+        (current_start, current_end, previous_start, previous_end)
+    """
+    current_end = now or datetime.utcnow()
+    current_start = current_end - timedelta(days=7)
+    previous_end = current_start
+    previous_start = previous_end - timedelta(days=7)
+    return current_start, current_end, previous_start, previous_end
+
+
+@dataclass
+class WeeklyReport:
+    """All sections of the weekly report."""
+    current_start: datetime
+    current_end: datetime
+    previous_start: datetime
+    previous_end: datetime
+    terms: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    topics: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    notable: List[Dict[str, Any]] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly representation."""
+        return {
+            "current_start": self.current_start.isoformat(),
+            "current_end": self.current_end.isoformat(),
+            "previous_start": self.previous_start.isoformat(),
+            "previous_end": self.previous_end.isoformat(),
+            "terms": self.terms,
+            "topics": self.topics,
+            "notable": self.notable
+        }
 
+
+def build_weekly_report(
+    now: Optional[datetime] = None,
+    limit: int = 10,
+    threshold: float = 5.0,
+    backend: Optional[Any] = None
+) -> WeeklyReport:
+    """
+    Build the weekly report with all sections computed concurrently.
+    
+    Terms and topics come from the daily rollups (one aggregation each
+    covering both windows) and notable stats from processed_signals, so the
+    three sections are independent queries on different collections.
+    
+    Args:
+        now: End of the current window (defaults to utcnow)
+        limit: Rows per ranking
+        threshold: Minimum absolute % change for notable stats
+        backend: Object with the three report methods, e.g. a SnapshotBackend
+            (defaults to the configured storage repository)
+        
+    Returns:
+        WeeklyReport
+    """
+    current_start, current_end, previous_start, previous_end = weekly_windows(now)
+    windows = (current_start, current_end, previous_start, previous_end)
+    source = backend or get_repository()
+    
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        terms = pool.submit(source.get_top_terms, *windows, limit=limit)
+        topics = pool.submit(source.get_top_topics, *windows, limit=limit)
+        notable = pool.submit(source.get_notable_stats, current_start, current_end, threshold=threshold)
+        
+        return WeeklyReport(
+            current_start=current_start,
+            current_end=current_end,
+            previous_start=previous_start,
+            previous_end=previous_end,
+            terms=terms.result(),
+            topics=topics.result(),
+            notable=notable.result()
+        )
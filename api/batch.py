@@ -0,0 +1,41 @@
+"""
+Batch get-by-ID.
+
+POST /signals/batch, /insights/batch and /sources/articles/batch resolve up
+to MAX_BATCH_IDS ids with one $in query and answer in request order:
+results[i] is the document for ids[i], or null when no such document
+exists, and not_found lists those ids.
+"""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from api.responses import MongoJSONResponse
+from storage import get_repository
+
+MAX_BATCH_IDS = 500
+
+
+class BatchRequest(BaseModel):
+    """Body of a batch get-by-ID request."""
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
+
+def ordered_batch(ids: List[str], docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Arrange documents in request order with null for missing ids."""
+    by_id = {str(doc["_id"]): doc for doc in docs}
+    results: List[Optional[Dict[str, Any]]] = [by_id.get(i) for i in ids]
+    return {
+        "results": results,
+        "not_found": [i for i, doc in zip(ids, results) if doc is None]
+    }
+
+
+async def batch_response(collection: str, ids: List[str]) -> MongoJSONResponse:
+    """
+    Fetch documents by id with one query and respond in request order.
+
+    Args:
+        collection: Collection to read
+        ids: Requested ids, duplicates allowed
+    """
+    docs = await get_repository().get_documents_async(collection, ids)
+    return MongoJSONResponse(ordered_batch(ids, docs))
@@ -0,0 +1,103 @@
+"""
+HTTP validators for API responses.
+
+A response's ETag is derived from the data versions of the collections it
+reads (db.data_versions, bumped by every job that writes them), and its
+Last-Modified from the newest bump. A poll whose If-None-Match (or
+If-Modified-Since) still matches gets 304 Not Modified after one _id
+lookup on data_versions, without running the query or serializing a body.
+
+HTTP dates have whole seconds, and a second named by Last-Modified may have
+seen later writes. If-Modified-Since therefore only matches when the newest
+bump is strictly older than the second it names; the ETag is the exact
+validator.
+
+API_CACHE_MAX_AGE sets the Cache-Control max-age in seconds (default 0:
+clients revalidate on every request, which is cheap).
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+from db.async_client import get_async_db
+from db.data_versions import get_version_stamps_async
+from storage import get_repository, storage_backend
+
+
+def cache_control() -> str:
+    """Cache-Control value for cacheable API responses."""
+    return f"public, max-age={int(os.getenv('API_CACHE_MAX_AGE', '0'))}, must-revalidate"
+
+
+def _opaque(tag: str) -> str:
+    """Entity tag without its weak prefix (If-None-Match uses weak comparison)."""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+@dataclass
+class Validators:
+    """ETag and Last-Modified for a response."""
+    etag: str
+    last_modified: Optional[datetime]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": cache_control()}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True
+            )
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """Whether the client's cached copy is still current."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {_opaque(tag) for tag in if_none_match.split(",")}
+            return "*" in tags or _opaque(self.etag) in tags
+
+        # If-Modified-Since only counts when no If-None-Match was sent
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified.replace(tzinfo=timezone.utc) < since
+        return False
+
+    def apply(self, response: Response) -> Response:
+        """Add the validator and Cache-Control headers to a response."""
+        response.headers.update(self.headers)
+        return response
+
+    def not_modified(self) -> Response:
+        """Bodiless 304 response."""
+        return Response(status_code=304, headers=self.headers)
+
+
+async def cache_validators(*collections: str) -> Validators:
+    """
+    Validators for a response built from the given collections.
+
+    Args:
+        collections: Every collection the response reads
+
+    Returns:
+        Validators with a weak ETag over the collections' data versions
+    """
+    if storage_backend() == "mongo":
+        stamps = await get_version_stamps_async(collections, get_async_db())
+    else:
+        stamps = await run_in_threadpool(get_repository().get_version_stamps, collections)
+
+    digest = hashlib.sha1(repr(sorted(stamps.items())).encode("utf-8")).hexdigest()[:20]
+    last_modified = max((updated_at for _, updated_at in stamps.values() if updated_at), default=None)
+    return Validators(etag=f'W/"{digest}"', last_modified=last_modified)
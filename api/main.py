@@ -1,16 +1,39 @@
 """FastAPI application entry point."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.routers import insights, signals, sources
+from api.routers import insights, signals, sources, reports, exports, search
+from db.async_client import get_async_client, get_async_pool_stats, close_async_connection
+from db.mongo_client import get_pool_stats, close_connection
+from storage import storage_backend
 
-app = FastAPI(title="QuietlyStated API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the async MongoDB client on startup and close clients on shutdown."""
+    if storage_backend() == "mongo":
+        get_async_client()
+    yield
+    await close_async_connection()
+    close_connection()
+
+
+app = FastAPI(title="QuietlyStated API", version="1.0.0", lifespan=lifespan)
 
 app.include_router(insights.router, prefix="/insights", tags=["insights"])
 app.include_router(signals.router, prefix="/signals", tags=["signals"])
 app.include_router(sources.router, prefix="/sources", tags=["sources"])
+app.include_router(reports.router, prefix="/reports", tags=["reports"])
+app.include_router(exports.router, prefix="/exports", tags=["exports"])
+app.include_router(search.router, prefix="/search", tags=["search"])
 
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint."""
     return {"message": "QuietlyStated API", "version": "1.0.0"}
 
+
+@app.get("/health/pool")
+async def pool_stats():
+    """MongoDB connection pool statistics per workload client."""
+    return {**get_pool_stats(), **get_async_pool_stats()}
@@ -0,0 +1,61 @@
+"""
+Fast response path for documents the application wrote itself.
+
+Repositories project documents to their model's fields and routes
+serialize the BSON straight to JSON with orjson, skipping Pydantic
+validation. ObjectIds become strings and datetimes ISO 8601, as in
+model_dump(mode="json"), but values are sent as stored: a field missing
+from a document is left out rather than filled with its default, and
+numbers keep their stored type.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Type
+import orjson
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.responses import Response
+from db.pagination import InvalidCursor, decode_cursor, paginate
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _default(value: Any) -> Any:
+    """Encode BSON types orjson does not know."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize BSON documents to JSON bytes."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MongoJSONResponse(Response):
+    """JSON response that serializes raw MongoDB documents with orjson."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def check_cursor(cursor: Optional[str], value_type: Type = datetime) -> Optional[str]:
+    """Reject a malformed pagination cursor, or one for another sort, with 400."""
+    if cursor:
+        try:
+            decode_cursor(cursor, value_type)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cursor
+
+
+def page_response(docs: List[Dict[str, Any]], sort_field: str, limit: int) -> MongoJSONResponse:
+    """
+    Respond with a page fetched as limit + 1 documents.
+
+    The extra document only signals that more remain; the cursor for the
+    next page goes in the X-Next-Cursor header.
+    """
+    page, next_cursor = paginate(docs, sort_field, limit)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return MongoJSONResponse(page, headers=headers)
@@ -0,0 +1,78 @@
+"""Bulk export API router."""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from api.streaming import chunked, csv_lines, export_columns, ndjson_lines
+from storage import EXPORTS, get_repository
+
+router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _parse_date(name: str, value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO date filter; an export silently ignoring one would be worse than an error."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected an ISO datetime")
+    # Stored times are naive UTC
+    return parsed.replace(tzinfo=None) - parsed.utcoffset() if parsed.tzinfo else parsed
+
+
+@router.get("/{name}")
+def export(
+    name: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    topic: Optional[str] = Query(None, description="Topic (signals, insights) or group (trends)"),
+    source: Optional[str] = Query(None, description="Source origin (signals, articles, trends)"),
+    since: Optional[str] = Query(None, description="ISO datetime, inclusive"),
+    until: Optional[str] = Query(None, description="ISO datetime, exclusive"),
+    gzip: bool = Query(False, description="Send a .gz file")
+) -> StreamingResponse:
+    """
+    Stream every matching document as NDJSON or CSV.
+
+    The body is written in chunks straight from a server-side cursor, so
+    memory stays flat however many documents match. Exports: signals,
+    insights, articles (without bodies) and trends.
+
+    Args:
+        name: Export name
+        format: ndjson (one document per line) or csv (header row, nested
+            values as JSON)
+        topic: Topic filter
+        source: Source origin filter
+        since: Date field >= since
+        until: Date field < until
+        gzip: Compress the stream and send it as a .gz attachment
+    """
+    spec = EXPORTS.get(name)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export '{name}'. Use one of: {', '.join(EXPORTS)}")
+    if topic and not spec.topic_field:
+        raise HTTPException(status_code=400, detail=f"The {name} export has no topic filter")
+    if source and not spec.source_field:
+        raise HTTPException(status_code=400, detail=f"The {name} export has no source filter")
+
+    docs = get_repository().export_documents(
+        name,
+        topic=topic,
+        source=source,
+        since=_parse_date("since", since),
+        until=_parse_date("until", until)
+    )
+    if format == "csv":
+        lines = csv_lines(docs, export_columns(spec.model, exclude={"text"}))
+    else:
+        lines = ndjson_lines(docs)
+
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        chunked(lines, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
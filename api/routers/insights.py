@@ -1,20 +1,23 @@
 """Insights API router."""
 from datetime import datetime
-from typing import Optional, List
-from fastapi import APIRouter, Query
-from pymongo.collection import Collection
-from db.mongo_client import get_db
-from db.models import Insight
+from typing import Optional
+from fastapi import APIRouter, Query, Request
+from api.batch import BatchRequest, batch_response
+from api.caching import cache_validators
+from api.responses import MongoJSONResponse, check_cursor, page_response
+from storage import get_repository
 
 router = APIRouter()
 
 
-@router.get("/")
-def get_insights(
+@router.get("/", response_class=MongoJSONResponse)
+async def get_insights(
+    request: Request,
     topic: Optional[str] = Query(None, description="Filter by topic"),
     since: Optional[str] = Query(None, description="ISO datetime string"),
-    limit: int = Query(20, ge=1, le=100)
-) -> List[dict]:
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
+) -> MongoJSONResponse:
     """
     Get recent insights.
     
@@ -22,43 +25,51 @@ def get_insights(
         topic: Optional topic filter
         since: Optional datetime filter (ISO format)
         limit: Maximum number of results
+        cursor: Opaque cursor; when more results remain, the response
+            carries the next one in the X-Next-Cursor header
     """
-    db = get_db()
-    insights_col: Collection = db.insights
+    check_cursor(cursor)
+    validators = await cache_validators("insights")
+    if validators.matches(request):
+        return validators.not_modified()
     
-    query = {}
-    if topic:
-        query["topic"] = topic
+    since_dt = None
     if since:
         try:
             since_dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
-            query["created_at"] = {"$gte": since_dt}
         except ValueError:
             pass
     
-    cursor = insights_col.find(query).sort("created_at", -1).limit(limit)
+    insights = await get_repository().list_insights_async(topic, since_dt, limit + 1, cursor)
+    return validators.apply(page_response(insights, "created_at", limit))
+
+
+@router.post("/batch", response_class=MongoJSONResponse)
+async def get_insights_batch(body: BatchRequest) -> MongoJSONResponse:
+    """
+    Get several insights by ID in one query.
     
-    insights = []
-    for doc in cursor:
-        insight = Insight(**doc)
-        insights.append(insight.model_dump(by_alias=True, mode="json"))
+    Args:
+        body: {"ids": [...]}, at most MAX_BATCH_IDS
     
-    return insights
+    Returns:
+        {"results": [...], "not_found": [...]} with results in request
+        order and null for unknown IDs
+    """
+    return await batch_response("insights", body.ids)
 
 
-@router.get("/{insight_id}")
-def get_insight(insight_id: str) -> dict:
+@router.get("/{insight_id}", response_class=MongoJSONResponse)
+async def get_insight(insight_id: str, request: Request) -> MongoJSONResponse:
     """Get a specific insight by ID."""
-    from bson import ObjectId
-    
-    db = get_db()
-    insights_col: Collection = db.insights
+    validators = await cache_validators("insights")
+    if validators.matches(request):
+        return validators.not_modified()
     
-    doc = insights_col.find_one({"_id": ObjectId(insight_id)})
+    doc = await get_repository().get_insight_async(insight_id)
     if not doc:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Insight not found")
     
-    insight = Insight(**doc)
-    return insight.model_dump(by_alias=True, mode="json")
+    return validators.apply(MongoJSONResponse(doc))
 
@@ -0,0 +1,41 @@
+"""Reports API router."""
+from typing import List
+from fastapi import APIRouter, Query, HTTPException
+from analytics.trends_reports import build_weekly_report
+from analytics.anomalies import get_top_anomalies
+from storage import storage_backend
+
+router = APIRouter()
+
+
+@router.get("/weekly")
+def get_weekly_report(
+    limit: int = Query(10, ge=1, le=50),
+    threshold: float = Query(5.0, ge=0)
+) -> dict:
+    """
+    Get the weekly report comparing this week vs last week.
+    
+    Args:
+        limit: Rows per ranking
+        threshold: Minimum absolute % change for notable stats
+    """
+    report = build_weekly_report(limit=limit, threshold=threshold)
+    return report.to_dict()
+
+
+@router.get("/anomalies")
+def get_anomalies(
+    limit: int = Query(10, ge=1, le=100),
+    days: int = Query(7, ge=1, le=90, description="Only series observed in the last N days")
+) -> List[dict]:
+    """
+    Get term × geo series whose latest value deviates most from trend.
+    
+    Args:
+        limit: Maximum number of series
+        days: Only series observed in the last N days
+    """
+    if storage_backend() != "mongo":
+        raise HTTPException(status_code=501, detail="Anomaly scores require the MongoDB backend")
+    return get_top_anomalies(limit=limit, max_age_days=days)
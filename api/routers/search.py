@@ -0,0 +1,38 @@
+"""Article search API router."""
+from typing import Optional
+from fastapi import APIRouter, Query, Request
+from starlette.concurrency import run_in_threadpool
+from api.caching import cache_validators
+from api.responses import MongoJSONResponse, check_cursor, page_response
+from storage import get_repository
+
+router = APIRouter()
+
+
+@router.get("/", response_class=MongoJSONResponse)
+async def search_articles(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Words to look for in titles, bodies and data points"),
+    source: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
+) -> MongoJSONResponse:
+    """
+    Search articles, best match first.
+    
+    Articles matching any word of the query are ranked with BM25 over the
+    search index and returned without bodies, each with its "score".
+    
+    Args:
+        q: Query text
+        source: Only articles from this source
+        limit: Page size
+        cursor: Next page cursor
+    """
+    check_cursor(cursor, float)
+    validators = await cache_validators("raw_articles")
+    if validators.matches(request):
+        return validators.not_modified()
+    
+    articles = await run_in_threadpool(get_repository().search_articles, q, source, limit + 1, cursor)
+    return validators.apply(page_response(articles, "score", limit))
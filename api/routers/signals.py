@@ -1,20 +1,23 @@
 """Signals API router."""
 from datetime import datetime
-from typing import Optional, List
-from fastapi import APIRouter, Query
-from pymongo.collection import Collection
-from db.mongo_client import get_db
-from db.models import ProcessedSignal
+from typing import Optional
+from fastapi import APIRouter, Query, Request
+from api.batch import BatchRequest, batch_response
+from api.caching import cache_validators
+from api.responses import MongoJSONResponse, check_cursor, page_response
+from storage import get_repository
 
 router = APIRouter()
 
 
-@router.get("/")
-def get_signals(
+@router.get("/", response_class=MongoJSONResponse)
+async def get_signals(
+    request: Request,
     topic: Optional[str] = Query(None, description="Filter by topic"),
     since: Optional[str] = Query(None, description="ISO datetime string"),
-    limit: int = Query(50, ge=1, le=200)
-) -> List[dict]:
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
+) -> MongoJSONResponse:
     """
     Get processed signals.
     
@@ -22,43 +25,51 @@ def get_signals(
         topic: Optional topic filter
         since: Optional datetime filter (ISO format)
         limit: Maximum number of results
+        cursor: Opaque cursor; when more results remain, the response
+            carries the next one in the X-Next-Cursor header
     """
-    db = get_db()
-    signals_col: Collection = db.processed_signals
+    check_cursor(cursor)
+    validators = await cache_validators("processed_signals")
+    if validators.matches(request):
+        return validators.not_modified()
     
-    query = {}
-    if topic:
-        query["topic"] = topic
+    since_dt = None
     if since:
         try:
             since_dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
-            query["created_at"] = {"$gte": since_dt}
         except ValueError:
             pass
     
-    cursor = signals_col.find(query).sort("created_at", -1).limit(limit)
+    signals = await get_repository().list_signals_async(topic, since_dt, limit + 1, cursor)
+    return validators.apply(page_response(signals, "created_at", limit))
+
+
+@router.post("/batch", response_class=MongoJSONResponse)
+async def get_signals_batch(body: BatchRequest) -> MongoJSONResponse:
+    """
+    Get several signals by ID in one query.
     
-    signals = []
-    for doc in cursor:
-        signal = ProcessedSignal(**doc)
-        signals.append(signal.model_dump(by_alias=True, mode="json"))
+    Args:
+        body: {"ids": [...]}, at most MAX_BATCH_IDS
     
-    return signals
+    Returns:
+        {"results": [...], "not_found": [...]} with results in request
+        order and null for unknown IDs
+    """
+    return await batch_response("processed_signals", body.ids)
 
 
-@router.get("/{signal_id}")
-def get_signal(signal_id: str) -> dict:
+@router.get("/{signal_id}", response_class=MongoJSONResponse)
+async def get_signal(signal_id: str, request: Request) -> MongoJSONResponse:
     """Get a specific signal by ID."""
-    from bson import ObjectId
-    
-    db = get_db()
-    signals_col: Collection = db.processed_signals
+    validators = await cache_validators("processed_signals")
+    if validators.matches(request):
+        return validators.not_modified()
     
-    doc = signals_col.find_one({"_id": ObjectId(signal_id)})
+    doc = await get_repository().get_signal_async(signal_id)
     if not doc:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Signal not found")
     
-    signal = ProcessedSignal(**doc)
-    return signal.model_dump(by_alias=True, mode="json")
+    return validators.apply(MongoJSONResponse(doc))
 
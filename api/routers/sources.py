@@ -1,72 +1,67 @@
 """Sources API router."""
-from typing import Optional, List
-from fastapi import APIRouter, Query, HTTPException
-from pymongo.collection import Collection
+from typing import Optional
+from fastapi import APIRouter, Query, HTTPException, Request
 from bson import ObjectId
-from db.mongo_client import get_db
-from db.models import RawArticle, RawAlert, RawTrend, ProcessedSignal, Insight
+from api.batch import BatchRequest, batch_response
+from api.caching import cache_validators
+from api.responses import MongoJSONResponse, check_cursor, page_response
+from storage import get_repository
 
 router = APIRouter()
 
+# The detail view joins the article with its signals and their insights
+_ARTICLE_DETAIL_SOURCES = ("raw_articles", "processed_signals", "insights")
 
-@router.get("/articles/{article_id}")
-def get_article(article_id: str) -> dict:
+
+@router.post("/articles/batch", response_class=MongoJSONResponse)
+async def get_articles_batch(body: BatchRequest) -> MongoJSONResponse:
+    """
+    Get several articles (without bodies or joins) by ID in one query.
+    
+    Args:
+        body: {"ids": [...]}, at most MAX_BATCH_IDS
+    
+    Returns:
+        {"results": [...], "not_found": [...]} with results in request
+        order and null for unknown IDs
+    """
+    return await batch_response("raw_articles", body.ids)
+
+
+@router.get("/articles/{article_id}", response_class=MongoJSONResponse)
+async def get_article(article_id: str, request: Request) -> MongoJSONResponse:
     """
     Get article details and associated signals/insights.
     
     Args:
         article_id: Article document ID
     """
-    db = get_db()
-    articles_col: Collection = db.raw_articles
-    signals_col: Collection = db.processed_signals
-    insights_col: Collection = db.insights
+    validators = await cache_validators(*_ARTICLE_DETAIL_SOURCES)
+    if validators.matches(request):
+        return validators.not_modified()
     
-    try:
-        doc = articles_col.find_one({"_id": ObjectId(article_id)})
-    except Exception:
+    if not ObjectId.is_valid(article_id):
         raise HTTPException(status_code=400, detail="Invalid article ID")
     
-    if not doc:
+    result = await get_repository().get_article_async(article_id)
+    if not result:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    article = RawArticle(**doc)
-    result = article.model_dump(by_alias=True, mode="json")
-    
-    # Get associated signals
-    signals = list(signals_col.find({
-        "source_origin": article.source_origin,
-        "source_url": article.source_url
-    }))
-    result["signals"] = [ProcessedSignal(**s).model_dump(by_alias=True, mode="json") for s in signals]
-    
-    # Get associated insights (that reference these signals)
-    signal_ids = [s["_id"] for s in signals]
-    insights = list(insights_col.find({"signal_ids": {"$in": signal_ids}}))
-    result["insights"] = [Insight(**i).model_dump(by_alias=True, mode="json") for i in insights]
-    
-    return result
+    return validators.apply(MongoJSONResponse(result))
 
 
-@router.get("/articles")
-def list_articles(
+@router.get("/articles", response_class=MongoJSONResponse)
+async def list_articles(
+    request: Request,
     source: Optional[str] = Query(None),
-    limit: int = Query(20, ge=1, le=100)
-) -> List[dict]:
-    """List articles."""
-    db = get_db()
-    articles_col: Collection = db.raw_articles
-    
-    query = {}
-    if source:
-        query["source_origin"] = source
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page")
+) -> MongoJSONResponse:
+    """List articles, most recently published first, one page per cursor."""
+    check_cursor(cursor)
+    validators = await cache_validators("raw_articles")
+    if validators.matches(request):
+        return validators.not_modified()
     
-    cursor = articles_col.find(query).sort("published_at", -1).limit(limit)
-    
-    articles = []
-    for doc in cursor:
-        article = RawArticle(**doc)
-        articles.append(article.model_dump(by_alias=True, mode="json"))
-    
-    return articles
-
+    articles = await get_repository().list_articles_async(source, limit + 1, cursor)
+    return validators.apply(page_response(articles, "published_at", limit))
@@ -0,0 +1,85 @@
+"""
+Streaming encoders for bulk exports.
+
+Documents are encoded one at a time as NDJSON or CSV lines, gathered into
+~64 KB chunks and optionally gzip-compressed on the fly, so an export of
+any size holds one cursor batch and one chunk in memory.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Type
+from bson import ObjectId
+from pydantic import BaseModel
+from api.responses import dumps
+
+CHUNK_SIZE = 64 * 1024
+
+
+def export_columns(model: Type[BaseModel], exclude: Iterable[str] = ()) -> List[str]:
+    """CSV header: a model's (aliased) field names."""
+    skip = set(exclude)
+    return [field.alias or name for name, field in model.model_fields.items() if name not in skip]
+
+
+def ndjson_lines(docs: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """One JSON document per line."""
+    for doc in docs:
+        yield dumps(doc) + b"\n"
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a BSON value into a CSV cell (lists and objects as JSON)."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode("utf-8")
+    return value
+
+
+def csv_lines(docs: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    """A header row, then one row per document in column order."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for doc in docs:
+        writer.writerow([_csv_value(doc.get(column)) for column in columns])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Header alone when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def chunked(lines: Iterable[bytes], gzip: bool = False) -> Iterator[bytes]:
+    """
+    Group encoded lines into CHUNK_SIZE pieces, gzip-compressing when asked.
+
+    Args:
+        lines: Encoded lines
+        gzip: Emit a gzip stream instead of plain bytes
+
+    Yields:
+        Non-empty byte chunks
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+    buffer = bytearray()
+    for line in lines:
+        buffer += line
+        if len(buffer) >= CHUNK_SIZE:
+            chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+
+    tail = bytes(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
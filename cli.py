@@ -1,13 +1,13 @@
 """Command-line interface for QuietlyStated."""
 import click
 import json
-from datetime import datetime, timedelta
 from sources.google_trends import fetch_and_store_trends
 from sources.google_alerts import fetch_and_store_alerts
 from sources.blogs import fetch_and_store_articles
 from jobs.extract_signals import enrich_signals
 from jobs.aggregate_insights import aggregate_insights
-from analytics.trends_reports import get_top_terms, get_top_topics, get_notable_stats
+from analytics.trends_reports import build_weekly_report, SnapshotBackend
+from analytics.snapshot import Snapshot, DEFAULT_SNAPSHOT_PATH
 from db.mongo_client import close_connection
 from config.config_manager import ConfigManager
 
@@ -24,6 +24,12 @@ def config():
     pass
 
 
+@cli.group("db")
+def db_group():
+    """Database maintenance"""
+    pass
+
+
 @cli.command()
 def fetch_trends():
     """Fetch and store Google Trends data."""
@@ -66,6 +72,210 @@ def aggregate_insights_cmd(days):
     click.echo("Done!")
 
 
+@cli.command()
+@click.option("--source", type=click.Choice(["auto", "change-stream", "local"]), default="auto",
+              help="Event source (auto: change streams on MongoDB, else the in-process queue)")
+@click.option("--batch-size", default=100, help="Maximum documents enriched together")
+@click.option("--batch-window", default=2.0, help="Seconds to collect events after the first one")
+@click.option("--insight-interval", default=300.0, help="Minimum seconds between insight refreshes")
+@click.option("--days", default=7, help="Insight window in days")
+@click.option("--fetch-interval", default=None, type=float,
+              help="Run fetchers in-process every N seconds (default: hourly with the local queue)")
+def run_pipeline(source, batch_size, batch_window, insight_interval, days, fetch_interval):
+    """Enrich new articles and alerts as they are inserted."""
+    from jobs.run_pipeline import run_pipeline as run
+    run(
+        source=source,
+        batch_size=batch_size,
+        batch_window=batch_window,
+        insight_interval=insight_interval,
+        days=days,
+        fetch_interval=fetch_interval
+    )
+    click.echo("Pipeline stopped.")
+
+
+@cli.command()
+@click.option("--days", default=30, help="Rebuild rollups for last N days")
+def rebuild_rollups(days):
+    """Regenerate topic rollups and fill missing term rollup days."""
+    from storage import get_repository, storage_backend
+    repo = get_repository()
+    click.echo(f"Rebuilding term and topic rollups for last {days} days...")
+    repo.rebuild_rollups(days)
+    if storage_backend() == "mongo":
+        from analytics.anomalies import rebuild_trend_scores
+        scored = rebuild_trend_scores(max(days, 90))
+        repo.bump_data_version("trend_scores")
+        click.echo(f"Rescored {scored} term × geo series")
+    else:
+        click.echo("Skipped trend scores: anomaly scoring requires the MongoDB backend")
+    click.echo("Done!")
+
+
+@cli.command()
+@click.option("--limit", default=10, help="Number of series to show")
+@click.option("--days", default=7, help="Only series observed in the last N days")
+def top_anomalies(limit, days):
+    """Print term × geo series deviating most from their trend."""
+    from analytics.anomalies import get_top_anomalies
+    anomalies = get_top_anomalies(limit=limit, max_age_days=days)
+    
+    click.echo("\n🚨 TOP ANOMALIES")
+    click.echo("-" * 60)
+    if not anomalies:
+        click.echo("  No scored series yet. Run 'rebuild-rollups' or 'fetch-trends'.")
+    for i, row in enumerate(anomalies, 1):
+        click.echo(
+            f"  {i}. {row['term']} ({row['geo']}): {row['value']:.1f} vs EWMA {row['ewma']:.1f}, "
+            f"z={row['z_score']:+.2f}, slope={row['slope']:+.2f}/day"
+        )
+    click.echo()
+
+
+@cli.command()
+@click.option("--collection", default=None, help="Only this collection (default: all with an archive policy)")
+@click.option("--days", default=None, type=int, help="Override archive_after_days")
+@click.option("--config", "config_path", default="config/retention.json", help="Retention policy file")
+@click.option("--dry-run", is_flag=True, help="Count documents without archiving")
+def archive(collection, days, config_path, dry_run):
+    """Move documents past their retention window into compressed archive files."""
+    from db.retention import load_policies, archive_collection, archive_all
+    policies = load_policies(config_path)
+    if collection:
+        results = [archive_collection(collection, days=days, config=policies, dry_run=dry_run)]
+    else:
+        results = archive_all(days=days, config=policies, dry_run=dry_run)
+    
+    for result in results:
+        cutoff = result["cutoff"].strftime("%Y-%m-%d")
+        if dry_run:
+            click.echo(f"  {result['collection']}: {result['count']} documents older than {cutoff}")
+        elif result["path"]:
+            click.echo(f"  ✓ {result['collection']}: {result['count']} documents -> {result['path']}")
+        else:
+            click.echo(f"  - {result['collection']}: nothing older than {cutoff}")
+    click.echo("Done!")
+
+
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--collection", default=None, help="Target collection (default: from file name)")
+def restore(path, collection):
+    """Load an archive file back into MongoDB."""
+    from db.retention import restore_archive
+    click.echo(f"Restoring {path}...")
+    restored = restore_archive(path, collection=collection)
+    click.echo(f"✅ Restored {restored} documents")
+
+
+@cli.command()
+@click.option("--path", default=DEFAULT_SNAPSHOT_PATH, help="Snapshot directory")
+def export_snapshot(path):
+    """Write or refresh the columnar analytics snapshot."""
+    from analytics.snapshot import export_snapshot as export
+    click.echo(f"Exporting snapshot to {path}...")
+    rows = export(path)
+    for table, count in rows.items():
+        click.echo(f"  {table}: {count} rows")
+    click.echo("Done!")
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to bind")
+@click.option("--port", default=8765, help="Port to listen on")
+def serve_llm_standin(host, port):
+    """Run the deterministic local extraction server (LLM_BACKEND=http)."""
+    from processing.extraction_engine import StandInServer
+    server = StandInServer(host=host, port=port)
+    click.echo(f"Serving stand-in extraction backend on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@db_group.command("ensure-indexes")
+def db_ensure_indexes():
+    """Create every declared index (idempotent)"""
+    from db.indexes import ensure_indexes
+    from db.retention import ensure_ttl_indexes
+    created = ensure_indexes()
+    for collection, names in created.items():
+        click.echo(f"  ✓ {collection}: {', '.join(names)}")
+    for collection, seconds in ensure_ttl_indexes().items():
+        click.echo(f"  ✓ {collection}: TTL {seconds // 86400} days")
+    click.echo("✅ Indexes in place")
+
+
+@db_group.command("verify-indexes")
+def db_verify_indexes():
+    """Explain every application query and flag collection scans"""
+    from db.indexes import verify_indexes
+    results = verify_indexes()
+    failures = [r for r in results if r["collscan"]]
+    unverified = [r for r in results if r["unverified"] and not r["collscan"]]
+    
+    for result in results:
+        status = "✗" if result["collscan"] else "?" if result["unverified"] else "✓"
+        click.echo(f"  {status} {result['collection']}: {result['name']} ({' > '.join(result['stages'])})")
+    
+    if failures:
+        click.echo(f"\n❌ {len(failures)} of {len(results)} queries use COLLSCAN. Run 'db ensure-indexes'.")
+        raise SystemExit(1)
+    if unverified:
+        collections = sorted({r["collection"] for r in unverified})
+        click.echo(f"\n⚠️  {len(unverified)} of {len(results)} queries could not be checked: "
+                   f"{', '.join(collections)} missing or empty")
+        raise SystemExit(1)
+    click.echo(f"\n✅ All {len(results)} queries are index-backed")
+
+
+@db_group.command("client-settings")
+def db_client_settings():
+    """Show resolved MongoDB client settings per workload"""
+    from db.mongo_client import WORKLOADS, client_options
+    for workload in WORKLOADS:
+        click.echo(f"\n{workload}:")
+        for option, value in client_options(workload).items():
+            click.echo(f"  {option}: {value}")
+    click.echo()
+
+
+@db_group.command("migrate-article-bodies")
+@click.option("--batch-size", default=500, help="Articles moved per round trip")
+def db_migrate_article_bodies(batch_size):
+    """Move inline article text into the compressed article_bodies store"""
+    from db.article_bodies import migrate_article_bodies
+    migrated = migrate_article_bodies(batch_size=batch_size)
+    click.echo(f"✅ Moved {migrated} article bodies")
+
+
+@db_group.command("backfill-abs-value")
+def db_backfill_abs_value():
+    """Set abs_value on signals stored before it existed"""
+    from db.migrations import backfill_abs_value
+    updated = backfill_abs_value()
+    click.echo(f"✅ Updated {updated} signals")
+
+
+@db_group.command("backfill-source-doc-id")
+def db_backfill_source_doc_id():
+    """Link signals stored before source_doc_id to their article or alert"""
+    from db.migrations import backfill_source_doc_ids
+    updated = backfill_source_doc_ids()
+    click.echo(f"✅ Linked {updated} signals to their source documents")
+
+
+@db_group.command("rebuild-search-index")
+@click.option("--batch-size", default=500, help="Articles indexed per round trip")
+def db_rebuild_search_index(batch_size):
+    """Index every stored article for search from scratch"""
+    from db.search_index import rebuild_search_index
+    indexed = rebuild_search_index(batch_size=batch_size)
+    click.echo(f"✅ Indexed {indexed} articles")
+
+
 @config.command("seed")
 def config_seed():
     """Load JSON configs into MongoDB"""
@@ -154,13 +364,11 @@ def config_add_term(group, term):
 
 
 @cli.command()
-def weekly_report():
+@click.option("--snapshot", default=None, help="Answer from a columnar snapshot directory instead of MongoDB")
+def weekly_report(snapshot):
     """Print weekly report comparing this week vs last week."""
-    now = datetime.utcnow()
-    current_end = now
-    current_start = now - timedelta(days=7)
-    previous_end = current_start
-    previous_start = previous_end - timedelta(days=7)
+    backend = SnapshotBackend(Snapshot(snapshot)) if snapshot else None
+    report = build_weekly_report(backend=backend)
     
     click.echo("\n" + "="*60)
     click.echo("QUIETLYSTATED WEEKLY REPORT")
@@ -169,7 +377,7 @@ def weekly_report():
     # Top search terms
     click.echo("\n📈 TOP SEARCH TERMS")
     click.echo("-" * 60)
-    terms_data = get_top_terms(current_start, current_end, previous_start, previous_end)
+    terms_data = report.terms
     
     click.echo("\nTop by Average Interest:")
     for i, term in enumerate(terms_data["top_by_avg"][:5], 1):
@@ -182,7 +390,7 @@ def weekly_report():
     # Top topics
     click.echo("\n🏷️  TOP TOPICS")
     click.echo("-" * 60)
-    topics_data = get_top_topics(current_start, current_end, previous_start, previous_end)
+    topics_data = report.topics
     
     click.echo("\nTop by Signal Count:")
     for i, topic in enumerate(topics_data["top_by_count"][:5], 1):
@@ -195,7 +403,7 @@ def weekly_report():
     # Notable stats
     click.echo("\n📊 NOTABLE STATISTICS")
     click.echo("-" * 60)
-    notable = get_notable_stats(current_start, current_end, threshold=5.0)
+    notable = report.notable
     
     for i, stat in enumerate(notable[:5], 1):
         click.echo(f"\n  {i}. {stat['topic']} - {stat['metric']}")
@@ -0,0 +1,113 @@
+"""
+Compressed store for article bodies.
+
+raw_articles keeps titles and metadata only; the body text lives in the
+article_bodies collection, zlib-compressed and keyed by the article _id.
+Lists and scans read raw_articles with META_PROJECTION and load bodies
+only for the articles that need them.
+"""
+import zlib
+from typing import Any, Dict, Iterable, Optional
+from bson import Binary
+from pymongo import ReplaceOne
+from pymongo.database import Database
+from db.mongo_client import get_db
+
+COLLECTION = "article_bodies"
+COMPRESSION_LEVEL = 6
+
+# Projection for raw_articles reads that do not need the body
+META_PROJECTION = {"text": 0}
+
+
+def compress_body(text: str) -> Dict[str, Any]:
+    """Build the stored fields for a body."""
+    return {
+        "encoding": "zlib",
+        "length": len(text),
+        "body": Binary(zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)),
+    }
+
+
+def decompress_body(doc: Optional[Dict[str, Any]]) -> str:
+    """Recover the text from a stored body document."""
+    if not doc or not doc.get("body"):
+        return ""
+    return zlib.decompress(doc["body"]).decode("utf-8")
+
+
+def put_bodies(bodies: Dict[Any, str], db: Optional[Database] = None) -> None:
+    """
+    Store bodies for several articles.
+
+    Args:
+        bodies: Dictionary mapping article _id to body text
+        db: Database to use (defaults to get_db("ingest"))
+    """
+    if not bodies:
+        return
+    db = db if db is not None else get_db("ingest")
+    db[COLLECTION].bulk_write([
+        ReplaceOne({"_id": article_id}, compress_body(text), upsert=True)
+        for article_id, text in bodies.items()
+    ], ordered=False)
+
+
+def put_body(article_id: Any, text: str, db: Optional[Database] = None) -> None:
+    """Store the body for one article."""
+    put_bodies({article_id: text}, db=db)
+
+
+def get_bodies(article_ids: Iterable[Any], db: Optional[Database] = None) -> Dict[Any, str]:
+    """
+    Load bodies for several articles in one query.
+
+    Returns:
+        Dictionary mapping article _id to body text (missing ids omitted)
+    """
+    ids = list(article_ids)
+    if not ids:
+        return {}
+    db = db if db is not None else get_db("ingest")
+    return {doc["_id"]: decompress_body(doc) for doc in db[COLLECTION].find({"_id": {"$in": ids}})}
+
+
+def get_body(article_id: Any, db: Optional[Database] = None) -> str:
+    """Load the body for one article ("" if none is stored)."""
+    return get_bodies([article_id], db=db).get(article_id, "")
+
+
+async def get_body_async(article_id: Any, db) -> str:
+    """Load the body for one article through an async database."""
+    return decompress_body(await db[COLLECTION].find_one({"_id": article_id}))
+
+
+def migrate_article_bodies(batch_size: int = 500, db: Optional[Database] = None) -> int:
+    """
+    Move inline raw_articles.text into the body store.
+
+    Safe to re-run: only articles that still carry a text field are touched.
+
+    Args:
+        batch_size: Articles moved per round trip
+        db: Database to use (defaults to get_db("ingest"))
+
+    Returns:
+        Number of articles migrated
+    """
+    db = db if db is not None else get_db("ingest")
+    articles_col = db.raw_articles
+    migrated = 0
+
+    while True:
+        batch = list(articles_col.find({"text": {"$exists": True}}, {"text": 1}).limit(batch_size))
+        if not batch:
+            break
+        put_bodies({doc["_id"]: doc.get("text") or "" for doc in batch}, db=db)
+        articles_col.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}},
+            {"$unset": {"text": ""}}
+        )
+        migrated += len(batch)
+
+    return migrated
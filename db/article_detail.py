@@ -0,0 +1,53 @@
+"""
+Article detail as one aggregation.
+
+An article is joined with its body, the signals extracted from it (by
+processed_signals.source_doc_id) and the insights citing those signals (by
+insights.signal_ids), each $lookup answered from an index.
+"""
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from db.article_bodies import COLLECTION as BODIES_COLLECTION, META_PROJECTION, decompress_body
+
+
+def _lookup(collection: str, local: str, foreign: str, alias: str, projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    stage: Dict[str, Any] = {"from": collection, "localField": local, "foreignField": foreign, "as": alias}
+    if projection:
+        stage["pipeline"] = [{"$project": projection}]
+    return {"$lookup": stage}
+
+
+def article_detail_pipeline(
+    article_id: ObjectId,
+    article_projection: Optional[Dict[str, int]] = None,
+    signal_projection: Optional[Dict[str, int]] = None,
+    insight_projection: Optional[Dict[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation returning one article with "_body", "signals" and "insights".
+
+    Args:
+        article_id: raw_articles _id
+        article_projection: Article fields (defaults to all but a legacy inline text)
+        signal_projection: Signal fields (defaults to all)
+        insight_projection: Insight fields (defaults to all)
+
+    Returns:
+        Pipeline for raw_articles; pass its result to finish_article_detail()
+    """
+    return [
+        {"$match": {"_id": article_id}},
+        {"$project": article_projection or META_PROJECTION},
+        _lookup(BODIES_COLLECTION, "_id", "_id", "_body", None),
+        _lookup("processed_signals", "_id", "source_doc_id", "signals", signal_projection),
+        _lookup("insights", "signals._id", "signal_ids", "insights", insight_projection),
+    ]
+
+
+def finish_article_detail(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Replace the joined body document with the decompressed text."""
+    if doc is None:
+        return None
+    bodies = doc.pop("_body", [])
+    doc["text"] = decompress_body(bodies[0]) if bodies else ""
+    return doc
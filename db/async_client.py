@@ -0,0 +1,64 @@
+"""
+Async MongoDB connection helper for the API.
+
+Uses PyMongo's native asyncio client with the same workload settings as
+db/mongo_client.py. The API opens the client in its lifespan handler and
+closes it on shutdown; routes get the database with get_async_db().
+"""
+import os
+from typing import Any, Dict, Optional
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from db.mongo_client import DEFAULT_WORKLOAD, PoolStatsListener, client_options
+
+_client: Optional[AsyncMongoClient] = None
+_listener: Optional[PoolStatsListener] = None
+_options: Dict[str, Any] = {}
+
+
+def get_async_client() -> AsyncMongoClient:
+    """Get or create the async MongoDB client (api workload settings)."""
+    global _client, _listener, _options
+    if _client is None:
+        uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+        _options = client_options(DEFAULT_WORKLOAD)
+        _listener = PoolStatsListener()
+        # For MongoDB Atlas (remote), disable SSL verification if needed
+        # In production, you should use proper SSL certificates
+        if "mongodb+srv://" in uri:
+            _options["tlsAllowInvalidCertificates"] = True
+        _client = AsyncMongoClient(
+            uri, appname="quietlystated-api-async", event_listeners=[_listener], **_options
+        )
+    return _client
+
+
+def get_async_db() -> AsyncDatabase:
+    """Get the async database instance."""
+    db_name = os.getenv("MONGODB_DB_NAME", "quietlystated")
+    return get_async_client()[db_name]
+
+
+def get_async_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection pool statistics for the async client, if open."""
+    if _client is None or _listener is None:
+        return {}
+    return {
+        "api_async": {
+            **_listener.snapshot(),
+            "max_pool_size": _client.options.pool_options.max_pool_size,
+            "min_pool_size": _client.options.pool_options.min_pool_size,
+            "read_preference": _client.read_preference.mongos_mode,
+            "write_concern": _client.write_concern.document,
+            "compressors": _options.get("compressors", []),
+        }
+    }
+
+
+async def close_async_connection() -> None:
+    """Close the async MongoDB client."""
+    global _client, _listener
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _listener = None
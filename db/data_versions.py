@@ -0,0 +1,55 @@
+"""Per-collection data version counters."""
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from pymongo.database import Database
+from db.mongo_client import get_db
+
+
+def bump_data_version(*collections: str, db: Optional[Database] = None) -> None:
+    """
+    Record that the given collections changed.
+    
+    Caches keyed on these versions treat older entries as stale.
+    """
+    db = db if db is not None else get_db()
+    now = datetime.utcnow()
+    for name in collections:
+        db.data_versions.update_one(
+            {"_id": name},
+            {"$inc": {"version": 1}, "$set": {"updated_at": now}},
+            upsert=True
+        )
+
+
+def get_data_versions(collections: Iterable[str], db: Optional[Database] = None) -> Dict[str, int]:
+    """Current version of each collection (0 if never bumped)."""
+    db = db if db is not None else get_db()
+    names = list(collections)
+    versions = {name: 0 for name in names}
+    for doc in db.data_versions.find({"_id": {"$in": names}}, {"version": 1}):
+        versions[doc["_id"]] = doc.get("version", 0)
+    return versions
+
+
+def get_version_stamps(
+    collections: Iterable[str],
+    db: Optional[Database] = None
+) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """Current (version, updated_at) of each collection ((0, None) if never bumped)."""
+    db = db if db is not None else get_db()
+    names = list(collections)
+    return _stamps(names, db.data_versions.find({"_id": {"$in": names}}))
+
+
+async def get_version_stamps_async(collections: Iterable[str], db) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """get_version_stamps through an async database."""
+    names = list(collections)
+    docs = await db.data_versions.find({"_id": {"$in": names}}).to_list()
+    return _stamps(names, docs)
+
+
+def _stamps(collections: Iterable[str], docs: Iterable[dict]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    stamps: Dict[str, Tuple[int, Optional[datetime]]] = {name: (0, None) for name in collections}
+    for doc in docs:
+        stamps[doc["_id"]] = (doc.get("version", 0), doc.get("updated_at"))
+    return stamps
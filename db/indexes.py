@@ -0,0 +1,292 @@
+"""
+Index registry for MongoDB collections.
+
+INDEXES declares every index the application needs; query_shapes() builds
+a representative instance of each query the jobs, analytics, API and MCP
+server run, from the same filter and pipeline builders they call, so
+`cli.py db verify-indexes` can explain() them and flag any collection scan.
+When introducing a query, build it with a function query_shapes() can call
+too and add its shape (and, if needed, an index).
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.database import Database
+from db.mongo_client import get_db
+from db.pagination import encode_cursor, keyset_query, list_filter
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "raw_trends": [
+        IndexModel([("pulled_at", DESCENDING)], name="pulled_at"),
+        IndexModel([("term", ASCENDING), ("geo", ASCENDING), ("timeframe", ASCENDING)], name="term_geo_timeframe"),
+    ],
+    "raw_articles": [
+        IndexModel([("url", ASCENDING), ("published_at", ASCENDING)], name="url_published_at"),
+        IndexModel([("fetched_at", DESCENDING)], name="fetched_at"),
+        IndexModel([("published_at", DESCENDING), ("_id", DESCENDING)], name="published_at_id"),
+        IndexModel(
+            [("source_origin", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)],
+            name="source_origin_published_at_id"
+        ),
+    ],
+    "raw_alerts": [
+        IndexModel([("url", ASCENDING), ("published_at", ASCENDING)], name="url_published_at"),
+        IndexModel([("fetched_at", DESCENDING)], name="fetched_at"),
+    ],
+    "processed_signals": [
+        IndexModel([("created_at", DESCENDING), ("topic", ASCENDING)], name="created_at_topic"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel([("topic", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="topic_created_at_id"),
+        IndexModel([("abs_value", DESCENDING), ("created_at", ASCENDING)], name="abs_value_created_at"),
+        IndexModel(
+            [("source_origin", ASCENDING), ("source_url", ASCENDING), ("context_sentence", ASCENDING)],
+            name="source_origin_url_sentence"
+        ),
+        IndexModel([("source_doc_id", ASCENDING)], name="source_doc_id"),
+    ],
+    "insights": [
+        IndexModel(
+            [("signal_fingerprint", ASCENDING)],
+            name="signal_fingerprint",
+            unique=True,
+            partialFilterExpression={"signal_fingerprint": {"$type": "string"}}
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel([("topic", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="topic_created_at_id"),
+        IndexModel([("signal_ids", ASCENDING)], name="signal_ids"),
+    ],
+    "search_postings": [
+        # Covers the postings read of a search, with or without a source filter
+        IndexModel(
+            [("term", ASCENDING), ("source_origin", ASCENDING), ("doc_id", ASCENDING), ("tf", ASCENDING), ("dl", ASCENDING)],
+            name="term_source_origin_doc_id_tf_dl"
+        ),
+        # Later terms of a search for some articles only, and the postings of
+        # a replaced entry; one posting per term per entry
+        IndexModel([("doc_id", ASCENDING), ("term", ASCENDING), ("entry", ASCENDING)], name="doc_id_term_entry", unique=True),
+    ],
+    "term_daily": [
+        IndexModel([("term", ASCENDING), ("geo", ASCENDING), ("day", ASCENDING)], name="term_geo_day", unique=True),
+        IndexModel([("day", ASCENDING), ("term", ASCENDING)], name="day_term"),
+    ],
+    "topic_daily": [
+        IndexModel([("topic", ASCENDING), ("day", ASCENDING)], name="topic_day", unique=True),
+        IndexModel([("day", ASCENDING), ("topic", ASCENDING)], name="day_topic"),
+    ],
+    "trend_scores": [
+        IndexModel([("term", ASCENDING), ("geo", ASCENDING)], name="term_geo", unique=True),
+        IndexModel([("abs_z", DESCENDING)], name="abs_z"),
+    ],
+    "report_cache": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("last_used_at", ASCENDING)], name="last_used_at"),
+    ],
+    "config_keywords": [IndexModel([("active", ASCENDING)], name="active")],
+    "config_feeds": [IndexModel([("active", ASCENDING)], name="active")],
+    "config_topics": [IndexModel([("active", ASCENDING)], name="active")],
+}
+
+
+@dataclass
+class QueryShape:
+    """A representative query to explain()."""
+    name: str
+    collection: str
+    filter: Dict[str, Any] = field(default_factory=dict)
+    sort: Optional[Dict[str, int]] = None
+    limit: int = 0
+    pipeline: Optional[List[Dict[str, Any]]] = None  # Explain as aggregate instead of find
+
+
+def query_shapes() -> List[QueryShape]:
+    """
+    Every query used by the jobs, analytics, API and MCP server.
+    
+    Filters and pipelines come from the same builders the code calls, so a
+    change to a query changes the shape that is verified.
+    """
+    from analytics.anomalies import anomalies_filter
+    from analytics.trends_reports import (
+        notable_stats_filter, top_terms_pipeline, top_topics_pipeline, weekly_windows
+    )
+    from db.retention import archive_filter, load_policies
+    from db.search_index import entry_postings_filter, postings_filter
+    from processing.rollups import topic_daily_filter
+    from storage.base import EXPORTS, export_filter
+    
+    now = datetime.utcnow()
+    week = now - timedelta(days=7)
+    fortnight = now - timedelta(days=14)
+    windows = weekly_windows(now)
+    oid = ObjectId()
+    page_cursor = encode_cursor({"created_at": now, "_id": oid}, "created_at")
+    article_cursor = encode_cursor({"published_at": now, "_id": oid}, "published_at")
+    newest_first = {"created_at": -1, "_id": -1}
+    newest_published = {"published_at": -1, "_id": -1}
+    
+    shapes = [
+        # Ingestion upserts
+        QueryShape("trends upsert", "raw_trends", {"term": "t", "geo": "GB", "timeframe": "now 7-d"}),
+        QueryShape("articles upsert", "raw_articles", {"url": "u", "published_at": now}),
+        QueryShape("alerts upsert", "raw_alerts", {"url": "u", "published_at": now}),
+        # Enrichment
+        QueryShape("enrich articles", "raw_articles", {"fetched_at": {"$gte": week}}),
+        QueryShape("enrich alerts", "raw_alerts", {"fetched_at": {"$gte": week}}),
+        QueryShape("signal dedupe", "processed_signals",
+                   {"source_origin": "s", "source_url": "u", "context_sentence": "c"}),
+        QueryShape("topic rollup upsert", "topic_daily", {"topic": "t", "day": now, "signal_ids": {"$ne": str(oid)}}),
+        QueryShape("term rollup upsert", "term_daily", {"term": "t", "geo": "GB", "day": now}),
+        # Insights
+        QueryShape("topic rollup read", "topic_daily", topic_daily_filter(week, now)),
+        QueryShape("topic rollup read by topic", "topic_daily", topic_daily_filter(week, now, ["t"])),
+        QueryShape("insight fingerprints", "insights", {"signal_fingerprint": {"$in": ["f"]}}),
+        # Analytics
+        QueryShape("top terms", "term_daily", pipeline=top_terms_pipeline(*windows)),
+        QueryShape("top topics", "topic_daily", pipeline=top_topics_pipeline(*windows)),
+        QueryShape("notable stats", "processed_signals",
+                   notable_stats_filter(week, now), {"abs_value": -1}, 20),
+        QueryShape("interest history", "term_daily", {"day": {"$gte": fortnight}}),
+        QueryShape("trend score state", "trend_scores", {"term": "t", "geo": "GB"}),
+        QueryShape("top anomalies", "trend_scores", anomalies_filter(week), {"abs_z": -1}, 10),
+        QueryShape("rollup rebuild", "processed_signals", pipeline=[
+            {"$match": {"created_at": {"$gte": week}}}, {"$group": {"_id": "$topic"}}
+        ]),
+        QueryShape("term rollup rebuild", "raw_trends", pipeline=[
+            {"$match": {"pulled_at": {"$gte": week}}}, {"$group": {"_id": "$term"}}
+        ]),
+        # API and MCP
+        QueryShape("list insights", "insights", list_filter(), newest_first, 20),
+        QueryShape("list insights by topic", "insights", list_filter("t", week), newest_first, 20),
+        QueryShape("list insights page", "insights",
+                   keyset_query(list_filter("t"), "created_at", page_cursor), newest_first, 20),
+        QueryShape("list signals", "processed_signals", list_filter(), newest_first, 50),
+        QueryShape("list signals by topic", "processed_signals", list_filter("t", week), newest_first, 50),
+        QueryShape("list signals page", "processed_signals",
+                   keyset_query(list_filter(), "created_at", page_cursor), newest_first, 50),
+        QueryShape("list articles", "raw_articles", list_filter(), newest_published, 20),
+        QueryShape("list articles by source", "raw_articles", list_filter(source="s"), newest_published, 20),
+        QueryShape("list articles page", "raw_articles",
+                   keyset_query(list_filter(source="s"), "published_at", article_cursor), newest_published, 20),
+        # The article detail $lookup stages
+        QueryShape("article body", "article_bodies", {"_id": oid}),
+        QueryShape("article signals", "processed_signals", {"source_doc_id": oid}),
+        QueryShape("article insights", "insights", {"signal_ids": {"$in": [oid]}}),
+        # Search
+        QueryShape("search postings", "search_postings", postings_filter(["t"])),
+        QueryShape("search postings by source", "search_postings", postings_filter(["t"], "s")),
+        QueryShape("search postings of candidates", "search_postings", postings_filter(["t"], "s", [oid])),
+        QueryShape("search unindex", "search_postings", entry_postings_filter([{"_id": oid, "entry": oid}])),
+        # Config
+        QueryShape("active config", "config_keywords", {"active": True}),
+        QueryShape("active feeds", "config_feeds", {"active": True}),
+        QueryShape("active topics", "config_topics", {"active": True}),
+    ]
+    
+    # Exports over a date range, alone and with each of their filters (an
+    # export without one reads the whole collection by design)
+    for name, spec in EXPORTS.items():
+        shapes.append(QueryShape(f"export {name}", spec.collection, export_filter(spec, since=week, until=now)))
+        if spec.topic_field:
+            shapes.append(QueryShape(f"export {name} by topic", spec.collection,
+                                     export_filter(spec, topic="t", since=week, until=now)))
+        if spec.source_field:
+            shapes.append(QueryShape(f"export {name} by source", spec.collection,
+                                     export_filter(spec, source="s", since=week, until=now)))
+    
+    # Archiving
+    for collection, policy in load_policies()["policies"].items():
+        if "archive_after_days" in policy:
+            shapes.append(QueryShape(f"archive {collection}", collection, archive_filter(policy, week),
+                                     {policy["date_field"]: 1}))
+    return shapes
+
+
+def ensure_indexes(
+    collections: Optional[Iterable[str]] = None,
+    db: Optional[Database] = None
+) -> Dict[str, List[str]]:
+    """
+    Create the declared indexes. Safe to call repeatedly.
+    
+    Args:
+        collections: Collection names to cover (all declared if None)
+        db: Database to use (defaults to get_db())
+        
+    Returns:
+        Dictionary mapping collection names to index names
+    """
+    db = db if db is not None else get_db()
+    created = {}
+    for name in collections or INDEXES:
+        models = INDEXES.get(name, [])
+        if models:
+            created[name] = db[name].create_indexes(models)
+    return created
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Stage names in a winning plan, ignoring rejected plans."""
+    stages = []
+    if isinstance(plan, dict):
+        for key, value in plan.items():
+            if key == "rejectedPlans":
+                continue
+            if key == "stage" and isinstance(value, str):
+                stages.append(value)
+            else:
+                stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def explain_shape(shape: QueryShape, db: Optional[Database] = None) -> List[str]:
+    """Run explain() for a query shape and return its plan stages."""
+    db = db if db is not None else get_db()
+    if shape.pipeline is not None:
+        command = {"aggregate": shape.collection, "pipeline": shape.pipeline, "cursor": {}}
+    else:
+        command = {"find": shape.collection, "filter": shape.filter}
+        if shape.sort:
+            command["sort"] = shape.sort
+        if shape.limit:
+            command["limit"] = shape.limit
+    explain = db.command("explain", command, verbosity="queryPlanner")
+    return _plan_stages(explain)
+
+
+def verify_indexes(db: Optional[Database] = None) -> List[Dict[str, Any]]:
+    """
+    Explain every registered query shape.
+    
+    The planner answers a query on a missing or empty collection with an EOF
+    plan whatever the indexes, so such shapes are reported as unverified
+    rather than index-backed.
+    
+    Returns:
+        One dictionary per shape with name, collection, stages,
+        'collscan' set when the winning plan scans the collection and
+        'unverified' set when the collection is missing or empty
+    """
+    db = db if db is not None else get_db()
+    shapes = query_shapes()
+    existing = set(db.list_collection_names())
+    populated = {
+        name: name in existing and db[name].estimated_document_count() > 0
+        for name in {shape.collection for shape in shapes}
+    }
+    results = []
+    for shape in shapes:
+        stages = explain_shape(shape, db=db)
+        results.append({
+            "name": shape.name,
+            "collection": shape.collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "unverified": not populated[shape.collection] or stages == ["EOF"]
+        })
+    return results
@@ -0,0 +1,67 @@
+"""One-off data migrations for existing documents."""
+from typing import Optional
+from pymongo import UpdateOne
+from pymongo.database import Database
+from db.mongo_client import get_db
+from db.article_bodies import get_bodies
+
+
+def backfill_abs_value(db: Optional[Database] = None) -> int:
+    """
+    Set abs_value on processed signals stored before it existed.
+    
+    Returns:
+        Number of documents updated
+    """
+    db = db if db is not None else get_db()
+    result = db.processed_signals.update_many(
+        {"abs_value": {"$exists": False}},
+        [{"$set": {"abs_value": {"$abs": "$value_now"}}}]
+    )
+    return result.modified_count
+
+
+def backfill_source_doc_ids(db: Optional[Database] = None) -> int:
+    """
+    Set source_doc_id on processed signals stored before it existed.
+    
+    Signals only recorded their feed (source_origin + source_url), so each
+    pending signal is matched to the document of that feed whose text
+    contains its context sentence. Signals with no match are left unset.
+    
+    Returns:
+        Number of documents updated
+    """
+    db = db if db is not None else get_db("ingest")
+    feeds = db.processed_signals.aggregate([
+        {"$match": {"source_doc_id": {"$exists": False}, "source_type": {"$in": ["article", "alert"]}}},
+        {"$group": {
+            "_id": {"type": "$source_type", "origin": "$source_origin", "url": "$source_url"},
+            "signals": {"$push": {"_id": "$_id", "sentence": "$context_sentence"}}
+        }}
+    ])
+    
+    updated = 0
+    for feed in feeds:
+        key = feed["_id"]
+        pending = {s["sentence"]: s["_id"] for s in feed["signals"]}
+        query = {"source_origin": key["origin"], "source_url": key["url"]}
+        
+        if key["type"] == "article":
+            docs = list(db.raw_articles.find(query, {"_id": 1}))
+            bodies = get_bodies([doc["_id"] for doc in docs], db=db)
+            texts = ((doc["_id"], bodies.get(doc["_id"], "")) for doc in docs)
+        else:
+            texts = (
+                (doc["_id"], f"{doc.get('title', '')} {doc.get('snippet', '')}")
+                for doc in db.raw_alerts.find(query, {"title": 1, "snippet": 1})
+            )
+        
+        operations = []
+        for doc_id, text in texts:
+            for sentence in [s for s in pending if s in text]:
+                operations.append(UpdateOne({"_id": pending.pop(sentence)}, {"$set": {"source_doc_id": doc_id}}))
+        if operations:
+            updated += db.processed_signals.bulk_write(operations, ordered=False).modified_count
+    
+    return updated
@@ -1,7 +1,7 @@
 """Pydantic models for database documents."""
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Type
+from pydantic import BaseModel, Field, model_validator
 from bson import ObjectId
 
 
@@ -97,7 +97,7 @@ class RawArticle(BaseModel):
     published_at: datetime
     fetched_at: datetime = Field(default_factory=datetime.utcnow)
     author: Optional[str] = None
-    text: str
+    text: str = ""  # Stored compressed in article_bodies; loaded on demand
     tags_raw: List[str] = Field(default_factory=list)
     data_points: List[str] = Field(default_factory=list)  # Quantifiable statements
 
@@ -112,12 +112,14 @@ class ProcessedSignal(BaseModel):
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
     source_type: str  # "article" | "alert" | "trend"
     source_origin: str
-    source_url: str
+    source_url: str  # Feed URL, shared by every document of the feed
+    source_doc_id: Optional[ObjectId] = None  # _id of the raw article/alert; kept as ObjectId to join on
     topic: str
     entity: str
     metric: str
     value_now: float
     value_before: Optional[float] = None
+    abs_value: Optional[float] = None  # abs(value_now), indexed for notable-stats queries
     unit: str
     time_ref: str
     context_sentence: str
@@ -129,6 +131,11 @@ class ProcessedSignal(BaseModel):
         populate_by_name = True
         arbitrary_types_allowed = True
 
+    @model_validator(mode="after")
+    def _set_abs_value(self):
+        self.abs_value = abs(self.value_now)
+        return self
+
 
 class Insight(BaseModel):
     """Insight document model."""
@@ -139,6 +146,7 @@ class Insight(BaseModel):
     implication: str
     target_audience: str
     signal_ids: List[PyObjectId] = Field(default_factory=list)
+    signal_fingerprint: Optional[str] = None  # Hash of the sorted signal_ids
     created_at: datetime = Field(default_factory=datetime.utcnow)
     window_start: datetime
     window_end: datetime
@@ -147,3 +155,7 @@ class Insight(BaseModel):
         populate_by_name = True
         arbitrary_types_allowed = True
 
+
+def model_projection(model: Type[BaseModel]) -> Dict[str, int]:
+    """Projection limiting a document to a model's (aliased) fields."""
+    return {(field.alias or name): 1 for name, field in model.model_fields.items()}
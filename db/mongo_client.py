@@ -1,44 +1,227 @@
-"""MongoDB connection helper."""
+"""
+MongoDB connection helper.
+
+Each workload gets its own client (and connection pool) with settings tuned
+for how it uses the database:
+
+    ingest     Batch writers. Relaxed write concern (w=1), reads from primary.
+    analytics  Reports, rollups and scoring. Reads from secondaries when present.
+    api        API and MCP reads. Primary-preferred, small timeouts.
+
+Every setting can be overridden through environment variables, either for all
+workloads (MONGODB_MAX_POOL_SIZE) or for one (MONGODB_ANALYTICS_MAX_POOL_SIZE).
+"""
+import importlib.util
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, List
 from pymongo import MongoClient
 from pymongo.database import Database
+from pymongo.monitoring import ConnectionPoolListener
 from dotenv import load_dotenv
 
 load_dotenv()
 
-_client: Optional[MongoClient] = None
-_db: Optional[Database] = None
+DEFAULT_WORKLOAD = "api"
 
+# Setting name -> (MongoClient option, parser)
+_SETTINGS = {
+    "MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MIN_POOL_SIZE": ("minPoolSize", int),
+    "MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "READ_PREFERENCE": ("readPreference", str),
+    "MAX_STALENESS_SECONDS": ("maxStalenessSeconds", int),
+    "WRITE_CONCERN": ("w", lambda v: int(v) if v.isdigit() else v),
+    "JOURNAL": ("journal", lambda v: v.lower() in ("1", "true", "yes")),
+    "COMPRESSORS": ("compressors", str),
+    "ZLIB_COMPRESSION_LEVEL": ("zlibCompressionLevel", int),
+}
 
-def get_client() -> MongoClient:
-    """Get or create MongoDB client."""
-    global _client
-    if _client is None:
-        uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-        # For MongoDB Atlas (remote), disable SSL verification if needed
-        # In production, you should use proper SSL certificates
-        if "mongodb+srv://" in uri:
-            _client = MongoClient(uri, tlsAllowInvalidCertificates=True)
-        else:
-            _client = MongoClient(uri)
-    return _client
+WORKLOADS: Dict[str, Dict[str, Any]] = {
+    "ingest": {
+        "maxPoolSize": 20,
+        "serverSelectionTimeoutMS": 30000,
+        "readPreference": "primary",
+        "w": 1,
+    },
+    "analytics": {
+        "maxPoolSize": 10,
+        "socketTimeoutMS": 300000,
+        "serverSelectionTimeoutMS": 30000,
+        "readPreference": "secondaryPreferred",
+        "w": 1,
+    },
+    "api": {
+        "maxPoolSize": 50,
+        "minPoolSize": 2,
+        "connectTimeoutMS": 5000,
+        "socketTimeoutMS": 15000,
+        "serverSelectionTimeoutMS": 5000,
+        "readPreference": "primaryPreferred",
+    },
+}
 
+# Preferred order; unavailable codecs are skipped
+DEFAULT_COMPRESSORS = "zstd,snappy,zlib"
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
 
-def get_db() -> Database:
-    """Get or create database instance."""
-    global _db
-    if _db is None:
-        db_name = os.getenv("MONGODB_DB_NAME", "quietlystated")
-        _db = get_client()[db_name]
-    return _db
+_clients: Dict[str, MongoClient] = {}
+_listeners: Dict[str, "PoolStatsListener"] = {}
+_options: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
 
 
-def close_connection() -> None:
-    """Close MongoDB connection."""
-    global _client, _db
-    if _client:
-        _client.close()
-        _client = None
-        _db = None
+class PoolStatsListener(ConnectionPoolListener):
+    """Counts connection pool events for one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.pool_cleared = 0
+
+    def _inc(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def pool_cleared(self, event):
+        self._inc("pool_cleared")
+
+    def connection_created(self, event):
+        self._inc("created")
+
+    def connection_closed(self, event):
+        self._inc("closed")
+
+    def connection_checked_out(self, event):
+        self._inc("checked_out")
+
+    def connection_checked_in(self, event):
+        self._inc("checked_in")
+
+    def connection_check_out_failed(self, event):
+        self._inc("checkout_failed")
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open": self.created - self.closed,
+                "in_use": self.checked_out - self.checked_in,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checked_out,
+                "checkout_failures": self.checkout_failed,
+                "pool_clears": self.pool_cleared,
+            }
+
+
+def _available_compressors(names: str) -> List[str]:
+    """Drop compressors whose codec package is not installed."""
+    available = []
+    for name in (n.strip() for n in names.split(",")):
+        module = _COMPRESSOR_MODULES.get(name)
+        if module and importlib.util.find_spec(module) is not None:
+            available.append(name)
+    return available
+
 
+def client_options(workload: str = DEFAULT_WORKLOAD) -> Dict[str, Any]:
+    """
+    Resolve MongoClient options for a workload.
+
+    Precedence: MONGODB_<WORKLOAD>_<SETTING>, then MONGODB_<SETTING>,
+    then the WORKLOADS defaults.
+
+    Args:
+        workload: "ingest", "analytics" or "api"
+
+    Returns:
+        Keyword arguments for MongoClient
+    """
+    if workload not in WORKLOADS:
+        raise ValueError(f"Unknown workload '{workload}'. Use one of: {', '.join(WORKLOADS)}")
+
+    options = dict(WORKLOADS[workload])
+    options["compressors"] = DEFAULT_COMPRESSORS
+    for setting, (option, parse) in _SETTINGS.items():
+        value = os.getenv(f"MONGODB_{workload.upper()}_{setting}") or os.getenv(f"MONGODB_{setting}")
+        if value:
+            options[option] = parse(value)
+
+    compressors = _available_compressors(options.pop("compressors"))
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+def get_client(workload: str = DEFAULT_WORKLOAD) -> MongoClient:
+    """Get or create the MongoDB client for a workload."""
+    client = _clients.get(workload)
+    if client is not None:
+        return client
+
+    with _lock:
+        if workload not in _clients:
+            uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+            options = client_options(workload)
+            listener = PoolStatsListener()
+            # For MongoDB Atlas (remote), disable SSL verification if needed
+            # In production, you should use proper SSL certificates
+            if "mongodb+srv://" in uri:
+                options["tlsAllowInvalidCertificates"] = True
+            _clients[workload] = MongoClient(
+                uri, appname=f"quietlystated-{workload}", event_listeners=[listener], **options
+            )
+            _listeners[workload] = listener
+            _options[workload] = options
+        return _clients[workload]
+
+
+def get_db(workload: str = DEFAULT_WORKLOAD) -> Database:
+    """Get the database through the client for a workload."""
+    db_name = os.getenv("MONGODB_DB_NAME", "quietlystated")
+    return get_client(workload)[db_name]
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Connection pool statistics for every open client.
+
+    Returns:
+        Dictionary mapping workload names to pool counters and settings
+    """
+    stats = {}
+    for workload, client in list(_clients.items()):
+        pool = client.options.pool_options
+        stats[workload] = {
+            **_listeners[workload].snapshot(),
+            "max_pool_size": pool.max_pool_size,
+            "min_pool_size": pool.min_pool_size,
+            "read_preference": client.read_preference.mongos_mode,
+            "write_concern": client.write_concern.document,
+            "compressors": _options[workload].get("compressors", []),
+        }
+    return stats
+
+
+def close_connection() -> None:
+    """Close all MongoDB connections."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _listeners.clear()
+        _options.clear()
@@ -0,0 +1,107 @@
+"""
+Keyset (cursor) pagination.
+
+List endpoints sort by a date field descending with _id as the tie-breaker.
+A cursor is the (sort value, _id) of the last document on a page, encoded
+as URL-safe base64 of Extended JSON, so it is opaque to clients and keeps
+datetime and ObjectId types. The next page filters on "strictly after the
+cursor" instead of skipping, which a (sort field, _id) compound index
+answers with a single range scan: page N costs the same as page 1.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from bson import ObjectId, json_util
+from bson.errors import InvalidBSON
+
+_JSON_OPTIONS = json_util.CANONICAL_JSON_OPTIONS.with_options(tz_aware=False)
+
+
+class InvalidCursor(ValueError):
+    """Cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(doc: Dict[str, Any], sort_field: str) -> str:
+    """Cursor pointing just past a document."""
+    raw = json_util.dumps([doc[sort_field], doc["_id"]], json_options=_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    value_type: Union[Type, Tuple[Type, ...]] = (datetime, float)
+) -> Tuple[Any, Any]:
+    """
+    Decode a cursor into its (sort value, _id) pair.
+
+    The pair goes into queries as is, so anything but the types
+    encode_cursor writes (a date or score and an ObjectId or string id) is
+    rejected rather than passed on as, say, a query operator.
+
+    Args:
+        cursor: Cursor from encode_cursor
+        value_type: Accepted sort value type(s)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or holds other types
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, doc_id = json_util.loads(raw.decode("utf-8"), json_options=_JSON_OPTIONS)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, InvalidBSON):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    if not isinstance(value, value_type) or isinstance(value, bool) or not isinstance(doc_id, (ObjectId, str)):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    return value, doc_id
+
+
+def list_filter(
+    topic: Optional[str] = None,
+    since: Optional[datetime] = None,
+    source: Optional[str] = None
+) -> Dict[str, Any]:
+    """Filter of the list endpoints: topic, created_at >= since and source_origin, when given."""
+    query: Dict[str, Any] = {}
+    if topic:
+        query["topic"] = topic
+    if since:
+        query["created_at"] = {"$gte": since}
+    if source:
+        query["source_origin"] = source
+    return query
+
+
+def keyset_query(query: Dict[str, Any], sort_field: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Restrict a MongoDB filter to documents after the cursor (descending order).
+
+    Returns:
+        The filter unchanged when there is no cursor
+    """
+    if not cursor:
+        return query
+    value, doc_id = decode_cursor(cursor)
+    after = {"$or": [
+        {sort_field: {"$lt": value}},
+        {sort_field: value, "_id": {"$lt": doc_id}}
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+def keyset_sort(sort_field: str) -> List[Tuple[str, int]]:
+    """Sort specification matching keyset_query."""
+    return [(sort_field, -1), ("_id", -1)]
+
+
+def paginate(docs: List[Dict[str, Any]], sort_field: str, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Split a limit + 1 fetch into the page and the cursor for the next one.
+
+    Returns:
+        (page documents, next cursor or None on the last page)
+    """
+    if len(docs) <= limit:
+        return docs, None
+    page = docs[:limit]
+    return page, encode_cursor(page[-1], sort_field)
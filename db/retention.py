@@ -0,0 +1,225 @@
+"""
+Retention policies: TTL expiry and cold-archive tiering.
+
+Policies live in config/retention.json. A collection either expires
+documents with a TTL index ("ttl_days") or is archived ("archive_after_days"):
+documents older than the cutoff are written to a compressed JSON lines file
+(bson.json_util, zstd when installed, otherwise gzip) and then removed from
+MongoDB. restore_archive() loads a file back.
+"""
+import gzip
+import importlib.util
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional
+from bson import json_util
+from pymongo import ASCENDING, ReplaceOne
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+from db.mongo_client import get_db
+from db.article_bodies import COLLECTION as BODIES_COLLECTION, get_bodies, put_bodies
+from db.data_versions import bump_data_version
+from db.search_index import index_articles, unindex_articles
+
+DEFAULT_CONFIG_PATH = "config/retention.json"
+
+
+def load_policies(config_path: str = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+    """Load the retention configuration."""
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+
+def _compression(setting: str) -> str:
+    """Resolve "auto" to zstd when the zstandard package is installed."""
+    if setting == "auto":
+        return "zstd" if importlib.util.find_spec("zstandard") else "gzip"
+    return setting
+
+
+def _open_archive(path: Path, mode: str) -> IO[str]:
+    """Open an archive file in text mode, picking the codec from its suffix."""
+    if path.suffix == ".zst":
+        import zstandard
+        return zstandard.open(path, mode, encoding="utf-8")
+    return gzip.open(path, mode, encoding="utf-8")
+
+
+def ensure_ttl_indexes(config: Optional[Dict[str, Any]] = None, db: Optional[Database] = None) -> Dict[str, int]:
+    """
+    Create or update TTL indexes for policies with "ttl_days".
+
+    Returns:
+        Dictionary mapping collection names to expireAfterSeconds
+    """
+    config = config or load_policies()
+    db = db if db is not None else get_db()
+    applied = {}
+
+    for collection, policy in config.get("policies", {}).items():
+        if "ttl_days" not in policy:
+            continue
+        field = policy["date_field"]
+        seconds = int(policy["ttl_days"] * 86400)
+        name = f"{field}_ttl"
+        try:
+            db[collection].create_index([(field, ASCENDING)], name=name, expireAfterSeconds=seconds)
+        except OperationFailure:
+            # Index exists with a different expiry; change it in place
+            db.command("collMod", collection, index={"name": name, "expireAfterSeconds": seconds})
+        applied[collection] = seconds
+
+    return applied
+
+
+def archive_filter(policy: Dict[str, Any], cutoff: datetime) -> Dict[str, Any]:
+    """Filter selecting the documents an archive policy moves out: date field before the cutoff."""
+    return {policy["date_field"]: {"$lt": cutoff}}
+
+
+def archive_collection(
+    collection: str,
+    days: Optional[int] = None,
+    config: Optional[Dict[str, Any]] = None,
+    db: Optional[Database] = None,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Move documents older than the retention window into an archive file.
+
+    The file is fully written before anything is deleted, and only the
+    documents written to it are removed. Article bodies are folded back
+    into their articles so an archive file is self-contained.
+
+    Args:
+        collection: Collection with an archive policy
+        days: Override the policy's archive_after_days
+        config: Retention configuration (defaults to config/retention.json)
+        db: Database to use (defaults to get_db("ingest"))
+        dry_run: Count matching documents without writing or deleting
+
+    Returns:
+        Dictionary with collection, cutoff, count and path
+    """
+    config = config or load_policies()
+    db = db if db is not None else get_db("ingest")
+    policy = config["policies"][collection]
+    days = days if days is not None else policy["archive_after_days"]
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    query = archive_filter(policy, cutoff)
+    result = {"collection": collection, "cutoff": cutoff, "count": 0, "path": None}
+
+    if dry_run:
+        result["count"] = db[collection].count_documents(query)
+        return result
+
+    compression = _compression(config.get("compression", "auto"))
+    suffix = ".jsonl.zst" if compression == "zstd" else ".jsonl.gz"
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    path = Path(config.get("archive_dir", "data/archive")) / collection / f"{collection}-{stamp}{suffix}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+
+    batch_size = int(config.get("batch_size", 1000))
+    archived_ids: List[Any] = []
+    with _open_archive(partial, "wt") as out:
+        batch: List[Dict[str, Any]] = []
+        for doc in db[collection].find(query).sort(policy["date_field"], ASCENDING):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                archived_ids.extend(_write_batch(out, collection, batch, db))
+                batch = []
+        if batch:
+            archived_ids.extend(_write_batch(out, collection, batch, db))
+
+    if not archived_ids:
+        partial.unlink()
+        return result
+
+    partial.rename(path)
+    for i in range(0, len(archived_ids), batch_size):
+        ids = archived_ids[i:i + batch_size]
+        db[collection].delete_many({"_id": {"$in": ids}})
+        if collection == "raw_articles":
+            db[BODIES_COLLECTION].delete_many({"_id": {"$in": ids}})
+            unindex_articles(ids, db=db)
+
+    bump_data_version(collection, db=db)
+    result.update(count=len(archived_ids), path=str(path))
+    return result
+
+
+def _write_batch(out: IO[str], collection: str, batch: List[Dict[str, Any]], db: Database) -> List[Any]:
+    """Write documents as JSON lines and return their ids."""
+    if collection == "raw_articles":
+        bodies = get_bodies([doc["_id"] for doc in batch], db=db)
+        for doc in batch:
+            doc.setdefault("text", bodies.get(doc["_id"], ""))
+    for doc in batch:
+        out.write(json_util.dumps(doc, json_options=json_util.CANONICAL_JSON_OPTIONS))
+        out.write("\n")
+    return [doc["_id"] for doc in batch]
+
+
+def archive_all(
+    days: Optional[int] = None,
+    config: Optional[Dict[str, Any]] = None,
+    db: Optional[Database] = None,
+    dry_run: bool = False
+) -> List[Dict[str, Any]]:
+    """Archive every collection that has an archive policy."""
+    config = config or load_policies()
+    return [
+        archive_collection(name, days=days, config=config, db=db, dry_run=dry_run)
+        for name, policy in config.get("policies", {}).items()
+        if "archive_after_days" in policy
+    ]
+
+
+def restore_archive(path: str, collection: Optional[str] = None, db: Optional[Database] = None, batch_size: int = 1000) -> int:
+    """
+    Load an archive file back into MongoDB.
+
+    Documents are upserted by _id, so restoring twice is harmless.
+
+    Args:
+        path: Archive file (.jsonl.gz or .jsonl.zst)
+        collection: Target collection (defaults to the file name prefix)
+        db: Database to use (defaults to get_db("ingest"))
+        batch_size: Documents per bulk write
+
+    Returns:
+        Number of documents restored
+    """
+    db = db if db is not None else get_db("ingest")
+    archive_path = Path(path)
+    collection = collection or archive_path.name.rsplit("-", 1)[0]
+    restored = 0
+
+    def flush(batch: List[Dict[str, Any]]) -> None:
+        if collection == "raw_articles":
+            index_articles(batch, db=db)
+            put_bodies({doc["_id"]: doc.pop("text", "") or "" for doc in batch}, db=db)
+        db[collection].bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in batch],
+            ordered=False
+        )
+
+    with _open_archive(archive_path, "rt") as f:
+        batch: List[Dict[str, Any]] = []
+        for line in f:
+            if not line.strip():
+                continue
+            batch.append(json_util.loads(line))
+            if len(batch) >= batch_size:
+                flush(batch)
+                restored += len(batch)
+                batch = []
+        if batch:
+            flush(batch)
+            restored += len(batch)
+
+    if restored:
+        bump_data_version(collection, db=db)
+    return restored
@@ -0,0 +1,399 @@
+"""
+Inverted index for article search, ranked with BM25.
+
+search_postings holds one document per (term, article) with the term's
+weighted frequency in the article and the article's length; search_docs
+the entry each article is indexed under (a token tagging its postings,
+its length and its terms), so re-indexing or archiving it can take it
+back out; search_terms each term's document frequency and the highest
+frequency and shortest length among its postings, which bound the score
+the term can add; search_stats the corpus totals BM25 normalizes by.
+Articles are indexed as they are saved, and `cli.py db rebuild-search-index`
+indexes an existing archive.
+
+A query reads the postings of its most selective terms from an index that
+covers them. Once enough articles score above what the remaining terms
+could add together, those terms are only read for the articles that can
+still make the page (MaxScore), and one page of articles is loaded. Its
+cost follows how rare the query terms are rather than the archive size.
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+from db.mongo_client import get_db
+from db.article_bodies import META_PROJECTION, get_bodies
+from db.pagination import decode_cursor
+
+POSTINGS_COLLECTION = "search_postings"
+DOCS_COLLECTION = "search_docs"
+STATS_COLLECTION = "search_stats"
+TERMS_COLLECTION = "search_terms"
+CORPUS_ID = "corpus"
+
+# A title match counts three times a body match, a data point twice
+FIELD_WEIGHTS = {"title": 3, "data_points": 2, "text": 1}
+
+# BM25 term frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has
+have he her his how i if in into is it its may more most new not of on one or our out over said she
+so than that the their them there these they this to up was we were what when which who will with
+would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords or single letters."""
+    return [
+        token for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def field_tokens(doc: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Tokens of an article's title, text and data points, by field."""
+    tokens = {}
+    for field in FIELD_WEIGHTS:
+        value = doc.get(field) or ""
+        tokens[field] = tokenize(" ".join(value) if isinstance(value, list) else value)
+    return tokens
+
+
+def term_frequencies(doc: Dict[str, Any]) -> Counter:
+    """Field-weighted term counts of an article's title, text and data points."""
+    counts: Counter = Counter()
+    for field, tokens in field_tokens(doc).items():
+        for token in tokens:
+            counts[token] += FIELD_WEIGHTS[field]
+    return counts
+
+
+def bm25_idf(df: int, n: int) -> float:
+    """Inverse document frequency (never negative)."""
+    return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+def bm25(tf: float, dl: float, idf: float, avgdl: float) -> float:
+    """One term's BM25 contribution to a document's score."""
+    return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+
+
+def top_scores(scores: Dict[Any, float], limit: int, cursor: Optional[str] = None) -> List[Tuple[Any, float]]:
+    """
+    Highest (score, _id) pairs after a keyset cursor, best first.
+
+    Scores are compared exactly: a cursor stores its score as an Extended
+    JSON double, which decodes to the same float the next query recomputes.
+    """
+    ranked = ((score, doc_id) for doc_id, score in scores.items())
+    if cursor:
+        after_score, after_id = decode_cursor(cursor, float)
+        ranked = (
+            (score, doc_id) for score, doc_id in ranked
+            if score < after_score or (score == after_score and doc_id < after_id)
+        )
+    return [(doc_id, score) for score, doc_id in heapq.nlargest(limit, ranked)]
+
+
+def _page_threshold(
+    scores: Dict[Any, float], unread: float, limit: int, after: Optional[Tuple[float, Any]]
+) -> Optional[float]:
+    """
+    Lowest score the last article of the page can have: the limit-th best
+    partial score among articles sure to follow the cursor whatever the
+    unread terms add (None while there are fewer than limit of them).
+    """
+    partial = scores.values() if after is None else (s for s in scores.values() if s + unread < after[0])
+    best = heapq.nlargest(limit, partial)
+    return best[-1] if len(best) == limit else None
+
+
+def top_matches(
+    terms: List[str],
+    max_scores: Dict[str, float],
+    scored_postings: Callable[[str, Optional[List[Any]]], Iterable[Tuple[Any, float]]],
+    limit: int,
+    cursor: Optional[str] = None
+) -> List[Tuple[Any, float]]:
+    """
+    Highest (score, _id) pairs over several terms after a keyset cursor,
+    best first, without reading every posting (MaxScore).
+
+    Terms are read in decreasing order of the most they can add to a score.
+    Once limit articles score more than all unread terms together could
+    add, no article missing from the postings read so far can make the
+    page, and the unread terms are only read for articles that still can.
+
+    Args:
+        terms: Query terms
+        max_scores: Upper bound of each term's contribution to a score
+        scored_postings: (term, article ids or None for all) -> iterable of
+            (article id, the term's contribution to its score)
+        limit: Maximum pairs to return
+        cursor: encode_cursor() of the last pair of the previous page
+
+    Returns:
+        Same as top_scores() over every posting of the terms
+    """
+    after = decode_cursor(cursor, float) if cursor else None
+    order = sorted(terms, key=lambda term: (-max_scores[term], term))
+    scores: Dict[Any, float] = defaultdict(float)
+    candidates: Optional[List[Any]] = None
+    for i, term in enumerate(order):
+        unread = sum(max_scores[t] for t in order[i:])
+        threshold = _page_threshold(scores, unread, limit, after) if i else None
+        if threshold is not None and unread < threshold:
+            candidates = [doc_id for doc_id, score in scores.items() if score + unread >= threshold]
+            scores = defaultdict(float, {doc_id: scores[doc_id] for doc_id in candidates})
+        for doc_id, score in scored_postings(term, candidates):
+            scores[doc_id] += score
+    return top_scores(scores, limit, cursor)
+
+
+def postings_filter(
+    terms: List[str], source: Optional[str] = None, doc_ids: Optional[List[Any]] = None
+) -> Dict[str, Any]:
+    """search_postings filter for the postings of some terms, optionally from one source or some articles."""
+    query: Dict[str, Any] = {"term": {"$in": terms}}
+    if source:
+        query["source_origin"] = source
+    if doc_ids is not None:
+        query["doc_id"] = {"$in": doc_ids}
+    return query
+
+
+def entry_postings_filter(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """search_postings filter for the postings written under some search_docs entries."""
+    return {
+        "doc_id": {"$in": [entry["_id"] for entry in entries]},
+        "entry": {"$in": [entry["entry"] for entry in entries]}
+    }
+
+
+def _insert_ignoring_duplicates(collection: Any, docs: List[Dict[str, Any]]) -> Set[int]:
+    """
+    Insert documents, skipping those that violate a unique index.
+
+    Returns:
+        Positions in docs that were skipped as duplicates
+    """
+    if not docs:
+        return set()
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        return {err["index"] for err in errors}
+    return set()
+
+
+def _swap_entry(db: Database, doc_id: Any, entry: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Replace an article's search_docs entry with `entry`, or remove it, in
+    one atomic step.
+
+    Returns:
+        The entry it displaced, which no other writer gets back
+    """
+    if entry is None:
+        return db[DOCS_COLLECTION].find_one_and_delete({"_id": doc_id})
+    return db[DOCS_COLLECTION].find_one_and_replace({"_id": doc_id}, entry, upsert=True)
+
+
+def _remove_postings(db: Database, entries: List[Dict[str, Any]]) -> None:
+    if entries:
+        db[POSTINGS_COLLECTION].delete_many(entry_postings_filter(entries))
+
+
+def _update_stats(db: Database, added: List[Dict[str, Any]], counts: Dict[Any, Counter],
+                  removed: List[Dict[str, Any]]) -> None:
+    """Add and take out search_docs entries from the corpus totals and term statistics."""
+    db[STATS_COLLECTION].update_one(
+        {"_id": CORPUS_ID},
+        {"$inc": {"docs": len(added) - len(removed),
+                  "length": sum(entry["length"] for entry in added) - sum(entry["length"] for entry in removed)}},
+        upsert=True
+    )
+    df: Counter = Counter()
+    max_tf: Dict[str, float] = {}
+    min_dl: Dict[str, float] = {}
+    for entry in removed:
+        df.subtract(entry["terms"])
+    for entry in added:
+        for term, tf in counts[entry["_id"]].items():
+            df[term] += 1
+            max_tf[term] = max(max_tf.get(term, tf), tf)
+            min_dl[term] = min(min_dl.get(term, entry["length"]), entry["length"])
+
+    # Bounds only ever widen: they stay valid, if loose, as postings go.
+    # Upserting decrements too keeps them when a concurrent writer takes out
+    # an entry before its writer has added it.
+    updates = []
+    for term, delta in df.items():
+        update: Dict[str, Any] = {"$inc": {"df": delta}}
+        if term in max_tf:
+            update.update({"$max": {"max_tf": max_tf[term]}, "$min": {"min_dl": min_dl[term]}})
+        elif not delta:
+            continue
+        updates.append(UpdateOne({"_id": term}, update, upsert=True))
+    if updates:
+        db[TERMS_COLLECTION].bulk_write(updates, ordered=False)
+
+
+def unindex_articles(article_ids: Iterable[Any], db: Optional[Database] = None) -> int:
+    """
+    Remove articles from the index.
+
+    Returns:
+        Number of articles that were indexed
+    """
+    db = db if db is not None else get_db("ingest")
+    removed = [entry for entry in (_swap_entry(db, doc_id) for doc_id in dict.fromkeys(article_ids)) if entry]
+    if not removed:
+        return 0
+    _remove_postings(db, removed)
+    _update_stats(db, [], {}, removed)
+    return len(removed)
+
+
+def index_articles(articles: Iterable[Dict[str, Any]], db: Optional[Database] = None) -> int:
+    """
+    Add articles to the index, replacing any earlier entry for them.
+
+    Each article's search_docs entry is swapped for a new one in a single
+    atomic step, and its postings are tagged with the new entry. Whoever
+    displaces an entry, re-indexing or unindexing, is the only writer that
+    gets it back, so it deletes that entry's postings and takes it out of
+    the totals exactly once. A writer whose entry was displaced while it
+    was writing deletes its own postings afterwards.
+
+    Args:
+        articles: Documents with _id, title, text, data_points and source_origin
+        db: Database to use (defaults to get_db("ingest"))
+
+    Returns:
+        Number of articles indexed
+    """
+    db = db if db is not None else get_db("ingest")
+    docs = {doc["_id"]: doc for doc in articles}
+    if not docs:
+        return 0
+
+    counts = {doc_id: term_frequencies(doc) for doc_id, doc in docs.items()}
+    entries = [
+        {"_id": doc_id, "entry": ObjectId(), "length": sum(terms.values()), "terms": list(terms)}
+        for doc_id, terms in counts.items()
+    ]
+    replaced = [old for old in (_swap_entry(db, entry["_id"], entry) for entry in entries) if old]
+    _remove_postings(db, replaced)
+
+    postings = [
+        {"term": term, "doc_id": entry["_id"], "entry": entry["entry"],
+         "source_origin": docs[entry["_id"]].get("source_origin"), "tf": tf, "dl": entry["length"]}
+        for entry in entries
+        for term, tf in counts[entry["_id"]].items()
+    ]
+    _insert_ignoring_duplicates(db[POSTINGS_COLLECTION], postings)
+    _update_stats(db, entries, counts, replaced)
+
+    # A concurrent writer may have displaced an entry before its postings
+    # were written, and so missed them
+    current = {doc["entry"] for doc in db[DOCS_COLLECTION].find({"_id": {"$in": list(docs)}}, {"entry": 1})}
+    displaced = [entry for entry in entries if entry["entry"] not in current]
+    _remove_postings(db, displaced)
+    return len(entries) - len(displaced)
+
+
+def search_articles(
+    query: str,
+    source: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Optional[Database] = None
+) -> List[Dict[str, Any]]:
+    """
+    Articles matching any query term, best BM25 score first.
+
+    Args:
+        query: Free text
+        source: Only articles from this source_origin
+        limit: Maximum articles to return
+        cursor: encode_cursor() of the last article of the previous page
+            (sort field "score")
+        db: Database to use (defaults to get_db())
+
+    Returns:
+        Article documents without bodies, each with its "score"
+    """
+    db = db if db is not None else get_db()
+    terms = list(dict.fromkeys(tokenize(query)))
+    stats = db[STATS_COLLECTION].find_one({"_id": CORPUS_ID}) or {}
+    n = stats.get("docs", 0)
+    if not terms or n <= 0:
+        return []
+    avgdl = stats["length"] / n or 1.0
+
+    stats_by_term = {
+        doc["_id"]: doc for doc in db[TERMS_COLLECTION].find({"_id": {"$in": terms}}) if doc.get("df", 0) > 0
+    }
+    terms = [term for term in terms if term in stats_by_term]
+    idf = {term: bm25_idf(stats_by_term[term]["df"], n) for term in terms}
+    max_scores = {
+        term: bm25(stats_by_term[term]["max_tf"], stats_by_term[term]["min_dl"], idf[term], avgdl) for term in terms
+    }
+    projection = {"_id": 0, "doc_id": 1, "tf": 1, "dl": 1}
+
+    def scored_postings(term: str, doc_ids: Optional[List[Any]]) -> Iterable[Tuple[Any, float]]:
+        for posting in db[POSTINGS_COLLECTION].find(postings_filter([term], source, doc_ids), projection):
+            yield posting["doc_id"], bm25(posting["tf"], posting["dl"], idf[term], avgdl)
+
+    ranked = top_matches(terms, max_scores, scored_postings, limit, cursor)
+    found = {
+        doc["_id"]: doc
+        for doc in db.raw_articles.find({"_id": {"$in": [doc_id for doc_id, _ in ranked]}}, META_PROJECTION)
+    }
+    # Archived articles leave the index with their documents; skip any stragglers
+    return [dict(found[doc_id], score=score) for doc_id, score in ranked if doc_id in found]
+
+
+def rebuild_search_index(batch_size: int = 500, db: Optional[Database] = None) -> int:
+    """
+    Index every stored article from scratch.
+
+    Returns:
+        Number of articles indexed
+    """
+    db = db if db is not None else get_db("ingest")
+    for name in (POSTINGS_COLLECTION, DOCS_COLLECTION, STATS_COLLECTION, TERMS_COLLECTION):
+        db[name].delete_many({})
+
+    indexed = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> int:
+        bodies = get_bodies([doc["_id"] for doc in batch], db=db)
+        for doc in batch:
+            doc.setdefault("text", bodies.get(doc["_id"], ""))
+        return index_articles(batch, db=db)
+
+    for doc in db.raw_articles.find({}, {"title": 1, "text": 1, "data_points": 1, "source_origin": 1}):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            indexed += flush()
+            batch = []
+    if batch:
+        indexed += flush()
+    return indexed
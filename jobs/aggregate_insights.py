@@ -1,42 +1,45 @@
 """Job script to aggregate insights from signals."""
 import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+from typing import Iterable, Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from db.mongo_client import get_db
-from processing.llm_insights import generate_insights_for_window
+from processing.llm_insights import generate_insights_for_days
+from storage import Repository, get_repository
 
 
-def aggregate_insights(days: int = 7) -> None:
+def aggregate_insights(
+    days: int = 7,
+    topics: Optional[Iterable[str]] = None,
+    repo: Optional[Repository] = None
+) -> int:
     """
     Generate insights for a time window.
     
+    Reads the per-topic daily rollup; topic groups whose signal set is
+    unchanged since the last run are skipped.
+    
     Args:
-        days: Number of days to look back
+        days: Number of days to look back (including today)
+        topics: Only regenerate these topics (defaults to all)
+        repo: Repository to use (defaults to get_repository())
+        
+    Returns:
+        Number of insights generated
     """
-    db = get_db()
-    insights_col = db.insights
-    
-    end = datetime.utcnow()
-    start = end - timedelta(days=days)
+    repo = repo or get_repository()
+    repo.ensure_schema(["topic_daily", "insights"])
     
-    insights = generate_insights_for_window(start, end)
+    insights = generate_insights_for_days(days, repo=repo, topics=topics)
     
-    for insight in insights:
-        # Check if insight already exists
-        existing = insights_col.find_one({
-            "topic": insight.topic,
-            "window_start": insight.window_start,
-            "window_end": insight.window_end
-        })
-        
-        if not existing:
-            insights_col.insert_one(insight.model_dump(by_alias=True))
+    # Insert unless another run stored the same signal set meanwhile
+    repo.save_insights(insights)
+    if insights:
+        repo.bump_data_version("insights")
+    return len(insights)
 
 
 if __name__ == "__main__":
     aggregate_insights()
-
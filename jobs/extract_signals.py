@@ -2,49 +2,56 @@
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from db.mongo_client import get_db
-from db.models import RawArticle, RawAlert
 from processing.topic_tagger import tag_topics
-from processing.llm_signals import process_article, process_alert
+from processing.llm_signals import process_documents
 from processing.bias_checker import BiasChecker
+from db.models import RawArticle, RawAlert
+from storage import Repository, get_repository
 
 
-def enrich_signals(days_back: int = 7) -> None:
+def _main_topic(text: str) -> str:
+    """Most common topic in a text, or "general"."""
+    topics = tag_topics(text)
+    return max(topics.items(), key=lambda x: x[1])[0] if topics else "general"
+
+
+def enrich_documents(
+    articles: Iterable[RawArticle],
+    alerts: Iterable[RawAlert],
+    repo: Optional[Repository] = None,
+    bias_checker: Optional[BiasChecker] = None
+) -> Dict[str, Any]:
     """
-    Extract signals from raw articles and alerts.
+    Extract and store signals for specific raw documents.
+    
+    Used by the batch job for a time window and by the event-driven
+    pipeline for just the newly inserted documents.
     
     Args:
-        days_back: Process documents from last N days
+        articles: Articles with bodies loaded
+        alerts: Alerts
+        repo: Repository to write to (defaults to get_repository())
+        bias_checker: Bias filter (a new BiasChecker by default)
+        
+    Returns:
+        Dictionary with total, biased and saved (the inserted signals)
     """
-    db = get_db()
-    articles_col = db.raw_articles
-    alerts_col = db.raw_alerts
-    signals_col = db.processed_signals
-    bias_checker = BiasChecker()
+    repo = repo or get_repository()
+    bias_checker = bias_checker or BiasChecker()
     
-    cutoff = datetime.utcnow() - timedelta(days=days_back)
+    # Tag articles and alerts, then extract all of them in one engine pass
+    items = [(article, _main_topic(article.text)) for article in articles]
+    items.extend((alert, _main_topic(f"{alert.title} {alert.snippet}")) for alert in alerts)
     
     total_signals = 0
     biased_signals = 0
-    saved_signals = 0
-    
-    # Process articles
-    articles = list(articles_col.find({
-        "fetched_at": {"$gte": cutoff}
-    }))
-    
-    for doc in articles:
-        article = RawArticle(**doc)
-        topics = tag_topics(article.text)
-        
-        # Use most common topic or default
-        topic = max(topics.items(), key=lambda x: x[1])[0] if topics else "general"
-        
-        signals = process_article(article, topic)
+    candidates = []
+    for signals in process_documents(items):
         total_signals += len(signals)
         
         for signal in signals:
@@ -57,57 +64,36 @@ def enrich_signals(days_back: int = 7) -> None:
                 biased_signals += 1
                 continue
             
-            # Check if signal already exists
-            existing = signals_col.find_one({
-                "source_origin": signal.source_origin,
-                "source_url": signal.source_url,
-                "context_sentence": signal.context_sentence
-            })
-            
-            if not existing:
-                signals_col.insert_one(signal.model_dump(by_alias=True))
-                saved_signals += 1
+            candidates.append(signal)
     
-    # Process alerts
-    alerts = list(alerts_col.find({
-        "fetched_at": {"$gte": cutoff}
-    }))
+    # Insert signals not already stored; rollups are kept in step
+    saved = repo.save_new_signals(candidates)
+    if saved:
+        repo.bump_data_version("processed_signals", "topic_daily")
     
-    for doc in alerts:
-        alert = RawAlert(**doc)
-        text = f"{alert.title} {alert.snippet}"
-        topics = tag_topics(text)
-        
-        topic = max(topics.items(), key=lambda x: x[1])[0] if topics else "general"
-        
-        signals = process_alert(alert, topic)
-        total_signals += len(signals)
-        
-        for signal in signals:
-            # Filter out biased signals
-            if bias_checker.is_biased(
-                source_origin=signal.source_origin,
-                topic=signal.topic,
-                text=signal.context_sentence
-            ):
-                biased_signals += 1
-                continue
-            
-            existing = signals_col.find_one({
-                "source_origin": signal.source_origin,
-                "source_url": signal.source_url,
-                "context_sentence": signal.context_sentence
-            })
-            
-            if not existing:
-                signals_col.insert_one(signal.model_dump(by_alias=True))
-                saved_signals += 1
+    return {"total": total_signals, "biased": biased_signals, "saved": saved}
+
+
+def enrich_signals(days_back: int = 7) -> None:
+    """
+    Extract signals from raw articles and alerts.
+    
+    Args:
+        days_back: Process documents from last N days
+    """
+    repo = get_repository()
+    repo.ensure_schema(["processed_signals", "topic_daily"])
+    
+    cutoff = datetime.utcnow() - timedelta(days=days_back)
+    result = enrich_documents(repo.articles_since(cutoff), repo.alerts_since(cutoff), repo=repo)
+    total_signals = result["total"]
+    biased_signals = result["biased"]
     
     # Print summary
     print(f"\n📊 Signal Extraction Summary:")
     print(f"  Total signals extracted: {total_signals}")
     print(f"  Biased signals filtered: {biased_signals}")
-    print(f"  New signals saved: {saved_signals}")
+    print(f"  New signals saved: {len(result['saved'])}")
     if biased_signals > 0:
         bias_pct = (biased_signals / total_signals * 100) if total_signals > 0 else 0
         print(f"  Bias filter rate: {bias_pct:.1f}%")
@@ -115,4 +101,3 @@ def enrich_signals(days_back: int = 7) -> None:
 
 if __name__ == "__main__":
     enrich_signals()
-
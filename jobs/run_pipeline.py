@@ -0,0 +1,171 @@
+"""Job script for the event-driven pipeline: enrich new documents as they arrive."""
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo.errors import ConnectionFailure
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from processing.bias_checker import BiasChecker
+from processing.events import Event, open_source
+from processing.extraction_engine import ExtractionError
+from storage import Repository, get_repository
+from jobs.extract_signals import enrich_documents
+from jobs.aggregate_insights import aggregate_insights
+
+# Seconds before retrying a failed batch, doubling up to the maximum
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+# Attempts per batch before its documents are tried one by one and skipped
+MAX_ATTEMPTS = 5
+# Errors worth retrying: the extraction backend or the database was unreachable
+TRANSIENT_ERRORS = (ExtractionError, ConnectionFailure, ConnectionError, TimeoutError)
+
+
+def process_events(events: List[Event], repo: Repository, bias_checker: Optional[BiasChecker] = None) -> Dict[str, Any]:
+    """
+    Enrich the documents behind a batch of insert events.
+
+    Args:
+        events: (collection, _id) pairs
+        repo: Repository to read from and write to
+        bias_checker: Bias filter (a new BiasChecker by default)
+
+    Returns:
+        Result of enrich_documents for the batch
+    """
+    ids: Dict[str, List[Any]] = {"raw_articles": [], "raw_alerts": []}
+    for collection, doc_id in events:
+        ids[collection].append(doc_id)
+
+    articles = repo.get_articles(ids["raw_articles"]) if ids["raw_articles"] else []
+    alerts = repo.get_alerts(ids["raw_alerts"]) if ids["raw_alerts"] else []
+    return enrich_documents(articles, alerts, repo=repo, bias_checker=bias_checker)
+
+
+def process_separately(events: List[Event], repo: Repository, bias_checker: Optional[BiasChecker] = None) -> Dict[str, Any]:
+    """
+    Enrich a batch that keeps failing one document at a time, skipping the
+    documents that still fail.
+
+    Args:
+        events: (collection, _id) pairs
+        repo: Repository to read from and write to
+        bias_checker: Bias filter (a new BiasChecker by default)
+
+    Returns:
+        Dict with the saved signals and the skipped events
+    """
+    saved, skipped = [], []
+    for event in events:
+        try:
+            saved.extend(process_events([event], repo, bias_checker)["saved"])
+        except Exception as e:
+            print(f"Skipping {event[0]} {event[1]}: {e}")
+            skipped.append(event)
+    return {"saved": saved, "skipped": skipped}
+
+
+def _fetch_loop(interval: float, stop: threading.Event) -> None:
+    """Run the alert and article fetchers every `interval` seconds."""
+    from sources.google_alerts import fetch_and_store_alerts
+    from sources.blogs import fetch_and_store_articles
+
+    while not stop.is_set():
+        for fetch in (fetch_and_store_alerts, fetch_and_store_articles):
+            try:
+                fetch()
+            except Exception as e:
+                print(f"Error in {fetch.__name__}: {e}")
+        stop.wait(interval)
+
+
+def run_pipeline(
+    source: str = "auto",
+    batch_size: int = 100,
+    batch_window: float = 2.0,
+    insight_interval: float = 300.0,
+    days: int = 7,
+    fetch_interval: Optional[float] = None,
+    stop: Optional[threading.Event] = None
+) -> None:
+    """
+    Enrich newly inserted articles and alerts, then refresh insights for
+    the topics that gained signals.
+
+    Args:
+        source: Event source: "auto", "change-stream" or "local"
+        batch_size: Maximum documents enriched together
+        batch_window: Seconds to keep collecting after the first event
+        insight_interval: Minimum seconds between insight refreshes
+        days: Insight window in days (including today)
+        fetch_interval: Run the fetchers in-process every N seconds
+            (defaults to hourly with the local queue, off with change streams)
+        stop: Event that ends the loop when set (Ctrl+C also stops it)
+    """
+    repo = get_repository()
+    repo.ensure_schema(["processed_signals", "topic_daily", "insights"])
+    events = open_source(source)
+    stop = stop or threading.Event()
+    bias_checker = BiasChecker()
+
+    if fetch_interval is None and events.name == "local":
+        fetch_interval = 3600
+    if fetch_interval:
+        threading.Thread(target=_fetch_loop, args=(fetch_interval, stop), daemon=True).start()
+
+    print(f"Pipeline listening for new documents ({events.name})...")
+    dirty_topics: Set[str] = set()
+    last_refresh = float("-inf")
+    pending: List[Event] = []
+    retry_delay = 0.0
+    attempts = 0
+
+    def refresh_insights() -> None:
+        count = aggregate_insights(days, topics=sorted(dirty_topics), repo=repo)
+        print(f"  {count} insights generated for {len(dirty_topics)} topics")
+        dirty_topics.clear()
+
+    try:
+        while not stop.is_set():
+            batch = pending or events.next_batch(batch_size, batch_window)
+            if batch:
+                started = time.monotonic()
+                try:
+                    result = process_events(batch, repo, bias_checker)
+                except Exception as e:
+                    attempts += 1
+                    if isinstance(e, TRANSIENT_ERRORS) and attempts < MAX_ATTEMPTS:
+                        # Keep the batch and the resume token, and retry the same documents
+                        retry_delay = min(max(retry_delay * 2, RETRY_DELAY), MAX_RETRY_DELAY)
+                        print(f"Error enriching {len(batch)} documents: {e} (retrying in {retry_delay:.0f}s)")
+                        pending = batch
+                        stop.wait(retry_delay)
+                        continue
+                    print(f"Error enriching {len(batch)} documents: {e} (giving up after {attempts} attempts)")
+                    result = process_separately(batch, repo, bias_checker)
+                    print(f"  skipped {len(result['skipped'])} of {len(batch)} documents")
+                pending, retry_delay, attempts = [], 0.0, 0
+                events.commit()
+                dirty_topics.update(signal.topic for signal in result["saved"])
+                print(f"  {len(batch)} documents -> {len(result['saved'])} new signals "
+                      f"({time.monotonic() - started:.1f}s)")
+
+            if dirty_topics and time.monotonic() - last_refresh >= insight_interval:
+                refresh_insights()
+                last_refresh = time.monotonic()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        events.close()
+        if dirty_topics:
+            refresh_insights()
+
+
+if __name__ == "__main__":
+    run_pipeline()
@@ -4,16 +4,18 @@ import json
 import sys
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
-from db.mongo_client import get_db
 from db.models import Insight, ProcessedSignal, RawArticle, RawTrend
-from analytics.trends_reports import get_top_terms, get_top_topics, get_notable_stats
+from analytics.trends_reports import build_weekly_report, weekly_windows
+from analytics.anomalies import get_top_anomalies
+from db.pagination import paginate
+from storage import get_repository
 
 
 class MCPServer:
     """Model Context Protocol server for QuietlyStated."""
     
     def __init__(self):
-        self.db = get_db()
+        self.repo = get_repository()
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle MCP JSON-RPC request."""
@@ -51,14 +53,14 @@ class MCPServer:
                         },
                         {
                             "name": "get_insights",
-                            "description": "Get recent insights. Optional params: topic (string), limit (number), days (number)",
+                            "description": "Get recent insights. Optional params: topic (string), limit (number), days (number), cursor (string, from the previous page)",
                             "inputSchema": {
                                 "type": "object"
                             }
                         },
                         {
                             "name": "get_signals",
-                            "description": "Get processed signals. Optional params: topic (string), limit (number), days (number)",
+                            "description": "Get processed signals. Optional params: topic (string), limit (number), days (number), cursor (string, from the previous page)",
                             "inputSchema": {
                                 "type": "object"
                             }
@@ -84,9 +86,16 @@ class MCPServer:
                                 "type": "object"
                             }
                         },
+                        {
+                            "name": "get_top_anomalies",
+                            "description": "Get search terms deviating most from their trend (EWMA z-score). Optional params: limit (number), days (number)",
+                            "inputSchema": {
+                                "type": "object"
+                            }
+                        },
                         {
                             "name": "search_articles",
-                            "description": "Search articles. Optional params: keyword (string), source (string), limit (number)",
+                            "description": "Search articles, best match first (BM25 over titles, bodies and data points). Optional params: keyword (string), source (string), limit (number), cursor (string, from the previous page)",
                             "inputSchema": {
                                 "type": "object"
                             }
@@ -122,13 +131,15 @@ class MCPServer:
             text_result = await self._get_insights(
                 topic=arguments.get("topic"),
                 limit=int(arguments.get("limit", 10)),
-                days=int(arguments.get("days", 7))
+                days=int(arguments.get("days", 7)),
+                cursor=arguments.get("cursor")
             )
         elif tool_name == "get_signals":
             text_result = await self._get_signals(
                 topic=arguments.get("topic"),
                 limit=int(arguments.get("limit", 20)),
-                days=int(arguments.get("days", 7))
+                days=int(arguments.get("days", 7)),
+                cursor=arguments.get("cursor")
             )
         elif tool_name == "get_weekly_report":
             text_result = await self._get_weekly_report()
@@ -138,11 +149,17 @@ class MCPServer:
             text_result = await self._get_top_topics(limit=int(arguments.get("limit", 10)))
         elif tool_name == "get_notable_stats":
             text_result = await self._get_notable_stats(threshold=float(arguments.get("threshold", 5.0)))
+        elif tool_name == "get_top_anomalies":
+            text_result = await self._get_top_anomalies(
+                limit=int(arguments.get("limit", 10)),
+                days=int(arguments.get("days", 7))
+            )
         elif tool_name == "search_articles":
             text_result = await self._search_articles(
                 keyword=arguments.get("keyword"),
                 source=arguments.get("source"),
-                limit=int(arguments.get("limit", 10))
+                limit=int(arguments.get("limit", 10)),
+                cursor=arguments.get("cursor")
             )
         else:
             raise ValueError(f"Unknown tool: {tool_name}")
@@ -157,14 +174,12 @@ class MCPServer:
             ]
         }
     
-    async def _get_insights(self, topic: Optional[str], limit: int, days: int) -> str:
-        """Get insights formatted as readable text."""
+    async def _get_insights(self, topic: Optional[str], limit: int, days: int, cursor: Optional[str] = None) -> str:
+        """Get insights formatted as readable text, one page per cursor."""
         cutoff = datetime.utcnow() - timedelta(days=days)
-        query = {"created_at": {"$gte": cutoff}}
-        if topic:
-            query["topic"] = topic
-        
-        insights = list(self.db.insights.find(query).sort("created_at", -1).limit(limit))
+        insights, next_cursor = paginate(
+            self.repo.list_insights(topic=topic, since=cutoff, limit=limit + 1, cursor=cursor), "created_at", limit
+        )
         
         if not insights:
             return f"No insights found in the last {days} days" + (f" for topic '{topic}'" if topic else "")
@@ -178,16 +193,16 @@ class MCPServer:
             if insight.get('target_audience'):
                 lines.append(f"   For: {insight.get('target_audience')}")
         
+        if next_cursor:
+            lines.append(f"\nMore insights available: call again with cursor=\"{next_cursor}\"")
         return "\n".join(lines)
     
-    async def _get_signals(self, topic: Optional[str], limit: int, days: int) -> str:
-        """Get processed signals formatted as text."""
+    async def _get_signals(self, topic: Optional[str], limit: int, days: int, cursor: Optional[str] = None) -> str:
+        """Get processed signals formatted as text, one page per cursor."""
         cutoff = datetime.utcnow() - timedelta(days=days)
-        query = {"created_at": {"$gte": cutoff}}
-        if topic:
-            query["topic"] = topic
-        
-        signals = list(self.db.processed_signals.find(query).sort("created_at", -1).limit(limit))
+        signals, next_cursor = paginate(
+            self.repo.list_signals(topic=topic, since=cutoff, limit=limit + 1, cursor=cursor), "created_at", limit
+        )
         
         if not signals:
             return f"No signals found in the last {days} days" + (f" for topic '{topic}'" if topic else "")
@@ -205,23 +220,20 @@ class MCPServer:
             if context:
                 lines.append(f"   Context: {context[:150]}...")
         
+        if next_cursor:
+            lines.append(f"\nMore signals available: call again with cursor=\"{next_cursor}\"")
         return "\n".join(lines)
     
     async def _get_weekly_report(self) -> str:
         """Get weekly comparison report formatted as text."""
-        now = datetime.utcnow()
-        current_end = now
-        current_start = now - timedelta(days=7)
-        previous_end = current_start
-        previous_start = previous_end - timedelta(days=7)
-        
-        terms = get_top_terms(current_start, current_end, previous_start, previous_end, limit=10)
-        topics = get_top_topics(current_start, current_end, previous_start, previous_end, limit=10)
-        stats = get_notable_stats(current_start, current_end, threshold=5.0)
+        report = build_weekly_report(limit=10, threshold=5.0, backend=self.repo)
+        terms = report.terms
+        topics = report.topics
+        stats = report.notable
         
         lines = ["📊 **WEEKLY REPORT**\n"]
-        lines.append(f"Current Week: {current_start.strftime('%Y-%m-%d')} to {current_end.strftime('%Y-%m-%d')}")
-        lines.append(f"Previous Week: {previous_start.strftime('%Y-%m-%d')} to {previous_end.strftime('%Y-%m-%d')}\n")
+        lines.append(f"Current Week: {report.current_start.strftime('%Y-%m-%d')} to {report.current_end.strftime('%Y-%m-%d')}")
+        lines.append(f"Previous Week: {report.previous_start.strftime('%Y-%m-%d')} to {report.previous_end.strftime('%Y-%m-%d')}\n")
         
         lines.append("\n🔥 **TOP TERMS BY INTEREST:**")
         for i, term in enumerate(terms["top_by_avg"][:5], 1):
@@ -244,13 +256,7 @@ class MCPServer:
     
     async def _get_top_terms(self, limit: int) -> str:
         """Get top search terms formatted as text."""
-        now = datetime.utcnow()
-        current_end = now
-        current_start = now - timedelta(days=7)
-        previous_end = current_start
-        previous_start = previous_end - timedelta(days=7)
-        
-        terms = get_top_terms(current_start, current_end, previous_start, previous_end, limit=limit)
+        terms = self.repo.get_top_terms(*weekly_windows(), limit=limit)
         
         lines = [f"🔍 **TOP {limit} SEARCH TERMS**\n"]
         lines.append("**By Interest:**")
@@ -266,13 +272,7 @@ class MCPServer:
     
     async def _get_top_topics(self, limit: int) -> str:
         """Get top topics formatted as text."""
-        now = datetime.utcnow()
-        current_end = now
-        current_start = now - timedelta(days=7)
-        previous_end = current_start
-        previous_start = previous_end - timedelta(days=7)
-        
-        topics = get_top_topics(current_start, current_end, previous_start, previous_end, limit=limit)
+        topics = self.repo.get_top_topics(*weekly_windows(), limit=limit)
         
         lines = [f"🏷️  **TOP {limit} TOPICS**\n"]
         lines.append("**By Count:**")
@@ -288,11 +288,8 @@ class MCPServer:
     
     async def _get_notable_stats(self, threshold: float) -> str:
         """Get notable statistics formatted as text."""
-        now = datetime.utcnow()
-        current_end = now
-        current_start = now - timedelta(days=7)
-        
-        stats = get_notable_stats(current_start, current_end, threshold=threshold)
+        current_start, current_end, _, _ = weekly_windows()
+        stats = self.repo.get_notable_stats(current_start, current_end, threshold=threshold)
         
         if not stats:
             return f"No notable stats found with threshold >= {threshold}"
@@ -312,19 +309,33 @@ class MCPServer:
         
         return "\n".join(lines)
     
-    async def _search_articles(self, keyword: Optional[str], source: Optional[str], limit: int) -> str:
-        """Search articles formatted as text."""
-        query = {}
-        if source:
-            query["source_origin"] = source
+    async def _get_top_anomalies(self, limit: int, days: int) -> str:
+        """Get top trend anomalies formatted as text."""
+        if self.repo.name != "mongo":
+            return "Trend anomaly scores require the MongoDB storage backend"
+        anomalies = get_top_anomalies(limit=limit, max_age_days=days)
+        
+        if not anomalies:
+            return f"No scored trend series observed in the last {days} days"
         
-        articles = list(self.db.raw_articles.find(query).sort("published_at", -1).limit(limit))
+        lines = [f"🚨 **TOP {limit} TREND ANOMALIES**\n"]
+        for i, row in enumerate(anomalies, 1):
+            lines.append(f"{i}. {row['term']} ({row['geo']}): {row['value']:.1f} vs EWMA {row['ewma']:.1f}")
+            lines.append(f"   z-score: {row['z_score']:+.2f} | slope: {row['slope']:+.2f}/day | samples: {row['samples']}")
         
+        return "\n".join(lines)
+    
+    async def _search_articles(self, keyword: Optional[str], source: Optional[str], limit: int,
+                               cursor: Optional[str] = None) -> str:
+        """Search articles formatted as text, ranked by relevance, one page per cursor."""
         if keyword:
-            articles = [
-                a for a in articles
-                if keyword.lower() in a.get("title", "").lower() or keyword.lower() in a.get("text", "").lower()
-            ][:limit]
+            articles, next_cursor = paginate(
+                self.repo.search_articles(keyword, source=source, limit=limit + 1, cursor=cursor), "score", limit
+            )
+        else:
+            articles, next_cursor = paginate(
+                self.repo.list_articles(source=source, limit=limit + 1, cursor=cursor), "published_at", limit
+            )
         
         if not articles:
             filters = []
@@ -345,13 +356,16 @@ class MCPServer:
             data_points = article.get("data_points", [])
             
             lines.append(f"\n{i}. **{title}**")
-            lines.append(f"   Source: {source_name} | Date: {date_str}")
+            relevance = f" | Score: {article['score']:.2f}" if "score" in article else ""
+            lines.append(f"   Source: {source_name} | Date: {date_str}{relevance}")
             lines.append(f"   URL: {url}")
             if data_points:
                 lines.append(f"   Key Data:")
                 for dp in data_points[:2]:
                     lines.append(f"   • {dp[:100]}...")
         
+        if next_cursor:
+            lines.append(f"\nMore articles available: call again with cursor=\"{next_cursor}\"")
         return "\n".join(lines)
 
 
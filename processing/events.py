@@ -0,0 +1,144 @@
+"""
+Insert events for newly ingested raw documents.
+
+The event-driven pipeline (`cli.py run-pipeline`) consumes
+(collection, _id) events for raw_articles and raw_alerts from one of two
+sources:
+
+    ChangeStreamSource  MongoDB change streams. Needs a replica set (a
+                        single-node one is enough). The resume token is
+                        stored in pipeline_state, so a restart continues
+                        where the last processed batch ended.
+    LocalQueueSource    In-process queue that repositories publish to when
+                        they insert a new document. Used with the embedded
+                        SQLite backend or a standalone MongoDB server; the
+                        fetchers must run in the same process.
+"""
+import queue
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+from db.mongo_client import get_db
+
+WATCHED = ("raw_articles", "raw_alerts")
+STATE_COLLECTION = "pipeline_state"
+
+Event = Tuple[str, Any]
+
+_queue: "queue.Queue[Event]" = queue.Queue()
+_local_events = False
+
+
+def enable_local_events(enabled: bool = True) -> None:
+    """Start (or stop) collecting insert events in the in-process queue."""
+    global _local_events
+    _local_events = enabled
+
+
+def publish(collection: str, doc_id: Any) -> None:
+    """Record that a new document was inserted (no-op unless enabled)."""
+    if _local_events and collection in WATCHED:
+        _queue.put((collection, doc_id))
+
+
+def _collect(next_event, max_size: int, window: float, timeout: float) -> List[Event]:
+    """
+    Gather a batch: wait up to `timeout` for a first event, then keep
+    collecting for `window` seconds or until `max_size` events.
+    """
+    events: List[Event] = []
+    deadline = time.monotonic() + timeout
+    while len(events) < max_size and time.monotonic() < deadline:
+        event = next_event(max(0.0, deadline - time.monotonic()))
+        if event is None:
+            continue
+        if not events:
+            deadline = time.monotonic() + window
+        events.append(event)
+    return events
+
+
+class LocalQueueSource:
+    """Events published by repositories in this process."""
+    name = "local"
+
+    def __init__(self):
+        enable_local_events()
+
+    def next_batch(self, max_size: int = 100, window: float = 2.0, timeout: float = 1.0) -> List[Event]:
+        def next_event(wait: float) -> Optional[Event]:
+            try:
+                return _queue.get(timeout=min(wait, 0.5))
+            except queue.Empty:
+                return None
+
+        return _collect(next_event, max_size, window, timeout)
+
+    def commit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        enable_local_events(False)
+
+
+class ChangeStreamSource:
+    """Insert events from a MongoDB change stream over the watched collections."""
+    name = "change-stream"
+
+    def __init__(self, db: Optional[Database] = None, state_id: str = "enrichment"):
+        self.db = db if db is not None else get_db("ingest")
+        self.state_id = state_id
+        state = self.db[STATE_COLLECTION].find_one({"_id": state_id}) or {}
+        self._token: Optional[Dict[str, Any]] = state.get("resume_token")
+        self.stream = self.db.watch(
+            [{"$match": {"operationType": "insert", "ns.coll": {"$in": list(WATCHED)}}}],
+            resume_after=self._token,
+            max_await_time_ms=500
+        )
+
+    def next_batch(self, max_size: int = 100, window: float = 2.0, timeout: float = 1.0) -> List[Event]:
+        def next_event(wait: float) -> Optional[Event]:
+            change = self.stream.try_next()
+            if change is None:
+                return None
+            self._token = change["_id"]
+            return change["ns"]["coll"], change["documentKey"]["_id"]
+
+        return _collect(next_event, max_size, window, timeout)
+
+    def commit(self) -> None:
+        """Persist the resume token after a batch has been processed."""
+        if self._token is not None:
+            self.db[STATE_COLLECTION].update_one(
+                {"_id": self.state_id},
+                {"$set": {"resume_token": self._token}},
+                upsert=True
+            )
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def open_source(kind: str = "auto"):
+    """
+    Open an event source.
+
+    Args:
+        kind: "change-stream", "local" or "auto" (change streams when the
+            MongoDB backend supports them, otherwise the local queue)
+
+    Returns:
+        ChangeStreamSource or LocalQueueSource
+    """
+    from storage import storage_backend
+
+    if kind == "local" or (kind == "auto" and storage_backend() != "mongo"):
+        return LocalQueueSource()
+    try:
+        return ChangeStreamSource()
+    except OperationFailure as e:
+        if kind == "change-stream":
+            raise
+        print(f"Change streams unavailable ({e}); using the in-process queue")
+        return LocalQueueSource()
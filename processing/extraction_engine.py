@@ -0,0 +1,399 @@
+"""Batched, cached signal extraction engine with pluggable backends."""
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+import httpx
+
+
+PROMPT_VERSION = "v1"
+
+
+@dataclass
+class ExtractionRequest:
+    """A candidate sentence to send to the extraction backend."""
+    sentence: str
+    value_hint: str = ""  # Raw value string found by the regex pass
+
+
+@dataclass
+class Extraction:
+    """Structured fields extracted from one candidate sentence."""
+    entity: str
+    metric: str
+    value_now: float
+    unit: str = "percent"
+    time_ref: str = "recent"
+    value_before: Optional[float] = None
+    confidence: float = 0.5
+    model_used: str = "stub"
+
+
+def _parse_percentage(value_str: str) -> Optional[float]:
+    """Parse percentage string to float."""
+    try:
+        cleaned = value_str.replace("%", "").strip()
+        return float(cleaned)
+    except (ValueError, AttributeError):
+        return None
+
+
+def _extract_entity_and_metric(sentence: str) -> Tuple[str, str]:
+    """Simple heuristic to extract entity and metric from sentence."""
+    # Look for common metric keywords
+    metric_keywords = ["consumption", "sales", "revenue", "growth", "decline", "increase", "decrease"]
+    metric = "unknown"
+    for keyword in metric_keywords:
+        if keyword in sentence.lower():
+            metric = keyword
+            break
+
+    # Entity is harder - for now use first few words before metric
+    entity = "unknown entity"
+    if metric != "unknown":
+        metric_idx = sentence.lower().find(metric)
+        if metric_idx > 0:
+            entity = sentence[:metric_idx].strip()[:50]
+
+    return entity, metric
+
+
+class ExtractionError(RuntimeError):
+    """
+    Some sentences could not be extracted because their backend call failed.
+
+    Successful batches are cached before this is raised, so a retry only
+    resends the failed ones.
+    """
+
+    def __init__(self, failed: int, total: int, cause: Exception):
+        super().__init__(f"Extraction failed for {failed} of {total} sentences: {cause}")
+        self.failed = failed
+        self.total = total
+
+
+# Backends
+class ExtractionBackend:
+    """Base class for extraction backends."""
+    model: str = "unknown"
+
+    def extract_batch(
+        self,
+        requests: Sequence[ExtractionRequest],
+        prompt_version: str = PROMPT_VERSION
+    ) -> List[Optional[Extraction]]:
+        """
+        Extract fields for a batch of candidate sentences.
+
+        Returns one entry per request, None where no signal was found.
+        """
+        raise NotImplementedError
+
+
+class StubBackend(ExtractionBackend):
+    """Deterministic regex/keyword backend, used until an LLM is wired in."""
+    model = "stub"
+
+    def extract_batch(
+        self,
+        requests: Sequence[ExtractionRequest],
+        prompt_version: str = PROMPT_VERSION
+    ) -> List[Optional[Extraction]]:
+        results: List[Optional[Extraction]] = []
+        for request in requests:
+            value = _parse_percentage(request.value_hint)
+            if value is None:
+                results.append(None)
+                continue
+
+            entity, metric = _extract_entity_and_metric(request.sentence)
+            results.append(Extraction(
+                entity=entity,
+                metric=metric,
+                value_now=value,
+                confidence=0.5,
+                model_used=self.model
+            ))
+        return results
+
+
+class HTTPBackend(ExtractionBackend):
+    """
+    Backend that posts batches to an extraction service.
+
+    Request body: {"model", "prompt_version", "items": [{"sentence", "value_hint"}]}
+    Response body: {"results": [{...Extraction fields...} | null]}
+    """
+
+    def __init__(self, url: str, model: str, api_key: Optional[str] = None, timeout: float = 60.0):
+        self.url = url.rstrip("/")
+        self.model = model
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.Client(timeout=timeout, headers=headers)
+
+    def extract_batch(
+        self,
+        requests: Sequence[ExtractionRequest],
+        prompt_version: str = PROMPT_VERSION
+    ) -> List[Optional[Extraction]]:
+        response = self._client.post(f"{self.url}/extract", json={
+            "model": self.model,
+            "prompt_version": prompt_version,
+            "items": [asdict(r) for r in requests]
+        })
+        response.raise_for_status()
+
+        results = response.json().get("results", [])
+        if len(results) != len(requests):
+            raise ValueError(f"Backend returned {len(results)} results for {len(requests)} items")
+
+        return [
+            Extraction(**{**r, "model_used": r.get("model_used") or self.model}) if r else None
+            for r in results
+        ]
+
+
+class StandInServer:
+    """
+    Local HTTP server speaking the HTTPBackend protocol.
+
+    Answers every batch with the deterministic StubBackend, so tests and
+    benchmarks can exercise the full request path without a real model.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, backend: Optional[ExtractionBackend] = None):
+        self.backend = backend or StubBackend()
+        self.requests_served = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.rstrip("/") != "/extract":
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                items = [ExtractionRequest(**item) for item in payload.get("items", [])]
+                results = server.backend.extract_batch(items, payload.get("prompt_version", PROMPT_VERSION))
+                server.requests_served += 1
+
+                body = json.dumps({"results": [asdict(r) if r else None for r in results]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread."""
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        """Shut down the server."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# Caches
+class MemoryExtractionCache:
+    """In-process extraction cache."""
+
+    def __init__(self):
+        self._data: Dict[str, Optional[Extraction]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Optional[Extraction]]:
+        with self._lock:
+            return {k: self._data[k] for k in keys if k in self._data}
+
+    def put_many(self, items: Dict[str, Optional[Extraction]]) -> None:
+        with self._lock:
+            self._data.update(items)
+
+
+class MongoExtractionCache:
+    """Persistent extraction cache in the llm_extraction_cache collection."""
+
+    def __init__(self, collection=None):
+        if collection is None:
+            from db.mongo_client import get_db
+            collection = get_db("ingest").llm_extraction_cache
+        self.collection = collection
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Optional[Extraction]]:
+        if not keys:
+            return {}
+        found = {}
+        for doc in self.collection.find({"_id": {"$in": list(keys)}}):
+            result = doc.get("result")
+            found[doc["_id"]] = Extraction(**result) if result else None
+        return found
+
+    def put_many(self, items: Dict[str, Optional[Extraction]]) -> None:
+        if not items:
+            return
+        from pymongo import UpdateOne
+        now = datetime.utcnow()
+        self.collection.bulk_write([
+            UpdateOne(
+                {"_id": key},
+                {"$set": {"result": asdict(result) if result else None, "cached_at": now}},
+                upsert=True
+            )
+            for key, result in items.items()
+        ], ordered=False)
+
+
+# Engine
+class ExtractionEngine:
+    """
+    Extracts structured fields for many sentences at once.
+
+    Sentences are deduplicated, looked up in the cache, packed into batches of
+    `batch_size` and sent to the backend with at most `max_concurrency`
+    requests in flight.
+    """
+
+    def __init__(
+        self,
+        backend: ExtractionBackend,
+        cache=None,
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+        prompt_version: str = PROMPT_VERSION
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.prompt_version = prompt_version
+
+    def cache_key(self, request: ExtractionRequest) -> str:
+        """Cache key: sentence hash + model + prompt version."""
+        digest = hashlib.sha256(f"{request.sentence}\x00{request.value_hint}".encode("utf-8")).hexdigest()
+        return f"{digest}:{self.backend.model}:{self.prompt_version}"
+
+    def _run_batch(
+        self,
+        batch: List[Tuple[str, ExtractionRequest]]
+    ) -> Tuple[Dict[str, Optional[Extraction]], Optional[Exception]]:
+        """Results for one batch, or the error that made its backend call fail."""
+        try:
+            results = self.backend.extract_batch([r for _, r in batch], self.prompt_version)
+        except Exception as e:
+            return {}, e
+        return {key: result for (key, _), result in zip(batch, results)}, None
+
+    def extract(self, requests: Sequence[ExtractionRequest]) -> List[Optional[Extraction]]:
+        """
+        Extract fields for each request, in order.
+
+        Returns:
+            One entry per request, None where no signal was found
+
+        Raises:
+            ExtractionError: If any batch failed (the others are cached first)
+        """
+        keys = [self.cache_key(r) for r in requests]
+        unique = dict(zip(keys, requests))
+
+        results: Dict[str, Optional[Extraction]] = self.cache.get_many(list(unique)) if self.cache else {}
+        misses = [(k, r) for k, r in unique.items() if k not in results]
+        batches = [misses[i:i + self.batch_size] for i in range(0, len(misses), self.batch_size)]
+
+        if len(batches) == 1 or self.max_concurrency == 1:
+            outcomes = [self._run_batch(batch) for batch in batches]
+        elif batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                outcomes = list(pool.map(self._run_batch, batches))
+        else:
+            outcomes = []
+
+        fresh: Dict[str, Optional[Extraction]] = {}
+        failures = []
+        for batch, (batch_results, error) in zip(batches, outcomes):
+            fresh.update(batch_results)
+            if error is not None:
+                failures.append((len(batch), error))
+
+        if self.cache and fresh:
+            self.cache.put_many(fresh)
+        if failures:
+            error = ExtractionError(sum(n for n, _ in failures), len(misses), failures[0][1])
+            raise error from failures[0][1]
+        results.update(fresh)
+
+        return [results.get(k) for k in keys]
+
+
+_engine: Optional[ExtractionEngine] = None
+
+
+def get_engine() -> ExtractionEngine:
+    """
+    Get or create the default engine from environment settings.
+
+    LLM_BACKEND: "stub" (default) or "http"
+    LLM_API_URL / LLM_MODEL / LLM_API_KEY: settings for the http backend
+    LLM_BATCH_SIZE / LLM_MAX_CONCURRENCY: batching and parallelism
+    LLM_CACHE: "mongo" (default with the MongoDB storage backend), "memory"
+        (default otherwise) or "none"
+    """
+    global _engine
+    if _engine is None:
+        if os.getenv("LLM_BACKEND", "stub") == "http":
+            backend: ExtractionBackend = HTTPBackend(
+                url=os.getenv("LLM_API_URL", "http://127.0.0.1:8765"),
+                model=os.getenv("LLM_MODEL", "stub"),
+                api_key=os.getenv("LLM_API_KEY")
+            )
+        else:
+            backend = StubBackend()
+
+        from storage import storage_backend
+        cache_type = os.getenv("LLM_CACHE", "mongo" if storage_backend() == "mongo" else "memory")
+        if cache_type == "mongo":
+            cache = MongoExtractionCache()
+        elif cache_type == "memory":
+            cache = MemoryExtractionCache()
+        else:
+            cache = None
+
+        _engine = ExtractionEngine(
+            backend,
+            cache=cache,
+            batch_size=int(os.getenv("LLM_BATCH_SIZE", "32")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+        )
+    return _engine
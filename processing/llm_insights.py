@@ -1,90 +1,176 @@
 """LLM-based insight aggregation interface."""
-from datetime import datetime
-from typing import List
-from db.models import ProcessedSignal, Insight
-from db.mongo_client import get_db
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from bson import ObjectId
+from db.models import Insight
+from processing.rollups import day_start
+from storage import Repository, get_repository
 
 
-def _generate_insight_stub(signals: List[ProcessedSignal], topic: str) -> Insight:
+def fingerprint_signal_ids(signal_ids: Iterable) -> str:
+    """Order-independent fingerprint of a set of signal IDs."""
+    joined = "\n".join(sorted({str(i) for i in signal_ids}))
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class TopicSignalSummary:
+    """Per-topic statistics over a window of signals."""
+    topic: str
+    count: int
+    avg_value: float
+    entities: List[str]
+    metrics: List[str]
+    first_created_at: datetime
+    last_created_at: datetime
+    signal_ids: List[ObjectId] = field(default_factory=list)
+
+
+def _generate_insight_stub(summary: TopicSignalSummary) -> Insight:
     """
-    Generate insight from signals using stub implementation.
+    Generate insight from a topic summary using stub implementation.
     TODO: Replace with LLM API call for better insight generation.
     """
-    if not signals:
+    if not summary.count:
         raise ValueError("Cannot generate insight from empty signals list")
     
-    # Aggregate signal values
-    avg_value = sum(s.value_now for s in signals) / len(signals)
-    entities = list(set(s.entity for s in signals))
-    metrics = list(set(s.metric for s in signals))
+    topic = summary.topic
+    entities = summary.entities
+    metrics = summary.metrics
     
     # Generate stub insight
-    title = f"{topic.replace('_', ' ').title()}: {len(signals)} signals detected"
-    summary = f"Found {len(signals)} signals related to {topic}. Average value change: {avg_value:.1f}%."
+    title = f"{topic.replace('_', ' ').title()}: {summary.count} signals detected"
+    summary_text = f"Found {summary.count} signals related to {topic}. Average value change: {summary.avg_value:.1f}%."
     implication = f"Monitor {', '.join(metrics[:3])} for {', '.join(entities[:2])}."
     
-    window_start = min(s.created_at for s in signals)
-    window_end = max(s.created_at for s in signals)
-    
     return Insight(
         topic=topic,
         title=title,
-        summary=summary,
+        summary=summary_text,
         implication=implication,
         target_audience="ecom manager",
-        signal_ids=[s.id for s in signals],
-        window_start=window_start,
-        window_end=window_end
+        signal_ids=summary.signal_ids,
+        signal_fingerprint=fingerprint_signal_ids(summary.signal_ids),
+        window_start=summary.first_created_at,
+        window_end=summary.last_created_at
     )
 
 
-def generate_insights_for_window(start: datetime, end: datetime, min_signals: int = 2) -> List[Insight]:
+def _generate_for_topic(summary: TopicSignalSummary) -> Optional[Insight]:
+    """Generate one topic's insight, logging instead of raising."""
+    try:
+        return _generate_insight_stub(summary)
+    except Exception as e:
+        print(f"Error generating insight for topic {summary.topic}: {e}")
+        return None
+
+
+def summarize_topic_days(
+    start_day: datetime,
+    end_day: datetime,
+    min_signals: int = 1,
+    repo: Optional[Repository] = None,
+    topics: Optional[Iterable[str]] = None
+) -> List[TopicSignalSummary]:
     """
-    Generate insights from signals in a time window.
+    Build per-topic summaries from the topic_daily rollup.
     
-    Groups signals by topic and generates insights for each group.
+    Reads one small document per topic per day instead of scanning signals.
     
     Args:
-        start: Window start time
-        end: Window end time
-        min_signals: Minimum signals required per insight
+        start_day: First day to include
+        end_day: Last day to include
+        min_signals: Minimum signals required per topic
+        repo: Repository to read from (defaults to get_repository())
+        topics: Only summarize these topics (defaults to all)
         
     Returns:
-        List of Insight objects
+        List of TopicSignalSummary objects
     """
-    db = get_db()
-    signals_col = db.processed_signals
+    repo = repo or get_repository()
+    merged: Dict[str, dict] = {}
+    for doc in repo.load_topic_daily(start_day, end_day, topics=topics):
+        acc = merged.setdefault(doc["topic"], {
+            "count": 0, "value_sum": 0.0, "entities": set(), "metrics": set(),
+            "signal_ids": [], "first": doc["first_created_at"], "last": doc["last_created_at"]
+        })
+        acc["count"] += doc["count"]
+        acc["value_sum"] += doc["value_sum"]
+        acc["entities"].update(doc["entities"])
+        acc["metrics"].update(doc["metrics"])
+        acc["signal_ids"].extend(doc["signal_ids"])
+        acc["first"] = min(acc["first"], doc["first_created_at"])
+        acc["last"] = max(acc["last"], doc["last_created_at"])
     
-    # Fetch signals in window
-    query = {
-        "created_at": {"$gte": start, "$lte": end}
-    }
-    signal_docs = list(signals_col.find(query))
+    return [
+        TopicSignalSummary(
+            topic=topic,
+            count=acc["count"],
+            avg_value=acc["value_sum"] / acc["count"],
+            entities=list(acc["entities"]),
+            metrics=list(acc["metrics"]),
+            first_created_at=acc["first"],
+            last_created_at=acc["last"],
+            signal_ids=acc["signal_ids"]
+        )
+        for topic, acc in merged.items()
+        if acc["count"] >= min_signals
+    ]
+
+
+def _generate_from_summaries(
+    summaries: List[TopicSignalSummary],
+    skip_existing: bool,
+    max_workers: int,
+    repo: Optional[Repository] = None
+) -> List[Insight]:
+    """Generate insights for summaries whose signal set has no insight yet."""
+    # Drop groups whose exact signal set already has an insight
+    if skip_existing and summaries:
+        fingerprints = {s.topic: fingerprint_signal_ids(s.signal_ids) for s in summaries}
+        known = (repo or get_repository()).existing_fingerprints(fingerprints.values())
+        summaries = [s for s in summaries if fingerprints[s.topic] not in known]
     
-    if not signal_docs:
+    if not summaries:
         return []
     
-    # Group by topic
-    from db.models import ProcessedSignal
-    signals_by_topic: dict[str, List[ProcessedSignal]] = {}
-    
-    for doc in signal_docs:
-        signal = ProcessedSignal(**doc)
-        topic = signal.topic
-        if topic not in signals_by_topic:
-            signals_by_topic[topic] = []
-        signals_by_topic[topic].append(signal)
-    
     # Generate insights for each topic group
-    insights = []
-    for topic, signals in signals_by_topic.items():
-        if len(signals) >= min_signals:
-            try:
-                insight = _generate_insight_stub(signals, topic)
-                insights.append(insight)
-            except Exception as e:
-                print(f"Error generating insight for topic {topic}: {e}")
-                continue
-    
-    return insights
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(summaries)))) as pool:
+        results = pool.map(_generate_for_topic, summaries)
+        return [insight for insight in results if insight is not None]
+
 
+def generate_insights_for_days(
+    days: int,
+    min_signals: int = 2,
+    skip_existing: bool = True,
+    max_workers: int = 4,
+    repo: Optional[Repository] = None,
+    topics: Optional[Iterable[str]] = None
+) -> List[Insight]:
+    """
+    Generate insights for the last N calendar days (including today).
+    
+    Groups the topic_daily rollup by topic and generates insights for each
+    group. Each group is fingerprinted by its set of signal IDs; groups
+    whose fingerprint is already stored on an insight are skipped, the rest
+    are generated in parallel.
+    
+    Args:
+        days: Number of days to cover
+        min_signals: Minimum signals required per insight
+        skip_existing: Skip groups that already have a stored insight
+        max_workers: Maximum topic groups generated concurrently
+        repo: Repository to use (defaults to get_repository())
+        topics: Only regenerate these topics (defaults to all)
+        
+    Returns:
+        List of Insight objects
+    """
+    end_day = day_start(datetime.utcnow())
+    start_day = end_day - timedelta(days=days - 1)
+    summaries = summarize_topic_days(start_day, end_day, min_signals=min_signals, repo=repo, topics=topics)
+    return _generate_from_summaries(summaries, skip_existing, max_workers, repo=repo)
@@ -1,114 +1,127 @@
 """LLM-based signal extraction interface."""
-from typing import List, Optional, Any, Tuple
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+from bson import ObjectId
 from db.models import RawArticle, RawAlert, ProcessedSignal
-from processing.stats_extractor import extract_stat_candidates, StatCandidate
+from processing.stats_extractor import extract_stat_candidates
+from processing.extraction_engine import ExtractionEngine, ExtractionRequest, get_engine
 
 
-def _parse_percentage(value_str: str) -> Optional[float]:
-    """Parse percentage string to float."""
-    try:
-        cleaned = value_str.replace("%", "").strip()
-        return float(cleaned)
-    except (ValueError, AttributeError):
-        return None
+@dataclass
+class SignalSource:
+    """Text and provenance for one document to extract signals from."""
+    text: str
+    source_type: str
+    source_origin: str
+    source_url: str
+    topic: str
+    source_doc_id: Optional[ObjectId] = None
 
 
-def _extract_entity_and_metric(sentence: str) -> Tuple[str, str]:
+def extract_signals_batch(
+    sources: Sequence[SignalSource],
+    engine: Optional[ExtractionEngine] = None
+) -> List[List[ProcessedSignal]]:
     """
-    Simple heuristic to extract entity and metric from sentence.
-    TODO: Replace with LLM call for better extraction.
+    Extract structured signals from many documents at once.
+
+    Candidate sentences from every document are sent to the extraction
+    engine together, so they share batches and cache lookups.
+
+    Args:
+        sources: Documents to process
+        engine: Extraction engine (defaults to get_engine())
+
+    Returns:
+        One list of ProcessedSignal objects per source, in order
     """
-    # Basic heuristics - will be replaced with LLM
-    words = sentence.lower().split()
-    
-    # Look for common metric keywords
-    metric_keywords = ["consumption", "sales", "revenue", "growth", "decline", "increase", "decrease"]
-    metric = "unknown"
-    for keyword in metric_keywords:
-        if keyword in sentence.lower():
-            metric = keyword
-            break
-    
-    # Entity is harder - for now use first few words before metric
-    entity = "unknown entity"
-    if metric != "unknown":
-        metric_idx = sentence.lower().find(metric)
-        if metric_idx > 0:
-            entity = sentence[:metric_idx].strip()[:50]
-    
-    return entity, metric
+    engine = engine or get_engine()
+
+    candidates_per_source = [extract_stat_candidates(source.text) for source in sources]
+    requests = [
+        ExtractionRequest(sentence=c.sentence, value_hint=c.raw_value_str)
+        for candidates in candidates_per_source
+        for c in candidates
+    ]
+    extractions = iter(engine.extract(requests))
+
+    results = []
+    for source, candidates in zip(sources, candidates_per_source):
+        signals = []
+        for candidate in candidates:
+            extraction = next(extractions)
+            if extraction is None:
+                continue
+
+            signals.append(ProcessedSignal(
+                source_type=source.source_type,
+                source_origin=source.source_origin,
+                source_url=source.source_url,
+                source_doc_id=source.source_doc_id,
+                topic=source.topic,
+                entity=extraction.entity,
+                metric=extraction.metric,
+                value_now=extraction.value_now,
+                value_before=extraction.value_before,
+                unit=extraction.unit,
+                time_ref=extraction.time_ref,
+                context_sentence=candidate.sentence,
+                model_used=extraction.model_used,
+                confidence=extraction.confidence
+            ))
+        results.append(signals)
+
+    return results
 
 
 def extract_structured_signals(
-    text: str, 
+    text: str,
     source_type: str,
-    source_origin: str, 
-    source_url: str, 
-    topic: str
+    source_origin: str,
+    source_url: str,
+    topic: str,
+    engine: Optional[ExtractionEngine] = None
 ) -> List[ProcessedSignal]:
     """
     Extract structured signals from text.
-    
-    Currently uses regex-based extraction. TODO: Replace with LLM API call.
-    
+
     Args:
         text: Input text
         source_type: "article" | "alert" | "trend"
         source_origin: Source identifier
         source_url: Source URL
         topic: Topic classification
-        
+        engine: Extraction engine (defaults to get_engine())
+
     Returns:
         List of ProcessedSignal objects
     """
-    candidates = extract_stat_candidates(text)
-    signals = []
-    
-    for candidate in candidates:
-        value = _parse_percentage(candidate.raw_value_str)
-        if value is None:
-            continue
-        
-        entity, metric = _extract_entity_and_metric(candidate.sentence)
-        
-        signal = ProcessedSignal(
-            source_type=source_type,
-            source_origin=source_origin,
-            source_url=source_url,
-            topic=topic,
-            entity=entity,
-            metric=metric,
-            value_now=value,
-            unit="percent",
-            time_ref="recent",
-            context_sentence=candidate.sentence,
-            model_used="stub",
-            confidence=0.5
-        )
-        signals.append(signal)
-    
-    return signals
+    source = SignalSource(text, source_type, source_origin, source_url, topic)
+    return extract_signals_batch([source], engine)[0]
+
+
+def _to_source(doc: Union[RawArticle, RawAlert], topic: str) -> SignalSource:
+    """Build the extraction input for a raw article or alert."""
+    if isinstance(doc, RawAlert):
+        text = f"{doc.title} {doc.snippet}"
+    else:
+        text = doc.text
+    return SignalSource(text, doc.source_type, doc.source_origin, doc.source_url, topic, doc.id)
+
+
+def process_documents(
+    items: Sequence[tuple],
+    engine: Optional[ExtractionEngine] = None
+) -> List[List[ProcessedSignal]]:
+    """Process (raw document, topic) pairs into signals in one engine pass."""
+    return extract_signals_batch([_to_source(doc, topic) for doc, topic in items], engine)
 
 
 def process_article(article: RawArticle, topic: str) -> List[ProcessedSignal]:
     """Process a raw article into signals."""
-    return extract_structured_signals(
-        article.text,
-        article.source_type,
-        article.source_origin,
-        article.source_url,
-        topic
-    )
+    return process_documents([(article, topic)])[0]
 
 
 def process_alert(alert: RawAlert, topic: str) -> List[ProcessedSignal]:
     """Process a raw alert into signals."""
-    text = f"{alert.title} {alert.snippet}"
-    return extract_structured_signals(
-        text,
-        alert.source_type,
-        alert.source_origin,
-        alert.source_url,
-        topic
-    )
-
+    return process_documents([(alert, topic)])[0]
@@ -0,0 +1,207 @@
+"""
+Write-time daily rollups.
+
+topic_daily: one document per topic per day of processed signals.
+term_daily: one document per term per geo per day of trend interest.
+Both are updated incrementally by ingestion/enrichment. `cli.py
+rebuild-rollups` (Repository.rebuild_rollups, rebuild_rollups() here for
+MongoDB) rebuilds topic_daily from processed_signals and fills term_daily
+days that are missing; raw_trends keeps only the latest snapshot per term,
+so existing term_daily days (which hold every sample) are kept.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+from db.models import ProcessedSignal, RawTrend
+from db.mongo_client import get_db
+from db.data_versions import bump_data_version
+
+
+def day_start(value: datetime) -> datetime:
+    """Truncate a datetime to midnight."""
+    return datetime(value.year, value.month, value.day)
+
+
+def window_days(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """
+    First and last rollup day for a window.
+    
+    A day belongs to the window when its midnight falls in [start, end), so
+    back-to-back windows never share a day.
+    """
+    first = day_start(start)
+    if first < start:
+        first += timedelta(days=1)
+    last = day_start(end)
+    if last == end:
+        last -= timedelta(days=1)
+    return first, last
+
+
+def record_signals(signals: Iterable[ProcessedSignal], db: Optional[Database] = None) -> None:
+    """
+    Fold newly inserted signals into the topic_daily collection.
+    
+    One document per topic per day holds count, value sum, distinct
+    entities/metrics, signal IDs and first/last created_at. Signals already
+    folded into their day are ignored, so replays do not double count.
+    
+    Signal IDs are recorded as strings, the type processed_signals._id is
+    stored as (model_dump serializes it), so they match the IDs
+    rebuild_topic_daily() collects.
+    """
+    db = db if db is not None else get_db("ingest")
+    operations = [
+        UpdateOne(
+            {"topic": s.topic, "day": day_start(s.created_at), "signal_ids": {"$ne": str(s.id)}},
+            {
+                "$inc": {"count": 1, "value_sum": s.value_now},
+                "$addToSet": {"entities": s.entity, "metrics": s.metric, "signal_ids": str(s.id)},
+                "$min": {"first_created_at": s.created_at},
+                "$max": {"last_created_at": s.created_at}
+            },
+            upsert=True
+        )
+        for s in signals
+    ]
+    if not operations:
+        return
+    
+    try:
+        db.topic_daily.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate keys mean the signal was already in its (topic, day) doc
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+
+
+def topic_daily_filter(start_day: datetime, end_day: datetime, topics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """topic_daily filter for days in [start_day, end_day], optionally only for some topics."""
+    query: Dict[str, Any] = {"day": {"$gte": day_start(start_day), "$lte": day_start(end_day)}}
+    if topics is not None:
+        query["topic"] = {"$in": list(topics)}
+    return query
+
+
+def load_topic_daily(
+    start_day: datetime,
+    end_day: datetime,
+    db: Optional[Database] = None,
+    topics: Optional[Iterable[str]] = None
+) -> List[dict]:
+    """Read topic_daily documents for days in [start_day, end_day], optionally only for some topics."""
+    db = db if db is not None else get_db("analytics")
+    return list(db.topic_daily.find(topic_daily_filter(start_day, end_day, topics)))
+
+
+def rebuild_topic_daily(days: int = 30, db: Optional[Database] = None) -> None:
+    """
+    Regenerate topic_daily from processed_signals for the last N days.
+    
+    Args:
+        days: Number of days (including today) to rebuild
+    """
+    db = db if db is not None else get_db("ingest")
+    start = day_start(datetime.utcnow()) - timedelta(days=days - 1)
+    
+    db.topic_daily.delete_many({"day": {"$gte": start}})
+    db.processed_signals.aggregate([
+        {"$match": {"created_at": {"$gte": start}}},
+        {"$group": {
+            "_id": {"topic": "$topic", "day": {"$dateTrunc": {"date": "$created_at", "unit": "day"}}},
+            "count": {"$sum": 1},
+            "value_sum": {"$sum": "$value_now"},
+            "entities": {"$addToSet": "$entity"},
+            "metrics": {"$addToSet": "$metric"},
+            "signal_ids": {"$addToSet": "$_id"},
+            "first_created_at": {"$min": "$created_at"},
+            "last_created_at": {"$max": "$created_at"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "topic": "$_id.topic",
+            "day": "$_id.day",
+            "count": 1,
+            "value_sum": 1,
+            "entities": 1,
+            "metrics": 1,
+            "signal_ids": 1,
+            "first_created_at": 1,
+            "last_created_at": 1
+        }},
+        {"$merge": {"into": "topic_daily", "on": ["topic", "day"], "whenMatched": "replace"}}
+    ])
+
+
+def record_trends(trends: Iterable[RawTrend], db: Optional[Database] = None) -> None:
+    """
+    Fold trend snapshots into the term_daily collection.
+    
+    Each (term, geo, day) document accumulates interest_sum and samples, so
+    the day's average interest is interest_sum / samples.
+    """
+    db = db if db is not None else get_db("ingest")
+    operations = [
+        UpdateOne(
+            {"term": t.term, "geo": t.geo, "day": day_start(t.pulled_at)},
+            {
+                "$inc": {"interest_sum": t.weekly_interest, "samples": 1},
+                "$set": {"group": t.group, "last_interest": t.weekly_interest, "last_pulled_at": t.pulled_at}
+            },
+            upsert=True
+        )
+        for t in trends
+    ]
+    if operations:
+        db.term_daily.bulk_write(operations, ordered=False)
+
+
+def rebuild_term_daily(days: int = 30, db: Optional[Database] = None) -> None:
+    """
+    Add term_daily days that are missing but still have raw_trends documents.
+    
+    raw_trends keeps only the latest snapshot per term/geo/timeframe, while
+    record_trends() folded every earlier snapshot of the day into term_daily
+    as it was pulled. Existing days therefore know more than raw_trends and
+    are kept as they are; only days with no document are recreated.
+    
+    Args:
+        days: Number of days (including today) to rebuild
+    """
+    db = db if db is not None else get_db("ingest")
+    start = day_start(datetime.utcnow()) - timedelta(days=days - 1)
+    
+    db.raw_trends.aggregate([
+        {"$match": {"pulled_at": {"$gte": start}}},
+        {"$sort": {"pulled_at": 1}},
+        {"$group": {
+            "_id": {"term": "$term", "geo": "$geo", "day": {"$dateTrunc": {"date": "$pulled_at", "unit": "day"}}},
+            "interest_sum": {"$sum": {"$ifNull": ["$weekly_interest", 0.0]}},
+            "samples": {"$sum": 1},
+            "group": {"$last": "$group"},
+            "last_interest": {"$last": {"$ifNull": ["$weekly_interest", 0.0]}},
+            "last_pulled_at": {"$last": "$pulled_at"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "term": "$_id.term",
+            "geo": "$_id.geo",
+            "day": "$_id.day",
+            "interest_sum": 1,
+            "samples": 1,
+            "group": 1,
+            "last_interest": 1,
+            "last_pulled_at": 1
+        }},
+        {"$merge": {"into": "term_daily", "on": ["term", "geo", "day"], "whenMatched": "keepExisting"}}
+    ])
+
+
+def rebuild_rollups(days: int = 30, db: Optional[Database] = None) -> None:
+    """Regenerate every rollup collection for the last N days."""
+    db = db if db is not None else get_db("ingest")
+    rebuild_topic_daily(days, db=db)
+    rebuild_term_daily(days, db=db)
+    bump_data_version("topic_daily", "term_daily", db=db)
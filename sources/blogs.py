@@ -6,8 +6,8 @@ from typing import Dict, Any, Optional
 import feedparser
 import httpx
 from bs4 import BeautifulSoup
-from db.mongo_client import get_db
 from db.models import RawArticle
+from storage import get_repository
 from processing.stats_extractor import extract_stat_candidates
 from processing.bias_checker import BiasChecker
 
@@ -81,8 +81,7 @@ def fetch_and_store_articles(config_path: str = "config/feeds.json") -> None:
     with open(config_path, "r") as f:
         feeds = json.load(f)
     
-    db = get_db()
-    articles_col = db.raw_articles
+    repo = get_repository()
     bias_checker = BiasChecker()
     
     for feed_config in feeds:
@@ -150,15 +149,9 @@ def fetch_and_store_articles(config_path: str = "config/feeds.json") -> None:
                         data_points=data_points
                     )
                     
-                    # Upsert by url + published_at to avoid duplicates
-                    articles_col.update_one(
-                        {
-                            "url": article_doc.url,
-                            "published_at": article_doc.published_at
-                        },
-                        {"$set": article_doc.model_dump(by_alias=True, exclude={"id"})},
-                        upsert=True
-                    )
+                    # Upsert by url + published_at to avoid duplicates; the body
+                    # goes to the compressed body store
+                    repo.save_article(article_doc)
                     saved_count += 1
                     
                 except Exception as e:
@@ -171,4 +164,6 @@ def fetch_and_store_articles(config_path: str = "config/feeds.json") -> None:
         except Exception as e:
             print(f"Error fetching feed {source_name}: {e}")
             continue
+    
+    repo.bump_data_version("raw_articles")
 
@@ -3,8 +3,8 @@ import json
 from datetime import datetime
 from typing import Dict, Any
 import feedparser
-from db.mongo_client import get_db
 from db.models import RawAlert
+from storage import get_repository
 
 
 def _parse_published_date(entry: Dict[str, Any]) -> datetime:
@@ -24,8 +24,7 @@ def fetch_and_store_alerts(config_path: str = "config/feeds.json") -> None:
     with open(config_path, "r") as f:
         feeds = json.load(f)
     
-    db = get_db()
-    alerts_col = db.raw_alerts
+    repo = get_repository()
     
     for feed_config in feeds:
         if feed_config.get("type") != "rss":
@@ -55,14 +54,7 @@ def fetch_and_store_alerts(config_path: str = "config/feeds.json") -> None:
                     )
                     
                     # Upsert by url + published_at to avoid duplicates
-                    alerts_col.update_one(
-                        {
-                            "url": alert_doc.url,
-                            "published_at": alert_doc.published_at
-                        },
-                        {"$set": alert_doc.model_dump(by_alias=True, exclude={"id"})},
-                        upsert=True
-                    )
+                    repo.save_alert(alert_doc)
                     
                 except Exception as e:
                     print(f"Error processing alert entry: {e}")
@@ -71,4 +63,6 @@ def fetch_and_store_alerts(config_path: str = "config/feeds.json") -> None:
         except Exception as e:
             print(f"Error fetching feed {source_name}: {e}")
             continue
+    
+    repo.bump_data_version("raw_alerts")
 
@@ -4,8 +4,8 @@ import time
 from datetime import datetime
 from typing import List, Dict, Any
 from pytrends.request import TrendReq
-from db.mongo_client import get_db
 from db.models import RawTrend, RelatedQuery, RelatedQueries
+from storage import get_repository
 
 
 def _chunk_terms(terms: List[str], chunk_size: int = 5) -> List[List[str]]:
@@ -59,8 +59,8 @@ def fetch_and_store_trends(config_path: str = "config/keywords.json") -> None:
     with open(config_path, "r") as f:
         config = json.load(f)
     
-    db = get_db()
-    trends_col = db.raw_trends
+    repo = get_repository()
+    repo.ensure_schema(["raw_trends", "term_daily", "trend_scores"])
     
     pytrends = TrendReq(hl="en-GB", tz=360)
     regions = config.get("regions", ["GB"])
@@ -92,20 +92,14 @@ def fetch_and_store_trends(config_path: str = "config/keywords.json") -> None:
                             related_queries=trend_data["related_queries"]
                         )
                         
-                        # Upsert by term + geo + timeframe
-                        trends_col.update_one(
-                            {
-                                "term": term,
-                                "geo": geo,
-                                "timeframe": timeframe
-                            },
-                            {"$set": trend_doc.model_dump(by_alias=True, exclude={"id"})},
-                            upsert=True
-                        )
+                        # Upsert by term + geo + timeframe, updating rollups and scores
+                        repo.save_trend(trend_doc)
                         
                         time.sleep(1)  # Rate limiting
                         
                     except Exception as e:
                         print(f"Error fetching trend for {term} in {geo}: {e}")
                         continue
+    
+    repo.bump_data_version("raw_trends", "term_daily", "trend_scores")
 
@@ -0,0 +1,44 @@
+"""
+Storage backends.
+
+STORAGE_BACKEND selects the repository used by ingestion, enrichment,
+insights, reports, the API and the MCP server:
+
+    mongo   MongoDB (default)
+    sqlite  Embedded SQLite file at SQLITE_PATH (default data/quietlystated.db)
+"""
+import os
+from typing import Optional
+from storage.base import EXPORTS, ExportSpec, Repository
+
+_repository: Optional[Repository] = None
+
+
+def storage_backend() -> str:
+    """Name of the configured storage backend."""
+    return os.getenv("STORAGE_BACKEND", "mongo").lower()
+
+
+def get_repository() -> Repository:
+    """Get or create the repository for the configured backend."""
+    global _repository
+    if _repository is None:
+        backend = storage_backend()
+        if backend == "sqlite":
+            from storage.sqlite import SQLiteRepository, DEFAULT_SQLITE_PATH
+            _repository = SQLiteRepository(os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH))
+        elif backend == "mongo":
+            from storage.mongo import MongoRepository
+            _repository = MongoRepository()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'. Use 'mongo' or 'sqlite'.")
+    return _repository
+
+
+def set_repository(repository: Optional[Repository]) -> None:
+    """Replace the active repository (None resets to the configured backend)."""
+    global _repository
+    _repository = repository
+
+
+__all__ = ["EXPORTS", "ExportSpec", "Repository", "get_repository", "set_repository", "storage_backend"]
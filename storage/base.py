@@ -0,0 +1,286 @@
+"""Repository interface over the collections the jobs, reports, API and MCP use."""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type
+from pydantic import BaseModel
+from db.models import RawTrend, RawAlert, RawArticle, ProcessedSignal, Insight
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """A bulk export: its collection, model and the fields its filters apply to."""
+    collection: str
+    model: Type[BaseModel]
+    date_field: str
+    topic_field: Optional[str] = None
+    source_field: Optional[str] = None
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "signals": ExportSpec("processed_signals", ProcessedSignal, "created_at", "topic", "source_origin"),
+    "insights": ExportSpec("insights", Insight, "created_at", "topic"),
+    "articles": ExportSpec("raw_articles", RawArticle, "published_at", source_field="source_origin"),
+    "trends": ExportSpec("raw_trends", RawTrend, "pulled_at", "group", "source_origin"),
+}
+
+
+def export_filter(
+    spec: ExportSpec,
+    topic: Optional[str] = None,
+    source: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """MongoDB filter of an export: topic, source and since <= date < until, when given."""
+    query: Dict[str, Any] = {}
+    if topic:
+        query[spec.topic_field] = topic
+    if source:
+        query[spec.source_field] = source
+    if since or until:
+        query[spec.date_field] = {
+            **({"$gte": since} if since else {}),
+            **({"$lt": until} if until else {})
+        }
+    return query
+
+
+class Repository:
+    """
+    Base class for storage backends.
+
+    Read methods return plain documents shaped like the MongoDB ones
+    ("_id" as ObjectId, datetimes as datetime), so callers can serialize
+    them the same way whichever backend is active.
+    """
+    name: str = "unknown"
+
+    def ensure_schema(self, collections: Optional[Iterable[str]] = None) -> None:
+        """Create tables/indexes needed by the given collections."""
+        raise NotImplementedError
+
+    # Ingestion
+    def save_trend(self, trend: RawTrend) -> None:
+        """Upsert a trend snapshot by term + geo + timeframe and update rollups."""
+        raise NotImplementedError
+
+    def save_alert(self, alert: RawAlert) -> None:
+        """Upsert an alert by url + published_at, publishing an event if new."""
+        raise NotImplementedError
+
+    def save_article(self, article: RawArticle) -> None:
+        """
+        Upsert an article by url + published_at, storing its body compressed.
+
+        The body is written before a new article, so insert events always
+        find it; new articles are published to processing.events. The
+        article is (re-)indexed for search_articles().
+        """
+        raise NotImplementedError
+
+    # Enrichment
+    def articles_since(self, since: datetime) -> List[RawArticle]:
+        """Articles fetched since a time, with bodies loaded."""
+        raise NotImplementedError
+
+    def alerts_since(self, since: datetime) -> List[RawAlert]:
+        """Alerts fetched since a time."""
+        raise NotImplementedError
+
+    def get_articles(self, article_ids: Iterable[Any]) -> List[RawArticle]:
+        """Articles by _id, with bodies loaded (missing ids omitted)."""
+        raise NotImplementedError
+
+    def get_alerts(self, alert_ids: Iterable[Any]) -> List[RawAlert]:
+        """Alerts by _id (missing ids omitted)."""
+        raise NotImplementedError
+
+    def save_new_signals(self, signals: Iterable[ProcessedSignal]) -> List[ProcessedSignal]:
+        """
+        Insert signals not already stored (by origin, url and sentence).
+
+        Returns:
+            The signals that were inserted
+        """
+        raise NotImplementedError
+
+    def rebuild_rollups(self, days: int = 30) -> None:
+        """
+        Regenerate topic rollups for the last N days (including today) and
+        fill the term rollup days that are missing; existing term days hold
+        every sample and are kept. Bumps the rollups' data versions.
+        """
+        raise NotImplementedError
+
+    # Insights
+    def load_topic_daily(
+        self,
+        start_day: datetime,
+        end_day: datetime,
+        topics: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Per-topic, per-day signal rollups for days in [start_day, end_day], optionally for some topics."""
+        raise NotImplementedError
+
+    def existing_fingerprints(self, fingerprints: Iterable[str]) -> Set[str]:
+        """The subset of signal fingerprints that already have an insight."""
+        raise NotImplementedError
+
+    def save_insights(self, insights: Iterable[Insight]) -> None:
+        """Insert insights unless one with the same fingerprint exists."""
+        raise NotImplementedError
+
+    # Reports (same shapes as analytics.trends_reports)
+    def get_top_terms(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        previous_start: datetime,
+        previous_end: datetime,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def get_top_topics(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        previous_start: datetime,
+        previous_end: datetime,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def get_notable_stats(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        threshold: float = 5.0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    # Reads for the API and MCP server
+    def list_insights(
+        self,
+        topic: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Insights, newest first by (created_at, _id), after an optional db.pagination cursor."""
+        raise NotImplementedError
+
+    def get_insight(self, insight_id: Any) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_signals(
+        self,
+        topic: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Signals, newest first by (created_at, _id), after an optional db.pagination cursor."""
+        raise NotImplementedError
+
+    def get_signal(self, signal_id: Any) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_articles(
+        self,
+        source: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Articles without bodies, most recently published first by (published_at, _id)."""
+        raise NotImplementedError
+
+    def get_article(self, article_id: Any) -> Optional[Dict[str, Any]]:
+        """An article with its body, signals and the insights that cite them."""
+        raise NotImplementedError
+
+    def search_articles(
+        self,
+        query: str,
+        source: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Articles without bodies matching any query term, best BM25 score
+        first by (score, _id), each with its "score".
+        """
+        raise NotImplementedError
+
+    def get_bodies(self, article_ids: Iterable[Any]) -> Dict[Any, str]:
+        """Bodies for several articles (missing ids omitted)."""
+        raise NotImplementedError
+
+    def get_documents(self, collection: str, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Documents of processed_signals, insights or raw_articles (without
+        bodies) by _id, in no particular order; missing ids are omitted.
+        """
+        raise NotImplementedError
+
+    def export_documents(
+        self,
+        name: str,
+        topic: Optional[str] = None,
+        source: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every document of an export (see EXPORTS), unordered.
+
+        Documents come from a server-side cursor in batches, so memory
+        stays bounded however many match. Articles are exported without
+        bodies. The iterator may be advanced from different threads, one
+        step at a time.
+
+        Args:
+            name: Export name
+            topic: Match the export's topic field
+            source: Match the export's source field
+            since: Date field >= since
+            until: Date field < until
+        """
+        raise NotImplementedError
+
+    # Async reads for the API. By default they run the method above in a
+    # worker thread; backends with an async driver override them.
+    async def list_insights_async(self, topic=None, since=None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.list_insights, topic, since, limit, cursor)
+
+    async def get_insight_async(self, insight_id: Any) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_insight, insight_id)
+
+    async def list_signals_async(self, topic=None, since=None, limit: int = 50, cursor=None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.list_signals, topic, since, limit, cursor)
+
+    async def get_signal_async(self, signal_id: Any) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_signal, signal_id)
+
+    async def list_articles_async(self, source=None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.list_articles, source, limit, cursor)
+
+    async def get_article_async(self, article_id: Any) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_article, article_id)
+
+    async def get_documents_async(self, collection: str, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_documents, collection, ids)
+
+    # Data versions
+    def bump_data_version(self, *collections: str) -> None:
+        raise NotImplementedError
+
+    def get_data_versions(self, collections: Iterable[str]) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def get_version_stamps(self, collections: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        """Current (version, updated_at) of each collection ((0, None) if never bumped)."""
+        raise NotImplementedError
@@ -0,0 +1,267 @@
+"""MongoDB repository: the existing collections, indexes and aggregations."""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from bson import ObjectId
+from pymongo.database import Database
+from db.mongo_client import get_db
+from db.async_client import get_async_db
+from db.models import RawTrend, RawAlert, RawArticle, ProcessedSignal, Insight, model_projection
+from db.indexes import ensure_indexes
+from db.data_versions import bump_data_version, get_data_versions, get_version_stamps
+from db.pagination import keyset_query, keyset_sort, list_filter
+from db.article_detail import article_detail_pipeline, finish_article_detail
+from db.article_bodies import META_PROJECTION, get_bodies, put_body
+from db.search_index import index_articles, search_articles
+from processing.events import publish
+from processing.rollups import record_signals, record_trends, load_topic_daily, rebuild_rollups
+from storage.base import EXPORTS, Repository, export_filter
+
+# Fields the API and MCP reads return for each collection
+PROJECTIONS = {
+    "processed_signals": model_projection(ProcessedSignal),
+    "insights": model_projection(Insight),
+    "raw_articles": META_PROJECTION,
+}
+
+
+def batch_filter(ids: Iterable[Any]) -> Dict[str, Any]:
+    """
+    _id filter for a get-by-ID, of one document or a batch.
+
+    Signal and insight documents are stored with string ids, other
+    collections with ObjectIds, so both forms of each id are matched.
+    """
+    keys = list(dict.fromkeys(str(i) for i in ids))
+    return {"_id": {"$in": keys + [ObjectId(i) for i in keys if ObjectId.is_valid(i)]}}
+
+
+class MongoRepository(Repository):
+    """Repository backed by MongoDB."""
+    name = "mongo"
+
+    def __init__(self, db: Optional[Database] = None):
+        self._db = db
+
+    def db(self, workload: str = "api") -> Database:
+        return self._db if self._db is not None else get_db(workload)
+
+    def ensure_schema(self, collections: Optional[Iterable[str]] = None) -> None:
+        ensure_indexes(collections, db=self.db("ingest"))
+
+    # Ingestion
+    def save_trend(self, trend: RawTrend) -> None:
+        from analytics.anomalies import update_trend_scores
+        db = self.db("ingest")
+        db.raw_trends.update_one(
+            {"term": trend.term, "geo": trend.geo, "timeframe": trend.timeframe},
+            {"$set": trend.model_dump(by_alias=True, exclude={"id"})},
+            upsert=True
+        )
+        record_trends([trend], db=db)
+        update_trend_scores([trend], db=db)
+
+    def save_alert(self, alert: RawAlert) -> None:
+        result = self.db("ingest").raw_alerts.update_one(
+            {"url": alert.url, "published_at": alert.published_at},
+            {"$set": alert.model_dump(by_alias=True, exclude={"id"})},
+            upsert=True
+        )
+        if result.upserted_id is not None:
+            publish("raw_alerts", result.upserted_id)
+
+    def save_article(self, article: RawArticle) -> None:
+        # The body goes to the compressed store, keyed by the article _id. It
+        # is written first so the article's insert event always finds it.
+        db = self.db("ingest")
+        key = {"url": article.url, "published_at": article.published_at}
+        existing = db.raw_articles.find_one(key, {"title": 1, "data_points": 1, "source_origin": 1})
+        article_id = existing["_id"] if existing else article.id
+        body = get_bodies([article_id], db=db).get(article_id) if existing else None
+        if body != article.text:
+            put_body(article_id, article.text, db=db)
+        db.raw_articles.update_one(
+            key,
+            {
+                "$set": article.model_dump(by_alias=True, exclude={"id", "text"}),
+                "$setOnInsert": {"_id": article_id},
+                "$unset": {"text": ""}
+            },
+            upsert=True
+        )
+        searchable = article.model_dump(include={"title", "text", "data_points", "source_origin"})
+        # Re-scraping an unchanged article leaves its index entry alone
+        changed = existing is None or body != article.text or any(
+            existing.get(field) != searchable[field] for field in ("title", "data_points", "source_origin")
+        )
+        if changed:
+            index_articles([dict(searchable, _id=article_id)], db=db)
+        if not existing:
+            publish("raw_articles", article_id)
+
+    # Enrichment
+    def articles_since(self, since: datetime) -> List[RawArticle]:
+        db = self.db("ingest")
+        articles = [RawArticle(**doc) for doc in db.raw_articles.find({"fetched_at": {"$gte": since}}, META_PROJECTION)]
+        bodies = get_bodies([article.id for article in articles], db=db)
+        for article in articles:
+            article.text = bodies.get(article.id, "")
+        return articles
+
+    def alerts_since(self, since: datetime) -> List[RawAlert]:
+        return [RawAlert(**doc) for doc in self.db("ingest").raw_alerts.find({"fetched_at": {"$gte": since}})]
+
+    def get_articles(self, article_ids: Iterable[Any]) -> List[RawArticle]:
+        db = self.db("ingest")
+        ids = list(article_ids)
+        articles = [RawArticle(**doc) for doc in db.raw_articles.find({"_id": {"$in": ids}}, META_PROJECTION)]
+        bodies = get_bodies(ids, db=db)
+        for article in articles:
+            article.text = bodies.get(article.id, "")
+        return articles
+
+    def get_alerts(self, alert_ids: Iterable[Any]) -> List[RawAlert]:
+        return [RawAlert(**doc) for doc in self.db("ingest").raw_alerts.find({"_id": {"$in": list(alert_ids)}})]
+
+    def save_new_signals(self, signals: Iterable[ProcessedSignal]) -> List[ProcessedSignal]:
+        db = self.db("ingest")
+        saved = []
+        for signal in signals:
+            existing = db.processed_signals.find_one({
+                "source_origin": signal.source_origin,
+                "source_url": signal.source_url,
+                "context_sentence": signal.context_sentence
+            }, {"_id": 1})
+            if not existing:
+                db.processed_signals.insert_one(signal.model_dump(by_alias=True))
+                saved.append(signal)
+
+        # Keep per-topic daily aggregates in step with the inserts
+        record_signals(saved, db=db)
+        return saved
+
+    def rebuild_rollups(self, days: int = 30) -> None:
+        rebuild_rollups(days, db=self.db("ingest"))
+
+    # Insights
+    def load_topic_daily(self, start_day: datetime, end_day: datetime, topics=None) -> List[Dict[str, Any]]:
+        return load_topic_daily(start_day, end_day, db=self.db("analytics"), topics=topics)
+
+    def existing_fingerprints(self, fingerprints: Iterable[str]) -> Set[str]:
+        return {
+            doc["signal_fingerprint"]
+            for doc in self.db("analytics").insights.find(
+                {"signal_fingerprint": {"$in": list(fingerprints)}},
+                {"signal_fingerprint": 1}
+            )
+        }
+
+    def save_insights(self, insights: Iterable[Insight]) -> None:
+        insights_col = self.db("ingest").insights
+        for insight in insights:
+            # Insert unless another run stored the same signal set meanwhile
+            insights_col.update_one(
+                {"signal_fingerprint": insight.signal_fingerprint},
+                {"$setOnInsert": insight.model_dump(by_alias=True)},
+                upsert=True
+            )
+
+    # Reports
+    def get_top_terms(self, *windows, limit: int = 10):
+        from analytics.trends_reports import get_top_terms
+        return get_top_terms(*windows, limit=limit)
+
+    def get_top_topics(self, *windows, limit: int = 10):
+        from analytics.trends_reports import get_top_topics
+        return get_top_topics(*windows, limit=limit)
+
+    def get_notable_stats(self, current_start, current_end, threshold: float = 5.0, limit: int = 20):
+        from analytics.trends_reports import get_notable_stats
+        return get_notable_stats(current_start, current_end, threshold=threshold, limit=limit)
+
+    # Reads. Each query is built once against a sync or async database; the
+    # *_async variants use the API's native async client.
+    def _recent(self, db, collection: str, topic, since, limit: int, cursor):
+        query = keyset_query(list_filter(topic, since), "created_at", cursor)
+        return db[collection].find(query, PROJECTIONS[collection]).sort(keyset_sort("created_at")).limit(limit)
+
+    def _articles(self, db, source, limit: int, cursor):
+        query = keyset_query(list_filter(source=source), "published_at", cursor)
+        return db.raw_articles.find(query, META_PROJECTION).sort(keyset_sort("published_at")).limit(limit)
+
+    def _get(self, db, collection: str, doc_id: Any):
+        return db[collection].find_one(batch_filter([doc_id]), PROJECTIONS[collection])
+
+    def _article_pipeline(self, article_id: Any) -> List[Dict[str, Any]]:
+        return article_detail_pipeline(
+            ObjectId(article_id), META_PROJECTION, PROJECTIONS["processed_signals"], PROJECTIONS["insights"]
+        )
+
+    def list_insights(self, topic=None, since=None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return list(self._recent(self.db(), "insights", topic, since, limit, cursor))
+
+    async def list_insights_async(self, topic=None, since=None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return await self._recent(get_async_db(), "insights", topic, since, limit, cursor).to_list()
+
+    def get_insight(self, insight_id: Any) -> Optional[Dict[str, Any]]:
+        return self._get(self.db(), "insights", insight_id)
+
+    async def get_insight_async(self, insight_id: Any) -> Optional[Dict[str, Any]]:
+        return await self._get(get_async_db(), "insights", insight_id)
+
+    def list_signals(self, topic=None, since=None, limit: int = 50, cursor=None) -> List[Dict[str, Any]]:
+        return list(self._recent(self.db(), "processed_signals", topic, since, limit, cursor))
+
+    async def list_signals_async(self, topic=None, since=None, limit: int = 50, cursor=None) -> List[Dict[str, Any]]:
+        return await self._recent(get_async_db(), "processed_signals", topic, since, limit, cursor).to_list()
+
+    def get_signal(self, signal_id: Any) -> Optional[Dict[str, Any]]:
+        return self._get(self.db(), "processed_signals", signal_id)
+
+    async def get_signal_async(self, signal_id: Any) -> Optional[Dict[str, Any]]:
+        return await self._get(get_async_db(), "processed_signals", signal_id)
+
+    def list_articles(self, source: Optional[str] = None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return list(self._articles(self.db(), source, limit, cursor))
+
+    async def list_articles_async(self, source=None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return await self._articles(get_async_db(), source, limit, cursor).to_list()
+
+    def get_article(self, article_id: Any) -> Optional[Dict[str, Any]]:
+        docs = list(self.db().raw_articles.aggregate(self._article_pipeline(article_id)))
+        return finish_article_detail(docs[0] if docs else None)
+
+    async def get_article_async(self, article_id: Any) -> Optional[Dict[str, Any]]:
+        # Article, body, its signals and the insights citing them in one round trip
+        docs = await (await get_async_db().raw_articles.aggregate(self._article_pipeline(article_id))).to_list()
+        return finish_article_detail(docs[0] if docs else None)
+
+    def search_articles(self, query: str, source: Optional[str] = None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return search_articles(query, source, limit, cursor, db=self.db())
+
+    def get_bodies(self, article_ids: Iterable[Any]) -> Dict[Any, str]:
+        return get_bodies(article_ids, db=self.db())
+
+    def get_documents(self, collection: str, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        return list(self.db()[collection].find(batch_filter(ids), PROJECTIONS[collection]))
+
+    async def get_documents_async(self, collection: str, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        return await get_async_db()[collection].find(batch_filter(ids), PROJECTIONS[collection]).to_list()
+
+    def export_documents(self, name, topic=None, source=None, since=None, until=None,
+                         batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        spec = EXPORTS[name]
+        query = export_filter(spec, topic, source, since, until)
+        projection = META_PROJECTION if spec.collection == "raw_articles" else None
+        # Analytics client: secondaries allowed and a long socket timeout for big exports
+        with self.db("analytics")[spec.collection].find(query, projection, batch_size=batch_size) as cursor:
+            yield from cursor
+
+    # Data versions
+    def bump_data_version(self, *collections: str) -> None:
+        bump_data_version(*collections, db=self._db)
+
+    def get_data_versions(self, collections: Iterable[str]) -> Dict[str, int]:
+        return get_data_versions(collections, db=self._db)
+
+    def get_version_stamps(self, collections: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        return get_version_stamps(collections, db=self._db)
@@ -0,0 +1,725 @@
+"""
+Embedded SQLite repository for single-node deployments and benchmarks.
+
+Each table keeps the full document as Extended JSON (bson.json_util) in a
+`doc` column, next to indexed columns for every field that is filtered,
+grouped or sorted on. Times are stored as UTC epoch milliseconds. Report
+functions run as SQL aggregations with the same window semantics as the
+MongoDB rollup pipelines.
+"""
+import calendar
+import json
+from collections import defaultdict
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from bson import ObjectId, json_util
+from db.models import RawTrend, RawAlert, RawArticle, ProcessedSignal, Insight
+from db.pagination import decode_cursor
+from db.search_index import FIELD_WEIGHTS, bm25, bm25_idf, field_tokens, tokenize, top_scores
+from processing.events import publish
+from processing.rollups import day_start, window_days
+from storage.base import EXPORTS, Repository
+
+DEFAULT_SQLITE_PATH = "data/quietlystated.db"
+DAY_MS = 86400000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_trends (
+    id TEXT PRIMARY KEY,
+    term TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    pulled_at INTEGER NOT NULL,
+    weekly_interest REAL NOT NULL,
+    doc TEXT NOT NULL,
+    UNIQUE (term, geo, timeframe)
+);
+CREATE INDEX IF NOT EXISTS raw_trends_pulled_at ON raw_trends (pulled_at);
+
+CREATE TABLE IF NOT EXISTS term_daily (
+    term TEXT NOT NULL,
+    geo TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    interest_sum REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    grp TEXT,
+    last_interest REAL,
+    last_pulled_at INTEGER,
+    PRIMARY KEY (term, geo, day)
+);
+CREATE INDEX IF NOT EXISTS term_daily_day_term ON term_daily (day, term);
+
+CREATE TABLE IF NOT EXISTS raw_alerts (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    published_at INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    UNIQUE (url, published_at)
+);
+CREATE INDEX IF NOT EXISTS raw_alerts_fetched_at ON raw_alerts (fetched_at);
+
+CREATE TABLE IF NOT EXISTS raw_articles (
+    id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    source_origin TEXT NOT NULL,
+    published_at INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    UNIQUE (url, published_at)
+);
+CREATE INDEX IF NOT EXISTS raw_articles_fetched_at ON raw_articles (fetched_at);
+CREATE INDEX IF NOT EXISTS raw_articles_published_at_id ON raw_articles (published_at, id);
+CREATE INDEX IF NOT EXISTS raw_articles_source_published_at_id ON raw_articles (source_origin, published_at, id);
+
+CREATE TABLE IF NOT EXISTS article_bodies (
+    id TEXT PRIMARY KEY,
+    body BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS processed_signals (
+    id TEXT PRIMARY KEY,
+    source_origin TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    source_doc_id TEXT,
+    context_sentence TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value_now REAL NOT NULL,
+    abs_value REAL NOT NULL,
+    created_at INTEGER NOT NULL,
+    doc TEXT NOT NULL,
+    UNIQUE (source_origin, source_url, context_sentence)
+);
+CREATE INDEX IF NOT EXISTS processed_signals_created_at_id ON processed_signals (created_at, id);
+CREATE INDEX IF NOT EXISTS processed_signals_topic_created_at_id ON processed_signals (topic, created_at, id);
+CREATE INDEX IF NOT EXISTS processed_signals_abs_value ON processed_signals (abs_value);
+CREATE INDEX IF NOT EXISTS processed_signals_source_doc_id ON processed_signals (source_doc_id);
+
+CREATE TABLE IF NOT EXISTS insights (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    signal_fingerprint TEXT UNIQUE,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS insights_created_at_id ON insights (created_at, id);
+CREATE INDEX IF NOT EXISTS insights_topic_created_at_id ON insights (topic, created_at, id);
+
+CREATE TABLE IF NOT EXISTS insight_signals (
+    signal_id TEXT NOT NULL,
+    insight_id TEXT NOT NULL,
+    PRIMARY KEY (signal_id, insight_id)
+);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+
+-- Inverted index over articles, keyed by raw_articles rowid. The FTS5 table
+-- holds each field already tokenized by db.search_index.tokenize and its
+-- vocabulary tables give document frequencies and per-field occurrences, so
+-- search scores articles with the same BM25 as the MongoDB index. (FTS5's own
+-- bm25() differs: it floors the IDF of terms in over half the articles near
+-- zero and weights fields after saturation.) article_search_docs holds each
+-- article's weighted length.
+CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5(
+    title, text, data_points, tokenize = 'unicode61 remove_diacritics 0'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS article_search_row USING fts5vocab(article_search, row);
+CREATE VIRTUAL TABLE IF NOT EXISTS article_search_instance USING fts5vocab(article_search, instance);
+CREATE TABLE IF NOT EXISTS article_search_docs (
+    doc INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    source_origin TEXT,
+    length INTEGER NOT NULL
+);
+"""
+
+# Field-weighted frequency of one term in each article containing it
+SEARCH_POSTINGS_SQL = """
+SELECT d.id, d.length,
+       SUM(CASE i.col WHEN 'title' THEN {title} WHEN 'data_points' THEN {data_points} ELSE {text} END) AS tf
+FROM article_search_instance i JOIN article_search_docs d ON d.doc = i.doc
+WHERE i.term = ? {{source}}
+GROUP BY i.doc
+""".format(**FIELD_WEIGHTS)
+
+# term_daily days with no row yet, from the raw_trends snapshots still stored;
+# the bare columns come from the day's latest snapshot (the MAX row)
+FILL_TERM_DAILY_SQL = """
+INSERT OR IGNORE INTO term_daily (term, geo, day, interest_sum, samples, grp, last_interest, last_pulled_at)
+SELECT term, geo, pulled_at - pulled_at % :day_ms AS day, SUM(weekly_interest), COUNT(*),
+       json_extract(doc, '$.group'), weekly_interest, MAX(pulled_at)
+FROM raw_trends
+WHERE pulled_at >= :start
+GROUP BY term, geo, day
+"""
+
+# One aggregation for both windows, growth and both top-k rankings
+TOP_TERMS_SQL = """
+WITH sums AS (
+    SELECT term,
+        SUM(CASE WHEN day BETWEEN :cur_first AND :cur_last THEN interest_sum ELSE 0 END) AS cur_sum,
+        SUM(CASE WHEN day BETWEEN :cur_first AND :cur_last THEN samples ELSE 0 END) AS cur_n,
+        SUM(CASE WHEN day BETWEEN :prev_first AND :prev_last THEN interest_sum ELSE 0 END) AS prev_sum,
+        SUM(CASE WHEN day BETWEEN :prev_first AND :prev_last THEN samples ELSE 0 END) AS prev_n
+    FROM term_daily
+    WHERE day BETWEEN :cur_first AND :cur_last OR day BETWEEN :prev_first AND :prev_last
+    GROUP BY term
+), avgs AS (
+    SELECT term,
+        CASE WHEN cur_n > 0 THEN cur_sum * 1.0 / cur_n ELSE 0.0 END AS avg_current,
+        CASE WHEN prev_n > 0 THEN prev_sum * 1.0 / prev_n ELSE 0.0 END AS avg_previous
+    FROM sums
+), ranked AS (
+    SELECT term, avg_current, avg_previous,
+        CASE WHEN avg_previous > 0 THEN (avg_current - avg_previous) / avg_previous * 100
+             WHEN avg_current > 0 THEN 100.0 ELSE 0.0 END AS growth_pct
+    FROM avgs
+)
+SELECT term, avg_current, avg_previous, growth_pct,
+    ROW_NUMBER() OVER (ORDER BY avg_current DESC, term) AS rank_avg,
+    ROW_NUMBER() OVER (ORDER BY growth_pct DESC, term) AS rank_growth
+FROM ranked
+"""
+
+TOP_TOPICS_SQL = """
+WITH counts AS (
+    SELECT topic,
+        SUM(CASE WHEN created_at >= :cur_first AND created_at < :cur_end THEN 1 ELSE 0 END) AS count_current,
+        SUM(CASE WHEN created_at >= :prev_first AND created_at < :prev_end THEN 1 ELSE 0 END) AS count_previous
+    FROM processed_signals
+    WHERE (created_at >= :cur_first AND created_at < :cur_end)
+       OR (created_at >= :prev_first AND created_at < :prev_end)
+    GROUP BY topic
+), ranked AS (
+    SELECT topic, count_current, count_previous,
+        CASE WHEN count_previous > 0 THEN (count_current - count_previous) * 1.0 / count_previous * 100
+             WHEN count_current > 0 THEN 100.0 ELSE 0.0 END AS growth_pct
+    FROM counts
+)
+SELECT topic, count_current, count_previous, growth_pct,
+    ROW_NUMBER() OVER (ORDER BY count_current DESC, topic) AS rank_count,
+    ROW_NUMBER() OVER (ORDER BY growth_pct DESC, topic) AS rank_growth
+FROM ranked
+"""
+
+TOPIC_DAILY_SQL = """
+SELECT topic,
+    (created_at / :day_ms) * :day_ms AS day,
+    COUNT(*) AS count,
+    SUM(value_now) AS value_sum,
+    json_group_array(DISTINCT entity) AS entities,
+    json_group_array(DISTINCT metric) AS metrics,
+    json_group_array(id) AS signal_ids,
+    MIN(created_at) AS first_created_at,
+    MAX(created_at) AS last_created_at
+FROM processed_signals
+WHERE created_at >= :start AND created_at < :end
+    AND (:topics IS NULL OR topic IN (SELECT value FROM json_each(:topics)))
+GROUP BY topic, day
+"""
+
+
+# Export filter fields that only live inside the stored document
+_EXPORT_COLUMNS = {
+    ("raw_trends", "group"): "json_extract(doc, '$.group')",
+    ("raw_trends", "source_origin"): "json_extract(doc, '$.source_origin')",
+}
+
+
+def to_millis(value: datetime) -> int:
+    """Naive UTC datetime to epoch milliseconds."""
+    return calendar.timegm(value.utctimetuple()) * 1000 + value.microsecond // 1000
+
+
+def from_millis(value: int) -> datetime:
+    """Epoch milliseconds to naive UTC datetime."""
+    return datetime(1970, 1, 1) + timedelta(milliseconds=value)
+
+
+def _dump(doc: Dict[str, Any]) -> str:
+    return json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS)
+
+
+def _load(text: str) -> Dict[str, Any]:
+    return json_util.loads(text)
+
+
+class SQLiteRepository(Repository):
+    """Repository backed by a single SQLite file."""
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ensure_schema()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Per-thread connection (report sections run concurrently)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ensure_schema(self, collections: Optional[Iterable[str]] = None) -> None:
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _existing_id(self, table: str, where: str, params: tuple) -> Optional[str]:
+        row = self.conn.execute(f"SELECT id FROM {table} WHERE {where}", params).fetchone()
+        return row["id"] if row else None
+
+    # Ingestion
+    def save_trend(self, trend: RawTrend) -> None:
+        with self.conn as conn:
+            trend_id = self._existing_id(
+                "raw_trends", "term = ? AND geo = ? AND timeframe = ?", (trend.term, trend.geo, trend.timeframe)
+            ) or str(trend.id)
+            doc = trend.model_dump(by_alias=True)
+            doc["_id"] = ObjectId(trend_id)
+            pulled_at = to_millis(trend.pulled_at)
+            conn.execute(
+                "INSERT OR REPLACE INTO raw_trends (id, term, geo, timeframe, pulled_at, weekly_interest, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (trend_id, trend.term, trend.geo, trend.timeframe, pulled_at, trend.weekly_interest, _dump(doc))
+            )
+            conn.execute(
+                "INSERT INTO term_daily (term, geo, day, interest_sum, samples, grp, last_interest, last_pulled_at) "
+                "VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (term, geo, day) DO UPDATE SET "
+                "interest_sum = interest_sum + excluded.interest_sum, samples = samples + 1, "
+                "grp = excluded.grp, last_interest = excluded.last_interest, last_pulled_at = excluded.last_pulled_at",
+                (trend.term, trend.geo, to_millis(day_start(trend.pulled_at)), trend.weekly_interest,
+                 trend.group, trend.weekly_interest, pulled_at)
+            )
+
+    def save_alert(self, alert: RawAlert) -> None:
+        with self.conn as conn:
+            published_at = to_millis(alert.published_at)
+            existing = self._existing_id("raw_alerts", "url = ? AND published_at = ?", (alert.url, published_at))
+            alert_id = existing or str(alert.id)
+            doc = alert.model_dump(by_alias=True)
+            doc["_id"] = ObjectId(alert_id)
+            conn.execute(
+                "INSERT OR REPLACE INTO raw_alerts (id, url, published_at, fetched_at, doc) VALUES (?, ?, ?, ?, ?)",
+                (alert_id, alert.url, published_at, to_millis(alert.fetched_at), _dump(doc))
+            )
+        if not existing:
+            publish("raw_alerts", ObjectId(alert_id))
+
+    def save_article(self, article: RawArticle) -> None:
+        with self.conn as conn:
+            published_at = to_millis(article.published_at)
+            row = conn.execute(
+                "SELECT rowid, id FROM raw_articles WHERE url = ? AND published_at = ?", (article.url, published_at)
+            ).fetchone()
+            existing = row["id"] if row else None
+            article_id = existing or str(article.id)
+            doc = article.model_dump(by_alias=True, exclude={"text"})
+            doc["_id"] = ObjectId(article_id)
+            rowid = conn.execute(
+                "INSERT OR REPLACE INTO raw_articles (id, url, source_origin, published_at, fetched_at, doc) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (article_id, article.url, article.source_origin, published_at,
+                 to_millis(article.fetched_at), _dump(doc))
+            ).lastrowid
+            conn.execute(
+                "INSERT OR REPLACE INTO article_bodies (id, body) VALUES (?, ?)",
+                (article_id, zlib.compress(article.text.encode("utf-8")))
+            )
+            # REPLACE gives the article a new rowid; move its search entry along
+            if row:
+                conn.execute("DELETE FROM article_search WHERE rowid = ?", (row["rowid"],))
+                conn.execute("DELETE FROM article_search_docs WHERE doc = ?", (row["rowid"],))
+            self._index_article(conn, rowid, article_id, article.model_dump(
+                include={"title", "text", "data_points", "source_origin"}
+            ))
+        if not existing:
+            publish("raw_articles", ObjectId(article_id))
+
+    @staticmethod
+    def _index_article(conn: sqlite3.Connection, rowid: int, article_id: str, doc: Dict[str, Any]) -> None:
+        """Add an article's tokens and weighted length to the search tables."""
+        tokens = field_tokens(doc)
+        conn.execute(
+            "INSERT INTO article_search (rowid, title, text, data_points) VALUES (?, ?, ?, ?)",
+            (rowid, *(" ".join(tokens[field]) for field in ("title", "text", "data_points")))
+        )
+        conn.execute(
+            "INSERT INTO article_search_docs (doc, id, source_origin, length) VALUES (?, ?, ?, ?)",
+            (rowid, article_id, doc.get("source_origin"),
+             sum(FIELD_WEIGHTS[field] * len(values) for field, values in tokens.items()))
+        )
+
+    # Enrichment
+    def articles_since(self, since: datetime) -> List[RawArticle]:
+        return self._articles("a.fetched_at >= ?", (to_millis(since),))
+
+    def get_articles(self, article_ids: Iterable[Any]) -> List[RawArticle]:
+        ids = [str(i) for i in article_ids]
+        if not ids:
+            return []
+        return self._articles(f"a.id IN ({','.join('?' * len(ids))})", tuple(ids))
+
+    def _articles(self, where: str, params: tuple) -> List[RawArticle]:
+        rows = self.conn.execute(
+            "SELECT a.doc, b.body FROM raw_articles a LEFT JOIN article_bodies b ON b.id = a.id "
+            f"WHERE {where}", params
+        ).fetchall()
+        articles = []
+        for row in rows:
+            doc = _load(row["doc"])
+            doc["text"] = zlib.decompress(row["body"]).decode("utf-8") if row["body"] else ""
+            articles.append(RawArticle(**doc))
+        return articles
+
+    def alerts_since(self, since: datetime) -> List[RawAlert]:
+        rows = self.conn.execute("SELECT doc FROM raw_alerts WHERE fetched_at >= ?", (to_millis(since),))
+        return [RawAlert(**_load(row["doc"])) for row in rows]
+
+    def get_alerts(self, alert_ids: Iterable[Any]) -> List[RawAlert]:
+        ids = [str(i) for i in alert_ids]
+        if not ids:
+            return []
+        rows = self.conn.execute(f"SELECT doc FROM raw_alerts WHERE id IN ({','.join('?' * len(ids))})", ids)
+        return [RawAlert(**_load(row["doc"])) for row in rows]
+
+    def save_new_signals(self, signals: Iterable[ProcessedSignal]) -> List[ProcessedSignal]:
+        saved = []
+        with self.conn as conn:
+            for s in signals:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO processed_signals (id, source_origin, source_url, source_doc_id, "
+                    "context_sentence, topic, entity, metric, value_now, abs_value, created_at, doc) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (str(s.id), s.source_origin, s.source_url, str(s.source_doc_id) if s.source_doc_id else None,
+                     s.context_sentence, s.topic, s.entity,
+                     s.metric, s.value_now, abs(s.value_now), to_millis(s.created_at),
+                     _dump(s.model_dump(by_alias=True)))
+                )
+                if cursor.rowcount:
+                    saved.append(s)
+        return saved
+
+    def rebuild_rollups(self, days: int = 30) -> None:
+        # Topic rollups are aggregated from processed_signals when read
+        start = day_start(datetime.utcnow()) - timedelta(days=days - 1)
+        with self.conn as conn:
+            conn.execute(FILL_TERM_DAILY_SQL, {"day_ms": DAY_MS, "start": to_millis(start)})
+        self.bump_data_version("topic_daily", "term_daily")
+
+    # Insights
+    def load_topic_daily(self, start_day: datetime, end_day: datetime, topics=None) -> List[Dict[str, Any]]:
+        params = {
+            "day_ms": DAY_MS,
+            "start": to_millis(day_start(start_day)),
+            "end": to_millis(day_start(end_day)) + DAY_MS,
+            "topics": json.dumps(list(topics)) if topics is not None else None
+        }
+        rows = self.conn.execute(TOPIC_DAILY_SQL, params).fetchall()
+        return [
+            {
+                "topic": row["topic"],
+                "day": from_millis(row["day"]),
+                "count": row["count"],
+                "value_sum": row["value_sum"],
+                "entities": json.loads(row["entities"]),
+                "metrics": json.loads(row["metrics"]),
+                "signal_ids": [ObjectId(i) for i in json.loads(row["signal_ids"])],
+                "first_created_at": from_millis(row["first_created_at"]),
+                "last_created_at": from_millis(row["last_created_at"])
+            }
+            for row in rows
+        ]
+
+    def existing_fingerprints(self, fingerprints: Iterable[str]) -> Set[str]:
+        fingerprints = list(fingerprints)
+        if not fingerprints:
+            return set()
+        placeholders = ",".join("?" * len(fingerprints))
+        rows = self.conn.execute(
+            f"SELECT signal_fingerprint FROM insights WHERE signal_fingerprint IN ({placeholders})", fingerprints
+        )
+        return {row["signal_fingerprint"] for row in rows}
+
+    def save_insights(self, insights: Iterable[Insight]) -> None:
+        with self.conn as conn:
+            for insight in insights:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO insights (id, topic, created_at, signal_fingerprint, doc) VALUES (?, ?, ?, ?, ?)",
+                    (str(insight.id), insight.topic, to_millis(insight.created_at),
+                     insight.signal_fingerprint, _dump(insight.model_dump(by_alias=True)))
+                )
+                if cursor.rowcount:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO insight_signals (signal_id, insight_id) VALUES (?, ?)",
+                        [(str(signal_id), str(insight.id)) for signal_id in insight.signal_ids]
+                    )
+
+    # Reports
+    @staticmethod
+    def _day_bounds(start: datetime, end: datetime):
+        first, last = window_days(start, end)
+        return to_millis(first), to_millis(last)
+
+    def get_top_terms(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        previous_start: datetime,
+        previous_end: datetime,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Same result shape as analytics.trends_reports.get_top_terms."""
+        cur_first, cur_last = self._day_bounds(current_start, current_end)
+        prev_first, prev_last = self._day_bounds(previous_start, previous_end)
+        rows = self.conn.execute(
+            f"SELECT * FROM ({TOP_TERMS_SQL}) WHERE rank_avg <= :limit OR rank_growth <= :limit",
+            {"cur_first": cur_first, "cur_last": cur_last,
+             "prev_first": prev_first, "prev_last": prev_last, "limit": limit}
+        ).fetchall()
+        return {
+            "top_by_avg": self._ranked(rows, "rank_avg", ("term", "avg_current", "avg_previous", "growth_pct"), limit),
+            "top_by_growth": self._ranked(rows, "rank_growth", ("term", "avg_current", "avg_previous", "growth_pct"), limit)
+        }
+
+    def get_top_topics(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        previous_start: datetime,
+        previous_end: datetime,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Same result shape as analytics.trends_reports.get_top_topics."""
+        cur_first, cur_last = self._day_bounds(current_start, current_end)
+        prev_first, prev_last = self._day_bounds(previous_start, previous_end)
+        rows = self.conn.execute(
+            f"SELECT * FROM ({TOP_TOPICS_SQL}) WHERE rank_count <= :limit OR rank_growth <= :limit",
+            {"cur_first": cur_first, "cur_end": cur_last + DAY_MS,
+             "prev_first": prev_first, "prev_end": prev_last + DAY_MS, "limit": limit}
+        ).fetchall()
+        fields = ("topic", "count_current", "count_previous", "growth_pct")
+        return {
+            "top_by_count": self._ranked(rows, "rank_count", fields, limit),
+            "top_by_growth": self._ranked(rows, "rank_growth", fields, limit)
+        }
+
+    @staticmethod
+    def _ranked(rows, rank: str, fields, limit: int) -> List[Dict[str, Any]]:
+        return [{f: row[f] for f in fields} for row in sorted(rows, key=lambda r: r[rank]) if row[rank] <= limit]
+
+    def get_notable_stats(
+        self,
+        current_start: datetime,
+        current_end: datetime,
+        threshold: float = 5.0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Same result shape as analytics.trends_reports.get_notable_stats."""
+        rows = self.conn.execute(
+            "SELECT doc FROM processed_signals "
+            "WHERE created_at BETWEEN ? AND ? AND abs_value >= ? "
+            "ORDER BY abs_value DESC LIMIT ?",
+            (to_millis(current_start), to_millis(current_end), threshold, limit)
+        )
+        stats = []
+        for row in rows:
+            doc = _load(row["doc"])
+            stats.append({
+                "topic": doc["topic"],
+                "entity": doc["entity"],
+                "metric": doc["metric"],
+                "value": doc["value_now"],
+                "unit": doc["unit"],
+                "context": doc["context_sentence"],
+                "created_at": doc["created_at"].isoformat()
+            })
+        return stats
+
+    # Reads
+    def _docs(self, sql: str, params) -> List[Dict[str, Any]]:
+        return [_load(row["doc"]) for row in self.conn.execute(sql, params)]
+
+    def _page(self, table: str, sort_column: str, clauses: List[str], params: List[Any],
+              cursor: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """Newest first by (sort_column, id), starting after a keyset cursor."""
+        if cursor:
+            value, doc_id = decode_cursor(cursor, datetime)
+            clauses.append(f"({sort_column} < ? OR ({sort_column} = ? AND id < ?))")
+            params.extend([to_millis(value), to_millis(value), str(doc_id)])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._docs(
+            f"SELECT doc FROM {table} {where} ORDER BY {sort_column} DESC, id DESC LIMIT ?", (*params, limit)
+        )
+
+    def _recent(self, table: str, topic: Optional[str], since: Optional[datetime], limit: int,
+                cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        if topic:
+            clauses.append("topic = ?")
+            params.append(topic)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(to_millis(since))
+        return self._page(table, "created_at", clauses, params, cursor, limit)
+
+    def list_insights(self, topic=None, since=None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        return self._recent("insights", topic, since, limit, cursor)
+
+    def get_insight(self, insight_id: Any) -> Optional[Dict[str, Any]]:
+        docs = self._docs("SELECT doc FROM insights WHERE id = ?", (str(insight_id),))
+        return docs[0] if docs else None
+
+    def list_signals(self, topic=None, since=None, limit: int = 50, cursor=None) -> List[Dict[str, Any]]:
+        return self._recent("processed_signals", topic, since, limit, cursor)
+
+    def get_signal(self, signal_id: Any) -> Optional[Dict[str, Any]]:
+        docs = self._docs("SELECT doc FROM processed_signals WHERE id = ?", (str(signal_id),))
+        return docs[0] if docs else None
+
+    def list_articles(self, source: Optional[str] = None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        clauses, params = (["source_origin = ?"], [source]) if source else ([], [])
+        return self._page("raw_articles", "published_at", clauses, params, cursor, limit)
+
+    def get_article(self, article_id: Any) -> Optional[Dict[str, Any]]:
+        article_id = str(ObjectId(article_id))
+        docs = self._docs("SELECT doc FROM raw_articles WHERE id = ?", (article_id,))
+        if not docs:
+            return None
+        article = docs[0]
+        article["text"] = self.get_bodies([article_id]).get(article_id, "")
+        article["signals"] = self._docs("SELECT doc FROM processed_signals WHERE source_doc_id = ?", (article_id,))
+        signal_ids = [str(s["_id"]) for s in article["signals"]]
+        placeholders = ",".join("?" * len(signal_ids))
+        article["insights"] = self._docs(
+            f"SELECT doc FROM insights WHERE id IN "
+            f"(SELECT insight_id FROM insight_signals WHERE signal_id IN ({placeholders}))",
+            signal_ids
+        ) if signal_ids else []
+        return article
+
+    def get_documents(self, collection: str, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        if collection not in ("processed_signals", "insights", "raw_articles"):
+            raise ValueError(f"No batch lookup for {collection}")
+        keys = list(dict.fromkeys(str(i) for i in ids))
+        if not keys:
+            return []
+        return self._docs(f"SELECT doc FROM {collection} WHERE id IN ({','.join('?' * len(keys))})", keys)
+
+    def search_articles(self, query: str, source: Optional[str] = None, limit: int = 20, cursor=None) -> List[Dict[str, Any]]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        stats = self.conn.execute("SELECT COUNT(*) AS docs, TOTAL(length) AS length FROM article_search_docs").fetchone()
+        n = stats["docs"]
+        if not terms or n <= 0:
+            return []
+        avgdl = stats["length"] / n or 1.0
+
+        postings_sql = SEARCH_POSTINGS_SQL.format(source="AND d.source_origin = ?" if source else "")
+        scores: Dict[Any, float] = defaultdict(float)
+        for term in terms:
+            df = self.conn.execute("SELECT doc FROM article_search_row WHERE term = ?", (term,)).fetchone()
+            if df is None:
+                continue
+            idf = bm25_idf(df["doc"], n)
+            for posting in self.conn.execute(postings_sql, (term, source) if source else (term,)):
+                scores[ObjectId(posting["id"])] += bm25(posting["tf"], posting["length"], idf, avgdl)
+
+        ranked = top_scores(scores, limit, cursor)
+        ids = [str(doc_id) for doc_id, _ in ranked]
+        found = {
+            doc["_id"]: doc
+            for doc in self._docs(f"SELECT doc FROM raw_articles WHERE id IN ({','.join('?' * len(ids))})", ids)
+        } if ids else {}
+        return [dict(found[doc_id], score=score) for doc_id, score in ranked if doc_id in found]
+
+    def get_bodies(self, article_ids: Iterable[Any]) -> Dict[Any, str]:
+        ids = list(article_ids)
+        if not ids:
+            return {}
+        by_key = {str(i): i for i in ids}
+        placeholders = ",".join("?" * len(by_key))
+        rows = self.conn.execute(f"SELECT id, body FROM article_bodies WHERE id IN ({placeholders})", list(by_key))
+        return {by_key[row["id"]]: zlib.decompress(row["body"]).decode("utf-8") for row in rows}
+
+    def export_documents(self, name, topic=None, source=None, since=None, until=None,
+                         batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        spec = EXPORTS[name]
+        clauses, params = [], []
+        for field, value in ((spec.topic_field, topic), (spec.source_field, source)):
+            if value:
+                clauses.append(f"{_EXPORT_COLUMNS.get((spec.collection, field), field)} = ?")
+                params.append(value)
+        if since:
+            clauses.append(f"{spec.date_field} >= ?")
+            params.append(to_millis(since))
+        if until:
+            clauses.append(f"{spec.date_field} < ?")
+            params.append(to_millis(until))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        # Own connection: the per-thread one cannot follow the iterator
+        # across the threads a streaming response advances it from
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            cursor = conn.execute(f"SELECT doc FROM {spec.collection} {where}", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (doc,) in rows:
+                    yield _load(doc)
+        finally:
+            conn.close()
+
+    # Data versions
+    def bump_data_version(self, *collections: str) -> None:
+        now = to_millis(datetime.utcnow())
+        with self.conn as conn:
+            conn.executemany(
+                "INSERT INTO data_versions (collection, version, updated_at) VALUES (?, 1, ?) "
+                "ON CONFLICT (collection) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+                [(name, now) for name in collections]
+            )
+
+    def get_data_versions(self, collections: Iterable[str]) -> Dict[str, int]:
+        names = list(collections)
+        versions = {name: 0 for name in names}
+        if names:
+            placeholders = ",".join("?" * len(names))
+            for row in self.conn.execute(
+                f"SELECT collection, version FROM data_versions WHERE collection IN ({placeholders})", names
+            ):
+                versions[row["collection"]] = row["version"]
+        return versions
+
+    def get_version_stamps(self, collections: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        names = list(collections)
+        stamps: Dict[str, Tuple[int, Optional[datetime]]] = {name: (0, None) for name in names}
+        if names:
+            placeholders = ",".join("?" * len(names))
+            for row in self.conn.execute(
+                f"SELECT collection, version, updated_at FROM data_versions WHERE collection IN ({placeholders})", names
+            ):
+                stamps[row["collection"]] = (row["version"], from_millis(row["updated_at"]))
+        return stamps
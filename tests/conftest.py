@@ -0,0 +1,27 @@
+"""Shared fixtures: an embedded SQLite repository, so no MongoDB server is needed."""
+import pytest
+import storage
+from storage.sqlite import SQLiteRepository
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path, monkeypatch):
+    """A fresh SQLite repository installed as the active backend."""
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    repo = SQLiteRepository(str(tmp_path / "test.db"))
+    storage.set_repository(repo)
+    yield repo
+    storage.set_repository(None)
+    repo.close()
+
+
+@pytest.fixture
+def api_client(sqlite_repo, monkeypatch):
+    """TestClient for the API on the SQLite repository, without the report cache."""
+    from fastapi.testclient import TestClient
+    from analytics import report_cache
+    from api.main import app
+    monkeypatch.setattr(report_cache, "_cache", None)
+    monkeypatch.setattr(report_cache, "_cache_configured", True)
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,26 @@
+"""Document builders shared by the tests."""
+from datetime import datetime
+from db.models import ProcessedSignal, RawArticle, RawTrend
+
+
+def make_signal(**fields) -> ProcessedSignal:
+    return ProcessedSignal(**{
+        "source_type": "article", "source_origin": "blog", "source_url": "https://example.com/feed",
+        "topic": "email_sms", "entity": "Open rates", "metric": "growth", "value_now": 10.0,
+        "unit": "percent", "time_ref": "recent", "context_sentence": "Open rates grew 10%.",
+        "model_used": "stub", "confidence": 0.5, "created_at": datetime(2024, 5, 1, 12), **fields
+    })
+
+
+def make_trend(**fields) -> RawTrend:
+    return RawTrend(**{
+        "source_origin": "google_trends", "source_url": "https://trends.google.com", "group": "email",
+        "term": "email marketing", "geo": "GB", "timeframe": "now 7-d", **fields
+    })
+
+
+def make_article(**fields) -> RawArticle:
+    return RawArticle(**{
+        "source_origin": "blog", "source_url": "https://example.com/feed", "title": "Untitled",
+        "url": "https://example.com/post", "published_at": datetime(2024, 5, 1, 12), "text": "", **fields
+    })
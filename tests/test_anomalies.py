@@ -0,0 +1,82 @@
+import math
+import numpy as np
+import pytest
+from analytics.anomalies import AnomalyScorer
+
+NAN = float("nan")
+
+
+def _reference(series, alpha=0.3):
+    """Scalar EWMA mean/variance, z-score and slope of one series."""
+    mean = var = slope = last = z = 0.0
+    n = 0
+    for x in series:
+        if math.isnan(x):
+            continue
+        if n:
+            diff = x - mean
+            z = diff / math.sqrt(var) if var > 0 else 0.0
+            slope = (1 - alpha) * slope + alpha * (x - last)
+            mean += alpha * diff
+            var = (1 - alpha) * (var + diff * alpha * diff)
+        else:
+            mean, var, z = x, 0.0, 0.0
+        last = x
+        n += 1
+    return {"mean": mean, "var": var, "slope": slope, "last": last, "n": n, "z": z}
+
+
+HISTORY = np.array([
+    [10.0, 12.0, 11.0, 13.0, 40.0, 12.0],
+    [NAN, 5.0, NAN, 5.0, 5.0, NAN],
+    [NAN, NAN, NAN, NAN, NAN, NAN],
+    [50.0, 45.0, 40.0, NAN, 30.0, 25.0],
+])
+
+
+def test_update_matches_scalar_ewma_per_series():
+    scorer = AnomalyScorer(len(HISTORY))
+    for col in range(HISTORY.shape[1]):
+        scorer.update(HISTORY[:, col])
+
+    for i, series in enumerate(HISTORY):
+        expected = _reference(series)
+        assert scorer.state(i) == pytest.approx({k: v for k, v in expected.items() if k != "z"})
+        assert scorer.z[i] == pytest.approx(expected["z"])
+
+
+def test_update_reports_observed_series_and_keeps_gaps():
+    scorer = AnomalyScorer(2)
+    scorer.update(np.array([1.0, 2.0]))
+    before = scorer.snapshot()
+
+    observed = scorer.update(np.array([3.0, NAN]))
+
+    assert observed.tolist() == [True, False]
+    assert scorer.state(1) == {name: float(before[name][1]) for name in ("mean", "var", "slope", "last")} | {"n": 1}
+
+
+def test_resuming_from_stored_states_matches_full_history():
+    full = AnomalyScorer(len(HISTORY))
+    for col in range(HISTORY.shape[1]):
+        full.update(HISTORY[:, col])
+
+    head = AnomalyScorer(len(HISTORY))
+    for col in range(HISTORY.shape[1] - 1):
+        head.update(HISTORY[:, col])
+    resumed = AnomalyScorer.from_states([head.state(i) for i in range(len(HISTORY))])
+    resumed.update(HISTORY[:, -1])
+
+    for i in range(len(HISTORY)):
+        assert resumed.state(i) == pytest.approx(full.state(i))
+    # z is only carried by series observed in the resumed column
+    assert resumed.z[[0, 3]] == pytest.approx(full.z[[0, 3]])
+
+
+def test_spike_scores_far_from_its_history():
+    scorer = AnomalyScorer(1)
+    for value in HISTORY[0, :5]:
+        scorer.update(np.array([value]))
+
+    assert scorer.z[0] > 3
+    assert scorer.slope[0] > 0
@@ -0,0 +1,72 @@
+from bson import ObjectId
+from api.batch import MAX_BATCH_IDS, ordered_batch
+from storage.mongo import batch_filter
+from tests.helpers import make_article, make_signal
+
+
+def test_ordered_batch_follows_request_order_with_nulls():
+    a, b = ObjectId(), "65f0c0ffee0000000000beef"
+    docs = [{"_id": b, "n": 2}, {"_id": a, "n": 1}]
+
+    batch = ordered_batch([str(a), "missing", b, str(a)], docs)
+
+    assert batch == {
+        "results": [{"_id": a, "n": 1}, None, {"_id": b, "n": 2}, {"_id": a, "n": 1}],
+        "not_found": ["missing"]
+    }
+
+
+def test_batch_filter_matches_string_and_object_ids_once():
+    oid = ObjectId()
+
+    assert batch_filter([str(oid), "not-an-oid", str(oid)]) == {
+        "_id": {"$in": [str(oid), "not-an-oid", oid]}
+    }
+
+
+def test_batch_endpoints_answer_in_request_order(api_client, sqlite_repo):
+    signals = [make_signal(context_sentence=f"sentence {i}") for i in range(3)]
+    sqlite_repo.save_new_signals(signals)
+    article = make_article(text="Body text")
+    sqlite_repo.save_article(article)
+    missing = str(ObjectId())
+
+    signal_batch = api_client.post("/signals/batch", json={"ids": [str(signals[2].id), missing, str(signals[0].id)]})
+    article_batch = api_client.post("/sources/articles/batch", json={"ids": [str(article.id)]})
+
+    assert [doc and doc["_id"] for doc in signal_batch.json()["results"]] == [str(signals[2].id), None, str(signals[0].id)]
+    assert signal_batch.json()["not_found"] == [missing]
+    assert article_batch.json()["results"][0]["_id"] == str(article.id)
+    assert "text" not in article_batch.json()["results"][0]
+    assert api_client.post("/insights/batch", json={"ids": []}).status_code == 422
+    assert api_client.post("/insights/batch", json={"ids": ["x"] * (MAX_BATCH_IDS + 1)}).status_code == 422
+
+
+class InCollection:
+    """Collection stub answering find_one for an _id $in filter."""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs if doc["_id"] in query["_id"]["$in"]), None)
+
+
+def test_mongo_single_gets_match_string_ids():
+    from storage.mongo import MongoRepository
+    signal_id = str(ObjectId())
+    repo = MongoRepository(db={"processed_signals": InCollection([{"_id": signal_id}]), "insights": InCollection([])})
+
+    assert repo.get_signal(signal_id) == {"_id": signal_id}
+    assert repo.get_signal("not-an-oid") is None
+    assert repo.get_insight(str(ObjectId())) is None
+
+
+def test_single_gets_answer_404_for_unknown_or_malformed_ids(api_client, sqlite_repo):
+    signal = make_signal()
+    sqlite_repo.save_new_signals([signal])
+
+    assert api_client.get(f"/signals/{signal.id}").json()["_id"] == str(signal.id)
+    for path in ("/signals/not-an-oid", f"/signals/{ObjectId()}", "/insights/not-an-oid"):
+        assert api_client.get(path).status_code == 404
+    assert api_client.get("/sources/articles/not-an-oid").status_code == 400
@@ -0,0 +1,47 @@
+import pytest
+from processing.extraction_engine import (
+    ExtractionEngine, ExtractionError, ExtractionRequest, MemoryExtractionCache, StubBackend
+)
+
+
+class FlakyBackend(StubBackend):
+    """Stub backend whose batches containing "fail" raise."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract_batch(self, requests, prompt_version="v1"):
+        self.calls += 1
+        if any("fail" in r.sentence for r in requests):
+            raise ConnectionError("backend down")
+        return super().extract_batch(requests, prompt_version)
+
+
+def test_extract_returns_results_in_request_order():
+    engine = ExtractionEngine(StubBackend(), batch_size=2)
+    results = engine.extract([
+        ExtractionRequest("Revenue grew 25% last year", "25%"),
+        ExtractionRequest("No number here"),
+        ExtractionRequest("Revenue grew 25% last year", "25%"),
+    ])
+    assert results[0].value_now == 25.0
+    assert results[1] is None
+    assert results[2] == results[0]
+
+
+def test_failed_batch_raises_and_caches_the_rest():
+    backend = FlakyBackend()
+    cache = MemoryExtractionCache()
+    engine = ExtractionEngine(backend, cache=cache, batch_size=1, max_concurrency=2)
+    requests = [ExtractionRequest("Sales grew 10%", "10%"), ExtractionRequest("fail 5%", "5%")]
+
+    with pytest.raises(ExtractionError) as excinfo:
+        engine.extract(requests)
+    assert (excinfo.value.failed, excinfo.value.total) == (1, 2)
+    assert isinstance(excinfo.value.__cause__, ConnectionError)
+
+    # Only the failed sentence is resent on retry
+    backend.calls = 0
+    with pytest.raises(ExtractionError):
+        engine.extract(requests)
+    assert backend.calls == 1
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+from db.indexes import query_shapes, verify_indexes
+from storage.base import EXPORTS
+
+
+class ExplainDatabase:
+    """Answers explain() with an index scan, or EOF for collections without documents."""
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    def list_collection_names(self):
+        return list(self.counts)
+
+    def __getitem__(self, name):
+        return SimpleNamespace(estimated_document_count=lambda: self.counts[name])
+
+    def command(self, name, command, verbosity=None):
+        collection = command.get("find") or command.get("aggregate")
+        stage = "IXSCAN" if self.counts.get(collection) else "EOF"
+        return {"queryPlanner": {"winningPlan": {"stage": stage}, "rejectedPlans": [{"stage": "COLLSCAN"}]}}
+
+
+def test_query_shapes_cover_every_export():
+    collections = {(shape.name, shape.collection) for shape in query_shapes()}
+
+    for name, spec in EXPORTS.items():
+        assert (f"export {name}", spec.collection) in collections
+
+
+def test_verify_indexes_flags_missing_and_empty_collections():
+    counts = {shape.collection: 10 for shape in query_shapes()}
+    counts["trend_scores"] = 0
+    del counts["config_feeds"]
+
+    results = {r["name"]: r for r in verify_indexes(db=ExplainDatabase(counts))}
+
+    assert results["top anomalies"]["unverified"]
+    assert results["active feeds"]["unverified"]
+    assert not results["list signals"]["unverified"]
+    assert not any(r["collscan"] for r in results.values())
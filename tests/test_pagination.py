@@ -0,0 +1,68 @@
+import base64
+from datetime import datetime
+import pytest
+from bson import ObjectId, json_util
+from db.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_query, keyset_sort, paginate
+
+
+def _raw_cursor(value) -> str:
+    """A cursor around any JSON value, as a client could forge one."""
+    return base64.urlsafe_b64encode(json_util.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trips_sort_value_and_id_types():
+    doc = {"created_at": datetime(2024, 5, 1, 12, 30, 15, 123000), "_id": ObjectId()}
+    scored = {"score": 1.2345678901234567, "_id": "65f0c0ffee0000000000beef"}
+
+    assert decode_cursor(encode_cursor(doc, "created_at")) == (doc["created_at"], doc["_id"])
+    assert decode_cursor(encode_cursor(scored, "score"), float) == (scored["score"], scored["_id"])
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _raw_cursor(["x"]),
+    _raw_cursor(["x", "y"]),
+    _raw_cursor([{"$gt": ""}, "y"]),
+    _raw_cursor([{"$date": 0}, {"$ne": None}]),
+    _raw_cursor([True, "y"]),
+])
+def test_decode_rejects_malformed_or_mistyped_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_decode_rejects_a_cursor_for_another_sort():
+    score_cursor = encode_cursor({"score": 3.5, "_id": ObjectId()}, "score")
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(score_cursor, datetime)
+
+
+def test_keyset_query_continues_strictly_after_the_cursor():
+    doc = {"created_at": datetime(2024, 5, 1), "_id": ObjectId()}
+
+    query = keyset_query({"topic": "t"}, "created_at", encode_cursor(doc, "created_at"))
+
+    assert keyset_query({"topic": "t"}, "created_at", None) == {"topic": "t"}
+    assert query == {"$and": [{"topic": "t"}, {"$or": [
+        {"created_at": {"$lt": doc["created_at"]}},
+        {"created_at": doc["created_at"], "_id": {"$lt": doc["_id"]}}
+    ]}]}
+    assert keyset_sort("created_at") == [("created_at", -1), ("_id", -1)]
+
+
+def test_paginate_returns_a_cursor_only_when_more_remain():
+    docs = [{"created_at": datetime(2024, 5, 1, 12 - i), "_id": ObjectId()} for i in range(3)]
+
+    page, cursor = paginate(docs, "created_at", 2)
+
+    assert page == docs[:2]
+    assert decode_cursor(cursor) == (docs[1]["created_at"], docs[1]["_id"])
+    assert paginate(docs, "created_at", 3) == (docs, None)
+
+
+def test_api_rejects_forged_cursors_with_400(api_client):
+    for cursor in (_raw_cursor(["x", "y"]), encode_cursor({"score": 1.0, "_id": "a"}, "score")):
+        assert api_client.get("/signals/", params={"cursor": cursor}).status_code == 400
+        assert api_client.get("/sources/articles", params={"cursor": cursor}).status_code == 400
+    assert api_client.get("/search/", params={"q": "x", "cursor": _raw_cursor(["x", "y"])}).status_code == 400
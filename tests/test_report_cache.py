@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+from analytics.report_cache import MemoryCacheBackend, ReportCache
+
+
+def test_cached_values_follow_the_repository_data_versions(sqlite_repo):
+    cache = ReportCache(MemoryCacheBackend())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    first = cache.get_or_compute("report", {"days": 7}, ["topic_daily"], compute)
+    cached = cache.get_or_compute("report", {"days": 7}, ["topic_daily"], compute)
+    sqlite_repo.bump_data_version("topic_daily")
+    recomputed = cache.get_or_compute("report", {"days": 7}, ["topic_daily"], compute)
+
+    assert (first, cached, recomputed) == (1, 1, 2)
+
+
+def test_window_bucketing_can_be_turned_off():
+    end = datetime(2024, 5, 8, 12, 0, 10)
+    later = end + timedelta(seconds=30)
+
+    assert ReportCache(None).make_key("report", {"end": end}) == ReportCache(None).make_key("report", {"end": later})
+    exact = ReportCache(None, window_granularity_seconds=0)
+    assert exact.make_key("report", {"end": end}) != exact.make_key("report", {"end": later})
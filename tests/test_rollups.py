@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+import pytest
+from processing.rollups import day_start, record_signals
+from tests.helpers import make_signal, make_trend
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """An in-memory MongoDB database (mongomock) with the topic_daily unique index."""
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.collection import BulkOperationBuilder
+
+    # PyMongo 4.11+ passes a sort option mongomock's bulk builder does not take
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(BulkOperationBuilder, "add_update",
+                        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs))
+    db = mongomock.MongoClient().db
+    db.topic_daily.create_index([("topic", 1), ("day", 1)], unique=True)
+    return db
+
+
+def test_record_signals_folds_each_signal_into_its_day_once(mongo_db):
+    first = make_signal()
+    second = make_signal(context_sentence="Open rates grew 20%.", value_now=20.0, created_at=datetime(2024, 5, 1, 18))
+
+    record_signals([first], db=mongo_db)
+    record_signals([first, second], db=mongo_db)
+
+    [doc] = mongo_db.topic_daily.find({}, {"_id": 0})
+    assert doc["count"] == 2 and doc["value_sum"] == 30.0
+    # Stored as processed_signals stores _id, so rebuilds collect the same ids
+    assert doc["signal_ids"] == [first.model_dump(by_alias=True)["_id"], second.model_dump(by_alias=True)["_id"]]
+    assert (doc["first_created_at"], doc["last_created_at"]) == (first.created_at, second.created_at)
+
+
+def _term_days(repo):
+    rows = repo.conn.execute("SELECT * FROM term_daily ORDER BY term, day").fetchall()
+    return {(row["term"], row["day"]): dict(row) for row in rows}
+
+
+def test_rebuild_keeps_existing_term_days_and_fills_missing_ones(sqlite_repo):
+    yesterday = day_start(datetime.utcnow()) - timedelta(days=1)
+    # Two samples of one term; raw_trends keeps only the latest
+    sqlite_repo.save_trend(make_trend(term="email", pulled_at=yesterday + timedelta(hours=1), weekly_interest=10))
+    sqlite_repo.save_trend(make_trend(term="email", pulled_at=yesterday + timedelta(hours=2), weekly_interest=20))
+    sqlite_repo.save_trend(make_trend(term="sms", pulled_at=yesterday + timedelta(hours=3), weekly_interest=5))
+    sqlite_repo.save_new_signals([make_signal(created_at=yesterday + timedelta(hours=4))])
+    recorded = _term_days(sqlite_repo)
+    topics = sqlite_repo.load_topic_daily(yesterday, yesterday)
+    with sqlite_repo.conn as conn:
+        conn.execute("DELETE FROM term_daily WHERE term = 'sms'")
+
+    sqlite_repo.rebuild_rollups(7)
+    sqlite_repo.rebuild_rollups(7)
+
+    assert _term_days(sqlite_repo) == recorded
+    [email] = [row for (term, _), row in recorded.items() if term == "email"]
+    assert (email["interest_sum"], email["samples"], email["last_interest"]) == (30.0, 2, 20.0)
+    assert sqlite_repo.load_topic_daily(yesterday, yesterday) == topics
+    assert sqlite_repo.get_data_versions(["term_daily", "topic_daily"]) == {"term_daily": 2, "topic_daily": 2}
@@ -0,0 +1,86 @@
+import threading
+from jobs import run_pipeline as pipeline
+from processing.extraction_engine import ExtractionError
+
+
+class OneBatchSource:
+    """Event source yielding a single batch, recording commits."""
+    name = "local"
+
+    def __init__(self, batch):
+        self.batches = [batch]
+        self.commits = 0
+
+    def next_batch(self, max_size=100, window=2.0, timeout=1.0):
+        return self.batches.pop() if self.batches else []
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+def test_pipeline_retries_failed_batch_before_committing(sqlite_repo, monkeypatch):
+    source = OneBatchSource([("raw_articles", "a1")])
+    stop = threading.Event()
+    attempts = []
+
+    def process_events(batch, repo, bias_checker=None):
+        attempts.append((list(batch), source.commits))
+        if len(attempts) == 1:
+            raise ExtractionError(1, 1, ConnectionError("backend down"))
+        stop.set()
+        return {"total": 0, "biased": 0, "saved": []}
+
+    monkeypatch.setattr(pipeline, "open_source", lambda kind: source)
+    monkeypatch.setattr(pipeline, "process_events", process_events)
+    monkeypatch.setattr(pipeline, "RETRY_DELAY", 0.0)
+    pipeline.run_pipeline(stop=stop, fetch_interval=0)
+
+    assert attempts == [([("raw_articles", "a1")], 0), ([("raw_articles", "a1")], 0)]
+    assert source.commits == 1
+
+
+def test_pipeline_skips_batch_that_never_succeeds(sqlite_repo, monkeypatch):
+    source = OneBatchSource([("raw_articles", "a1"), ("raw_articles", "bad")])
+    stop = threading.Event()
+    attempts = []
+
+    def process_events(batch, repo, bias_checker=None):
+        attempts.append(list(batch))
+        if ("raw_articles", "bad") in batch:
+            raise ExtractionError(1, len(batch), ConnectionError("backend down"))
+        return {"total": 1, "biased": 0, "saved": []}
+
+    def commit():
+        source.commits += 1
+        stop.set()
+
+    monkeypatch.setattr(pipeline, "open_source", lambda kind: source)
+    monkeypatch.setattr(pipeline, "process_events", process_events)
+    monkeypatch.setattr(pipeline, "RETRY_DELAY", 0.0)
+    monkeypatch.setattr(source, "commit", commit)
+    pipeline.run_pipeline(stop=stop, fetch_interval=0)
+
+    batch = [("raw_articles", "a1"), ("raw_articles", "bad")]
+    assert attempts == [batch] * pipeline.MAX_ATTEMPTS + [[batch[0]], [batch[1]]]
+    assert source.commits == 1
+
+
+def test_pipeline_does_not_retry_permanent_errors(sqlite_repo, monkeypatch):
+    source = OneBatchSource([("raw_articles", "a1")])
+    stop = threading.Event()
+    attempts = []
+
+    def process_events(batch, repo, bias_checker=None):
+        attempts.append(list(batch))
+        stop.set()
+        raise KeyError("title")
+
+    monkeypatch.setattr(pipeline, "open_source", lambda kind: source)
+    monkeypatch.setattr(pipeline, "process_events", process_events)
+    pipeline.run_pipeline(stop=stop, fetch_interval=0)
+
+    assert len(attempts) == 2
+    assert source.commits == 1
@@ -0,0 +1,291 @@
+import math
+import random
+from collections import Counter
+from types import SimpleNamespace
+import pytest
+from bson import ObjectId
+from db import search_index
+from db.pagination import encode_cursor
+from db.search_index import (
+    CORPUS_ID, POSTINGS_COLLECTION, STATS_COLLECTION, TERMS_COLLECTION,
+    bm25, bm25_idf, index_articles, term_frequencies, tokenize, top_scores, unindex_articles
+)
+from storage.mongo import MongoRepository
+from tests.helpers import make_article
+
+
+def test_tokenize_drops_stopwords_and_single_letters_but_keeps_digits():
+    assert tokenize("The Open-Rate of e_mail is 7% (a 2x rise) in Q3") == [
+        "open", "rate", "mail", "7", "2x", "rise", "q3"
+    ]
+
+
+def test_term_frequencies_weight_title_and_data_points():
+    counts = term_frequencies({"title": "Open rates", "text": "open", "data_points": ["Open rates rose 5%"]})
+
+    assert counts == Counter({"open": 3 + 1 + 2, "rates": 3 + 2, "rose": 2, "5": 2})
+
+
+def test_bm25_saturates_term_frequency_and_normalizes_length():
+    idf = bm25_idf(1, 10)
+
+    assert bm25_idf(9, 10) > 0  # Common terms still count, never negatively
+    assert bm25(2, 10, idf, 10) > bm25(1, 10, idf, 10)
+    assert bm25(2, 10, idf, 10) - bm25(1, 10, idf, 10) > bm25(20, 10, idf, 10) - bm25(19, 10, idf, 10)
+    assert bm25(1, 5, idf, 10) > bm25(1, 20, idf, 10)
+
+
+def test_top_scores_keeps_close_scores_apart_and_pages_exactly():
+    ids = [ObjectId() for _ in range(5)]
+    scores = {ids[0]: 2e-6, ids[1]: 2e-6 + 1e-12, ids[2]: 1e-6, ids[3]: 1e-6, ids[4]: 5.0}
+
+    first = top_scores(scores, 3)
+    cursor = encode_cursor({"score": first[-1][1], "_id": first[-1][0]}, "score")
+    rest = top_scores(scores, 3, cursor)
+
+    assert [doc_id for doc_id, _ in first] == [ids[4], ids[1], ids[0]]
+    assert [doc_id for doc_id, _ in rest] == sorted([ids[2], ids[3]], reverse=True)
+
+
+CORPUS = [
+    {"title": "Email open rates", "text": "Open rates rose this quarter.", "data_points": ["Open rates up 12%"]},
+    {"title": "Quarterly update", "text": "Email open rates held steady; email clicks rose.", "data_points": []},
+    {"title": "Email deliverability", "text": "Email email email inbox placement.", "data_points": []},
+    {"title": "SMS", "text": "Text message clicks rose, email open rates fell.", "data_points": ["SMS clicks 9%"]},
+    {"title": "Push", "text": "Push notifications.", "data_points": []},
+]
+
+
+def _expected_scores(query, articles):
+    """BM25 as the MongoDB index computes it, straight from the definitions."""
+    counts = {str(article.id): term_frequencies(article.model_dump()) for article in articles}
+    n = len(counts)
+    avgdl = sum(sum(c.values()) for c in counts.values()) / n
+    scores = {}
+    for doc_id, c in counts.items():
+        dl = sum(c.values())
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in c]
+        if terms:
+            scores[doc_id] = sum(
+                bm25(c[t], dl, bm25_idf(sum(t in other for other in counts.values()), n), avgdl) for t in terms
+            )
+    return scores
+
+
+@pytest.fixture
+def corpus(sqlite_repo):
+    articles = [make_article(url=f"https://example.com/{i}", source_origin="blog" if i % 2 else "news", **fields)
+                for i, fields in enumerate(CORPUS)]
+    for article in articles:
+        sqlite_repo.save_article(article)
+    return articles
+
+
+def test_sqlite_ranks_with_the_same_bm25_as_mongo(sqlite_repo, corpus):
+    # "email" and "open" are in more than half the articles
+    results = sqlite_repo.search_articles("email open", limit=10)
+    expected = _expected_scores("email open", corpus)
+
+    assert {str(doc["_id"]): doc["score"] for doc in results} == pytest.approx(expected)
+    assert [doc["score"] for doc in results] == sorted(expected.values(), reverse=True)
+    assert len({doc["score"] for doc in results}) == len(results)
+    assert results[0]["title"] == "Email open rates"
+
+
+def test_sqlite_search_filters_by_source_and_pages_with_cursors(sqlite_repo, corpus):
+    everything = sqlite_repo.search_articles("email clicks rose", limit=10)
+    pages, cursor = [], None
+    while True:
+        page = sqlite_repo.search_articles("email clicks rose", limit=2 + 1, cursor=cursor)
+        pages.extend(page[:2])
+        if len(page) <= 2:
+            break
+        cursor = encode_cursor(page[1], "score")
+
+    assert [doc["_id"] for doc in pages] == [doc["_id"] for doc in everything]
+    assert {doc["source_origin"] for doc in sqlite_repo.search_articles("email", source="blog")} == {"blog"}
+    assert sqlite_repo.search_articles("the of and") == []
+
+
+def test_resaving_an_article_moves_its_sqlite_index_entry(sqlite_repo, corpus):
+    sqlite_repo.save_article(corpus[4].model_copy(update={"title": "Push email"}))
+
+    results = sqlite_repo.search_articles("push", limit=10)
+
+    assert [doc["title"] for doc in results] == ["Push email"]
+    assert sqlite_repo.conn.execute("SELECT COUNT(*) FROM article_search_docs").fetchone()[0] == len(CORPUS)
+
+
+class MemoryCollection:
+    """Just enough of a MongoDB collection for the search index, in memory."""
+
+    def __init__(self):
+        self.docs = []
+        self.before_insert = None
+
+    @staticmethod
+    def _matches(doc, query):
+        return all(
+            doc.get(field) in cond["$in"] if isinstance(cond, dict) else doc.get(field) == cond
+            for field, cond in query.items()
+        )
+
+    def find(self, query, projection=None):
+        return [dict(doc) for doc in self.docs if self._matches(doc, query)]
+
+    def find_one(self, query, projection=None):
+        return next(iter(self.find(query)), None)
+
+    def insert_many(self, docs, ordered=True):
+        if self.before_insert:
+            hook, self.before_insert = self.before_insert, None
+            hook()
+        self.docs.extend(dict(doc) for doc in docs)
+
+    def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if not self._matches(doc, query)]
+
+    def find_one_and_delete(self, query):
+        old = self.find_one(query)
+        self.delete_many(query)
+        return old
+
+    def find_one_and_replace(self, query, replacement, upsert=False):
+        old = self.find_one_and_delete(query)
+        self.docs.append(dict(replacement))
+        return old
+
+    def update_one(self, query, update, upsert=False):
+        doc = next((doc for doc in self.docs if self._matches(doc, query)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = dict(query)
+            self.docs.append(doc)
+        for field, delta in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + delta
+        for field, value in update.get("$max", {}).items():
+            doc[field] = max(doc.get(field, value), value)
+        for field, value in update.get("$min", {}).items():
+            doc[field] = min(doc.get(field, value), value)
+
+    def bulk_write(self, requests, ordered=True):
+        for request in requests:
+            self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+
+class MemoryDatabase(dict):
+    def __missing__(self, name):
+        self[name] = MemoryCollection()
+        return self[name]
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def _searchable(article):
+    return {"_id": article.id, **article.model_dump(include={"title", "text", "data_points", "source_origin"})}
+
+
+def test_mongo_index_ranks_with_bm25_and_pages_with_cursors():
+    articles = [make_article(url=f"https://example.com/{i}", source_origin="blog" if i % 2 else "news", **fields)
+                for i, fields in enumerate(CORPUS)]
+    db = MemoryDatabase()
+    db.raw_articles.insert_many([_searchable(article) for article in articles])
+    index_articles([_searchable(article) for article in articles], db=db)
+
+    results = search_index.search_articles("email open", limit=10, db=db)
+    pages, cursor = [], None
+    while True:
+        page = search_index.search_articles("email clicks rose", limit=2 + 1, cursor=cursor, db=db)
+        pages.extend(page[:2])
+        if len(page) <= 2:
+            break
+        cursor = encode_cursor(page[1], "score")
+
+    assert {str(doc["_id"]): doc["score"] for doc in results} == pytest.approx(_expected_scores("email open", articles))
+    assert [doc["score"] for doc in results] == sorted(doc["score"] for doc in results)[::-1]
+    assert [doc["_id"] for doc in pages] == [
+        doc["_id"] for doc in search_index.search_articles("email clicks rose", limit=10, db=db)
+    ]
+
+
+def test_top_matches_skips_postings_that_cannot_make_the_page():
+    rare = {ObjectId(): 5.0 + i for i in range(3)}
+    common = {doc_id: 0.01 for doc_id in list(rare) + [ObjectId() for _ in range(500)]}
+    postings = {"rare": rare, "common": common}
+    reads = Counter()
+
+    def scored_postings(term, doc_ids):
+        found = [(doc_id, score) for doc_id, score in postings[term].items() if doc_ids is None or doc_id in doc_ids]
+        reads[term] += len(found)
+        return found
+
+    ranked = search_index.top_matches(["common", "rare"], {"rare": 8.0, "common": 0.01}, scored_postings, 2)
+
+    assert [doc_id for doc_id, _ in ranked] == sorted(rare, key=rare.get, reverse=True)[:2]
+    assert reads == {"rare": 3, "common": 2}
+
+
+def test_top_matches_pages_like_an_exhaustive_ranking():
+    rng = random.Random(7)
+    ids = [ObjectId() for _ in range(200)]
+    postings = {
+        term: {doc_id: rng.uniform(0.1, weight) for doc_id in rng.sample(ids, size)}
+        for term, weight, size in (("a", 9.0, 10), ("b", 3.0, 40), ("c", 0.5, 150))
+    }
+    max_scores = {term: max(scores.values()) for term, scores in postings.items()}
+    totals = Counter()
+    for term in ("a", "b", "c"):
+        totals.update(postings[term])
+
+    def scored_postings(term, doc_ids):
+        return [(doc_id, score) for doc_id, score in postings[term].items() if doc_ids is None or doc_id in doc_ids]
+
+    pages, cursor = [], None
+    while True:
+        page = search_index.top_matches(list(postings), max_scores, scored_postings, 7, cursor)
+        pages.extend(page)
+        if len(page) < 7:
+            break
+        cursor = encode_cursor({"score": page[-1][1], "_id": page[-1][0]}, "score")
+
+    assert [doc_id for doc_id, _ in pages] == [doc_id for doc_id, _ in top_scores(totals, len(totals))]
+
+
+def test_concurrent_reindexing_counts_an_article_once():
+    article = make_article(title="Open rates")
+    db = MemoryDatabase()
+    first, second = _searchable(article), dict(_searchable(article), title="Click rates")
+    # The second writer swaps in its entry while the first is writing postings
+    db[POSTINGS_COLLECTION].before_insert = lambda: index_articles([second], db=db)
+
+    indexed = index_articles([first], db=db)
+
+    assert indexed == 0
+    assert {posting["term"] for posting in db[POSTINGS_COLLECTION].docs} == {"click", "rates"}
+    assert db[STATS_COLLECTION].find_one({"_id": CORPUS_ID})["docs"] == 1
+    assert {doc["_id"]: doc["df"] for doc in db[TERMS_COLLECTION].docs} == {"open": 0, "rates": 1, "click": 1}
+
+    assert unindex_articles([article.id, article.id], db=db) == 1
+    assert db[POSTINGS_COLLECTION].docs == []
+    assert db[STATS_COLLECTION].find_one({"_id": CORPUS_ID}) == {"_id": CORPUS_ID, "docs": 0, "length": 0}
+    assert {doc["df"] for doc in db[TERMS_COLLECTION].docs} == {0}
+
+
+def test_mongo_save_article_skips_reindexing_unchanged_articles(monkeypatch):
+    article = make_article(title="Open rates", text="Open rates rose.", data_points=["12%"])
+    stored = {"_id": ObjectId(), **article.model_dump(include={"title", "data_points", "source_origin"})}
+    raw_articles = SimpleNamespace(find_one=lambda *args: stored, update_one=lambda *args, **kwargs: None)
+    indexed = []
+    monkeypatch.setattr("storage.mongo.get_bodies", lambda ids, db: {stored["_id"]: article.text})
+    monkeypatch.setattr("storage.mongo.put_body", lambda *args, **kwargs: None)
+    monkeypatch.setattr("storage.mongo.index_articles", lambda docs, db: indexed.extend(docs))
+    repo = MongoRepository(db=SimpleNamespace(raw_articles=raw_articles))
+
+    repo.save_article(article)
+    repo.save_article(article.model_copy(update={"text": "Open rates fell."}))
+    repo.save_article(article.model_copy(update={"title": "Opens"}))
+
+    assert [doc["text"] for doc in indexed] == ["Open rates fell.", article.text]
+    assert all(doc["_id"] == stored["_id"] for doc in indexed)
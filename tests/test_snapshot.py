@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+import pytest
+from analytics.snapshot import Snapshot, write_snapshot
+from analytics.trends_reports import SnapshotBackend, weekly_windows
+from storage.sqlite import from_millis
+from tests.helpers import make_signal, make_trend
+
+NOW = datetime(2024, 5, 15, 9, 30)
+
+
+@pytest.fixture
+def populated(sqlite_repo):
+    """Trends and signals spread over both weekly windows, several samples a day."""
+    for days_ago, term, interest in [
+        (1, "email marketing", 80), (1, "email marketing", 60), (2, "sms", 30), (3, "push", 10),
+        (8, "email marketing", 40), (9, "sms", 45), (9, "sms", 15), (12, "push", 10),
+        # The boundary day's midnight falls before the current window starts
+        (7, "push", 90),
+    ]:
+        sqlite_repo.save_trend(make_trend(term=term, weekly_interest=interest, pulled_at=NOW - timedelta(days=days_ago)))
+    signals = [
+        make_signal(topic=topic, value_now=value, context_sentence=f"{topic} {i}", created_at=NOW - timedelta(days=days_ago))
+        for i, (days_ago, topic, value) in enumerate([
+            (1, "email_sms", 12.0), (2, "email_sms", -30.0), (3, "ecommerce", 4.0),
+            (8, "ecommerce", 7.0), (10, "ecommerce", 2.0), (7, "social", 50.0),
+        ])
+    ]
+    sqlite_repo.save_new_signals(signals)
+    return sqlite_repo
+
+
+def _snapshot(repo, path):
+    term_rows = repo.conn.execute("SELECT term, day, interest_sum, samples FROM term_daily").fetchall()
+    write_snapshot({
+        "signals": repo.list_signals(limit=1000),
+        "term_daily": [dict(row, day=from_millis(row["day"])) for row in map(dict, term_rows)],
+        "topic_daily": repo.load_topic_daily(NOW - timedelta(days=30), NOW),
+    }, str(path))
+    return SnapshotBackend(Snapshot(str(path)))
+
+
+def test_snapshot_reports_match_live_reports(populated, tmp_path):
+    backend = _snapshot(populated, tmp_path / "snapshot")
+    windows = weekly_windows(NOW)
+
+    assert backend.get_top_terms(*windows, limit=5) == pytest.approx(populated.get_top_terms(*windows, limit=5))
+    assert backend.get_top_topics(*windows, limit=5) == populated.get_top_topics(*windows, limit=5)
+    assert backend.get_notable_stats(windows[0], windows[1], threshold=5.0) == \
+        populated.get_notable_stats(windows[0], windows[1], threshold=5.0)
+
+
+def test_snapshot_averages_every_sample_of_a_day(populated, tmp_path):
+    backend = _snapshot(populated, tmp_path / "snapshot")
+
+    top = backend.get_top_terms(*weekly_windows(NOW), limit=5)["top_by_avg"]
+
+    assert top[0] == {"term": "email marketing", "avg_current": 70.0, "avg_previous": 40.0, "growth_pct": 75.0}
+    assert top[-1]["term"] == "push" and top[-1]["avg_previous"] == 50.0
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from bson import ObjectId
+from db.models import Insight
+from tests.helpers import make_article, make_signal, make_trend
+
+
+def _pages(client, path, limit):
+    """Every document of a listing, following X-Next-Cursor."""
+    docs, params = [], {"limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        docs.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return docs
+        params = {"limit": limit, "cursor": cursor}
+
+
+def test_signals_page_through_every_document_newest_first(api_client, sqlite_repo):
+    start = datetime(2024, 5, 1)
+    signals = [
+        make_signal(context_sentence=f"sentence {i}", topic="email_sms" if i % 2 else "ecommerce",
+                    created_at=start + timedelta(hours=i // 2))
+        for i in range(7)
+    ]
+    sqlite_repo.save_new_signals(signals)
+
+    docs = _pages(api_client, "/signals/", limit=3)
+
+    expected = sorted(signals, key=lambda s: (s.created_at, str(s.id)), reverse=True)
+    assert [doc["_id"] for doc in docs] == [str(s.id) for s in expected]
+
+    by_topic = api_client.get("/signals/", params={"topic": "ecommerce"}).json()
+    assert {doc["topic"] for doc in by_topic} == {"ecommerce"} and len(by_topic) == 4
+
+
+def test_insights_list_and_detail(api_client, sqlite_repo):
+    window = {"window_start": datetime(2024, 5, 1), "window_end": datetime(2024, 5, 8)}
+    insights = [
+        Insight(topic="email_sms", title=f"Insight {i}", summary="s", implication="i", target_audience="a",
+                signal_fingerprint=f"f{i}", created_at=datetime(2024, 5, 8, i), **window)
+        for i in range(3)
+    ]
+    sqlite_repo.save_insights(insights)
+
+    docs = _pages(api_client, "/insights/", limit=2)
+    detail = api_client.get(f"/insights/{insights[0].id}")
+
+    assert [doc["title"] for doc in docs] == ["Insight 2", "Insight 1", "Insight 0"]
+    assert detail.status_code == 200 and detail.json()["title"] == "Insight 0"
+
+
+def test_article_detail_joins_body_signals_and_insights(api_client, sqlite_repo):
+    article = make_article(title="Open rates", text="Open rates rose 12% this quarter.")
+    sqlite_repo.save_article(article)
+    signal = make_signal(source_doc_id=article.id)
+    sqlite_repo.save_new_signals([signal])
+    sqlite_repo.save_insights([Insight(
+        topic="email_sms", title="Opens up", summary="s", implication="i", target_audience="a",
+        signal_ids=[signal.id], window_start=datetime(2024, 5, 1), window_end=datetime(2024, 5, 8)
+    )])
+
+    listed = api_client.get("/sources/articles").json()
+    detail = api_client.get(f"/sources/articles/{article.id}").json()
+
+    assert [doc["_id"] for doc in listed] == [str(article.id)] and "text" not in listed[0]
+    assert detail["text"] == article.text
+    assert [s["_id"] for s in detail["signals"]] == [str(signal.id)]
+    assert [i["title"] for i in detail["insights"]] == ["Opens up"]
+    assert api_client.get("/sources/articles/not-an-id").status_code == 400
+
+
+def test_unchanged_listing_revalidates_with_304(api_client, sqlite_repo):
+    sqlite_repo.save_new_signals([make_signal()])
+    first = api_client.get("/signals/")
+
+    again = api_client.get("/signals/", headers={"If-None-Match": first.headers["ETag"]})
+    sqlite_repo.save_new_signals([make_signal(context_sentence="Another one.")])
+    sqlite_repo.bump_data_version("processed_signals")  # As the enrichment job does
+    changed = api_client.get("/signals/", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert again.status_code == 304
+    assert changed.status_code == 200 and len(changed.json()) == 2
+
+
+def test_weekly_report_reads_the_rollups(api_client, sqlite_repo):
+    now = datetime.utcnow()
+    sqlite_repo.save_trend(make_trend(term="sms", weekly_interest=40, pulled_at=now - timedelta(days=2)))
+    sqlite_repo.save_trend(make_trend(term="sms", weekly_interest=20, pulled_at=now - timedelta(days=9)))
+    sqlite_repo.save_new_signals([make_signal(created_at=now - timedelta(days=1))])
+
+    report = api_client.get("/reports/weekly").json()
+
+    assert report["terms"]["top_by_avg"][0]["term"] == "sms"
+    assert report["terms"]["top_by_avg"][0]["growth_pct"] == 100.0
+    assert report["topics"]["top_by_count"][0] == {
+        "topic": "email_sms", "count_current": 1, "count_previous": 0, "growth_pct": 100.0
+    }
+    assert api_client.get("/reports/anomalies").status_code == 501
+
+
+def test_export_streams_filtered_documents(api_client, sqlite_repo):
+    sqlite_repo.save_new_signals([
+        make_signal(context_sentence="old", created_at=datetime(2024, 4, 1)),
+        make_signal(context_sentence="new", created_at=datetime(2024, 5, 2)),
+    ])
+
+    response = api_client.get("/exports/signals", params={"since": "2024-05-01T00:00:00Z", "format": "csv"})
+
+    lines = response.text.strip().splitlines()
+    assert response.status_code == 200
+    assert len(lines) == 2 and "new" in lines[1]
+
+
+def test_routes_never_open_a_mongo_client(api_client, sqlite_repo, monkeypatch):
+    from db import async_client
+
+    def no_mongo():
+        raise AssertionError("MongoDB client opened on the SQLite backend")
+
+    monkeypatch.setattr(async_client, "get_async_client", no_mongo)
+    sqlite_repo.save_new_signals([make_signal()])
+
+    for path in ("/signals/", "/insights/", "/sources/articles", f"/signals/{ObjectId()}"):
+        assert api_client.get(path).status_code in (200, 404)
+    assert api_client.post("/signals/batch", json={"ids": ["x"]}).status_code == 200
+
+
+def test_if_modified_since_ignores_writes_within_the_named_second(api_client, sqlite_repo):
+    sqlite_repo.save_new_signals([make_signal()])
+    sqlite_repo.bump_data_version("processed_signals")
+    last_modified = api_client.get("/signals/").headers["Last-Modified"]
+    sqlite_repo.bump_data_version("processed_signals")  # A write within the named second
+    later = format_datetime(parsedate_to_datetime(last_modified) + timedelta(seconds=2), usegmt=True)
+
+    same_second = api_client.get("/signals/", headers={"If-Modified-Since": last_modified})
+    next_second = api_client.get("/signals/", headers={"If-Modified-Since": later})
+
+    assert same_second.status_code == 200
+    assert next_second.status_code == 304
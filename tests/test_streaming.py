@@ -0,0 +1,56 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from bson import ObjectId
+from api.streaming import CHUNK_SIZE, chunked, csv_lines, export_columns, ndjson_lines
+from db.models import RawArticle
+
+DOCS = [
+    {"_id": ObjectId(), "title": "Opens, up", "published_at": datetime(2024, 5, 1, 12), "data_points": ["12%"]},
+    {"_id": ObjectId(), "title": "Clicks", "published_at": datetime(2024, 5, 2), "data_points": []},
+]
+
+
+def test_ndjson_lines_write_one_document_per_line():
+    lines = list(ndjson_lines(DOCS))
+
+    assert [json.loads(line) for line in lines] == [
+        {"_id": str(doc["_id"]), "title": doc["title"], "published_at": doc["published_at"].isoformat(),
+         "data_points": doc["data_points"]}
+        for doc in DOCS
+    ]
+    assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+
+
+def test_csv_lines_flatten_values_in_column_order():
+    columns = ["_id", "title", "published_at", "data_points", "author"]
+
+    rows = list(csv.reader(io.StringIO(b"".join(csv_lines(DOCS, columns)).decode())))
+
+    assert rows == [
+        columns,
+        [str(DOCS[0]["_id"]), "Opens, up", "2024-05-01T12:00:00", '["12%"]', ""],
+        [str(DOCS[1]["_id"]), "Clicks", "2024-05-02T00:00:00", "[]", ""],
+    ]
+    assert b"".join(csv_lines([], columns)) == b"_id,title,published_at,data_points,author\r\n"
+
+
+def test_export_columns_use_aliases_and_skip_excluded_fields():
+    columns = export_columns(RawArticle, exclude={"text"})
+
+    assert columns[0] == "_id" and "text" not in columns and "title" in columns
+
+
+def test_chunked_groups_lines_without_losing_bytes():
+    lines = [b"x" * 1000 + b"\n"] * 200
+
+    plain = list(chunked(lines))
+    compressed = list(chunked(lines, gzip=True))
+
+    assert b"".join(plain) == b"".join(lines)
+    assert all(len(chunk) >= CHUNK_SIZE for chunk in plain[:-1]) and len(plain) > 1
+    assert gzip.decompress(b"".join(compressed)) == b"".join(lines)
+    assert gzip.decompress(b"".join(chunked([], gzip=True))) == b""
+    assert list(chunked([])) == []